@@ -0,0 +1,62 @@
+"""
+ETL stage benchmarks on synthetic SEN data (see conftest.py / synth.py).
+
+Run from the repo root:
+  pip install pytest-benchmark
+  pytest benchmarks                       # scale ×1
+  ENERVIZ_BENCH_SCALES=1,10 pytest benchmarks
+
+Each run is saved under benchmarks/.results and compared with the previous
+one; a stage whose mean time grows by more than 25 % fails the run.
+"""
+from conftest import db_path, load_stage, run_script, shp_path, xlsx_path
+
+ROUNDS = dict(rounds=3, iterations=1, warmup_rounds=0)
+
+def bench_01_ingest(benchmark, sen):
+    stage = load_stage("01_ingest_inventory")
+    benchmark.pedantic(stage.ingest, args=(str(xlsx_path(sen)), [str(shp_path(sen))]),
+                       **ROUNDS)
+
+def bench_02_graph_build(benchmark, sen, tmp_path):
+    stage = load_stage("02_build_transmission_graph")
+    benchmark.pedantic(stage.build_graph, args=(str(db_path(sen)), str(tmp_path)), **ROUNDS)
+
+def bench_04_knowledge_graph(benchmark, sen, tmp_path):
+    stage = load_stage("04_build_knowledge_graph")
+    benchmark.pedantic(stage.build_kg, args=(str(db_path(sen)), str(tmp_path)),
+                       **ROUNDS)
+
+def bench_05_graphml_export(benchmark, sen, tmp_path):
+    stage = load_stage("05_export_graphml")
+    benchmark.pedantic(stage.build_and_export,
+                       args=(str(db_path(sen)), str(tmp_path / "kg_sen.graphml")),
+                       **ROUNDS)
+
+def bench_annotate_lines(benchmark, sen):
+    benchmark.pedantic(run_script, args=("annotate_lines",), **ROUNDS)
+
+def bench_tessellate_lines(benchmark, sen):
+    benchmark.pedantic(run_script, args=("tessellate_lines",), **ROUNDS)
+
+def bench_price_sample(benchmark, sen):
+    benchmark.pedantic(run_script, args=("make_price_sample",), **ROUNDS)
+
+def bench_10_price_congestion(benchmark, sen, tmp_path):
+    load_stage("02_build_transmission_graph").build_graph(str(db_path(sen)), str(tmp_path))
+    stage = load_stage("10_price_congestion")
+    months = [str(p) for p in sorted((sen / "data" / "raw").glob("costo_marginal_*.tsv"))]
+    benchmark.pedantic(stage.congestion,
+                       args=(str(tmp_path / "transmission_graph.npz"), str(db_path(sen)), months,
+                             1.0, 0.05, str(tmp_path / "line_congestion.json"),
+                             str(tmp_path / "congestion_corridors.csv")),
+                       **ROUNDS)
+
+def bench_13_price_anomalies(benchmark, sen, tmp_path):
+    load_stage("02_build_transmission_graph").build_graph(str(db_path(sen)), str(tmp_path))
+    stage = load_stage("13_detect_price_anomalies")
+    months = [str(p) for p in sorted((sen / "data" / "raw").glob("costo_marginal_*.tsv"))]
+    benchmark.pedantic(stage.detect,
+                       args=(months, str(tmp_path / "cmg_watch.npz"), str(tmp_path / "cmg_alerts.jsonl"),
+                             str(tmp_path / "transmission_graph.npz"), str(db_path(sen)), True, 72.0),
+                       **ROUNDS)
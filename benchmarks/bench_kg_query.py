@@ -0,0 +1,62 @@
+"""
+Hierarchy queries on the interval index (enerviz.hierarchy) over the
+synthetic SEN.  One round = QUERIES mixed lookups, so
+
+    queries/s = QUERIES / mean
+
+e.g. 5000 queries in 0.05 s → 100 000 queries/s.
+"""
+import random
+
+import pytest
+
+from conftest import db_path
+
+QUERIES = 5000
+
+@pytest.fixture(scope="module")
+def index(sen):
+    from enerviz.hierarchy import HierarchyIndex
+    from enerviz.inventory import connect
+
+    con = connect(db_path(sen))
+    idx = HierarchyIndex.from_inventory(con)
+    con.close()
+    return idx
+
+@pytest.fixture(scope="module")
+def workload(index):
+    rng = random.Random(42)
+    by = {t: index.ids[a].tolist() for t, a in zip(("E", "S", "B", "L", "C", "T"), index.by_type)}
+    calls = [
+        lambda: index.descendants(rng.choice(by["E"]), "Barra"),
+        lambda: index.reachable(rng.choice(by["E"]), "Barra"),
+        lambda: index.owners(rng.choice(by["S"])),
+        lambda: index.is_ancestor(rng.choice(by["E"]), rng.choice(by["T"])),
+        lambda: index.ancestors(rng.choice(by["B"])),
+        lambda: index.count(rng.choice(by["L"]), "Tramo"),
+    ]
+    return [rng.choice(calls) for _ in range(QUERIES)]
+
+def bench_hierarchy_queries(benchmark, workload):
+    def run():
+        for q in workload:
+            q()
+    benchmark.pedantic(run, rounds=5, iterations=1, warmup_rounds=1)
+    if benchmark.stats:
+        benchmark.extra_info["queries_per_s"] = round(QUERIES / benchmark.stats["mean"])
+
+SUBGRAPHS = 200
+
+def bench_khop_subgraph(benchmark, index):
+    """k-hop neighbourhood + induced edges of 3 random substations, 2 hops."""
+    rng = random.Random(7)
+    subs = index.ids[index.by_type[1]].tolist()
+    seeds = [rng.sample(subs, 3) for _ in range(SUBGRAPHS)]
+    index.adjacency()
+    def run():
+        for s in seeds:
+            index.induced(index.khop(s, 2)[0])
+    benchmark.pedantic(run, rounds=5, iterations=1, warmup_rounds=1)
+    if benchmark.stats:
+        benchmark.extra_info["ms_per_subgraph"] = round(1000 * benchmark.stats["mean"] / SUBGRAPHS, 3)
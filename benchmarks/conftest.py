@@ -0,0 +1,88 @@
+"""
+Fixtures for the ETL benchmark suite.
+
+Datasets from synth.py are cached under benchmarks/.data/x<scale> and reused
+across runs.  ENERVIZ_BENCH_SCALES picks the scales (default "1"; e.g.
+"1,10,100").  Every benchmark runs with the dataset root as the working
+directory, exactly like the scripts expect (data/raw, data/curated, public).
+
+Runs are saved to benchmarks/.results; once a previous run exists, each new
+run is compared with it and fails if a stage's mean time grows by more than
+REGRESSION.
+"""
+from __future__ import annotations
+import importlib.util, os, pathlib, runpy, sys
+
+import pytest
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+HERE    = pathlib.Path(__file__).resolve().parent
+SCRIPTS = HERE.parent / "scripts"
+CACHE   = HERE / ".data"
+RESULTS = HERE / ".results"
+SCALES  = [int(s) for s in os.environ.get("ENERVIZ_BENCH_SCALES", "1").split(",")]
+REGRESSION = "mean:25%"
+
+sys.path.insert(0, str(SCRIPTS))
+sys.path.insert(0, str(HERE))
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    from pytest_benchmark.utils import parse_compare_fail
+
+    opt = config.option
+    if opt.benchmark_storage == "file://./.benchmarks":        # plugin default
+        opt.benchmark_storage = f"file://{RESULTS}"
+    if not opt.benchmark_compare and any(RESULTS.rglob("*.json")):
+        opt.benchmark_compare = True
+        opt.benchmark_compare_fail = [parse_compare_fail(REGRESSION)]
+
+def load_stage(name: str):
+    """Import scripts/etl/<name>.py (file names start with digits)."""
+    path = SCRIPTS / "etl" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(name.split("_", 1)[1], path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+def run_script(name: str) -> None:
+    """Execute a top-level script of scripts/ (annotate_lines, …) in-process."""
+    runpy.run_path(str(SCRIPTS / f"{name}.py"), run_name="__main__")
+
+@pytest.fixture(scope="session", params=SCALES, ids=lambda s: f"x{s}")
+def sen(request) -> pathlib.Path:
+    """Dataset root for one scale, with 01_ingest already run once."""
+    from synth import generate
+
+    root = CACHE / f"x{request.param}"
+    xlsx = root / "data" / "raw" / "instalaciones_activos.xlsx"
+    if not xlsx.exists():
+        generate(root, request.param)
+
+    cwd = os.getcwd()
+    os.chdir(root)
+    if not _has_views(db_path(root)):
+        load_stage("01_ingest_inventory").ingest(str(xlsx), [str(shp_path(root))])
+    if not (root / "public" / "lines_barras.geojson").exists():
+        run_script("annotate_lines")
+    yield root
+    os.chdir(cwd)
+
+def _has_views(db: pathlib.Path) -> bool:
+    """False for a missing inventory or one ingested before the inv.* views."""
+    from enerviz.inventory import connect
+    try:
+        connect(db).close()
+    except (FileNotFoundError, RuntimeError):
+        return False
+    return True
+
+def db_path(root: pathlib.Path) -> pathlib.Path:
+    return root / "data" / "curated" / "inventory.duckdb"
+
+def shp_path(root: pathlib.Path) -> pathlib.Path:
+    return root / "data" / "raw" / "Lineas_220" / "Lineas_220.shp"
+
+def xlsx_path(root: pathlib.Path) -> pathlib.Path:
+    return root / "data" / "raw" / "instalaciones_activos.xlsx"
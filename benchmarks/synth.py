@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Synthetic SEN-scale inputs for the benchmark suite.
+
+Writes, under <root>, the same files the pipeline reads from data/raw:
+
+  data/raw/instalaciones_activos.xlsx   sheets Empresa, Subestaciones, Barras,
+                                        Linea, Circuito, Tramo (InfoTécnica columns)
+  data/raw/Lineas_220/Lineas_220.shp    IDE-style line shapefile, one feature per
+                                        Tramo (ID_LIN_TRA = Tramo.id)
+  data/raw/costo_marginal_202503.tsv    cmg JSON payload [{barra, fecha, cmg}, …]
+  public/generation_barras.json         cleaned names of "generating" barras
+
+Scale 1 is roughly the size of today's SEN; 10 and 100 multiply every table.
+Everything is drawn from a seeded numpy generator, so a given scale always
+produces the same dataset.
+
+Usage:
+  python benchmarks/synth.py --out /tmp/sen-x10 --scale 10
+"""
+from __future__ import annotations
+import argparse, json, pathlib
+
+import numpy as np
+import pandas as pd
+
+# per-unit-scale table sizes (≈ SEN 2025)
+BASE = {
+    "empresa":     250,
+    "subestacion": 1100,
+    "linea":       700,
+    "priced":      220,     # barras published in the cmg feed
+}
+KV = np.array([66, 110, 154, 220, 500])
+KV_P = np.array([0.30, 0.25, 0.15, 0.25, 0.05])
+TIPOS = ["Nacional", "Zonal", "Dedicado"]
+SYLL = ["al", "ca", "cha", "cru", "de", "el", "hue", "lla", "lo", "ma", "na",
+        "pa", "pol", "que", "ri", "san", "ta", "to", "va", "zo", "jah", "ñu"]
+MONTH = "2025-03"
+
+def _names(rng: np.random.Generator, n: int, prefix: str = "") -> list[str]:
+    """n unique pronounceable names (a numeric suffix breaks rare ties)."""
+    out, seen = [], set()
+    while len(out) < n:
+        k = rng.integers(2, 5)
+        name = "".join(rng.choice(SYLL, k)).capitalize()
+        if rng.random() < 0.3:
+            name += " " + "".join(rng.choice(SYLL, 2)).capitalize()
+        if name in seen:
+            name = f"{name} {len(out)}"
+        seen.add(name)
+        out.append(prefix + name)
+    return out
+
+def generate(root: str | pathlib.Path, scale: int = 1, seed: int = 42) -> pathlib.Path:
+    import geopandas as gpd
+    from shapely import linestrings
+
+    rng = np.random.default_rng(seed)
+    root = pathlib.Path(root)
+    raw = root / "data" / "raw"
+    (raw / "Lineas_220").mkdir(parents=True, exist_ok=True)
+    (root / "public").mkdir(parents=True, exist_ok=True)
+
+    n_emp = BASE["empresa"] * scale
+    n_sub = BASE["subestacion"] * scale
+    n_lin = BASE["linea"] * scale
+
+    # ---------- Empresa ----------
+    emp = pd.DataFrame({"id": np.arange(1, n_emp + 1),
+                        "name": _names(rng, n_emp, "Empresa ")})
+
+    # ---------- Subestaciones (a thin north–south strip) ----------
+    lat = np.sort(rng.uniform(-53.0, -18.0, n_sub))
+    lon = -71.0 + rng.normal(0, 0.6, n_sub)
+    sub = pd.DataFrame({
+        "id": np.arange(1, n_sub + 1),
+        "name": _names(rng, n_sub),
+        "propietario_id": rng.integers(1, n_emp + 1, n_sub),
+        "lat": lat, "lon": lon,
+    })
+
+    # ---------- Barras: 1–3 per substation, one per voltage level ----------
+    per_sub = rng.integers(1, 4, n_sub)
+    bar_sub = np.repeat(sub["id"].to_numpy(), per_sub)
+    bar_kv = rng.choice(KV, len(bar_sub), p=KV_P)
+    bar = pd.DataFrame({
+        "id": np.arange(1, len(bar_sub) + 1),
+        "name": [f"{sub['name'].iat[s - 1]} {kv}kV" for s, kv in zip(bar_sub, bar_kv)],
+        "patio_subestacion_id": bar_sub,
+        "tension_kV": bar_kv,
+    })
+    first_bar = np.concatenate([[0], np.cumsum(per_sub)[:-1]]) + 1   # per substation
+
+    # ---------- Linea: neighbouring substations (sorted by latitude) ----------
+    a = rng.integers(0, n_sub - 1, n_lin)
+    b = np.minimum(a + rng.integers(1, 4, n_lin), n_sub - 1)
+    lin_kv = rng.choice(KV, n_lin, p=KV_P)
+    lin = pd.DataFrame({
+        "id": np.arange(1, n_lin + 1),
+        "name": [f"{sub['name'].iat[i]} - {sub['name'].iat[j]} {kv}kV"
+                 for i, j, kv in zip(a, b, lin_kv)],
+        "propietario_id": rng.integers(1, n_emp + 1, n_lin),
+        "voltaje_kV": lin_kv,
+    })
+
+    # ---------- Circuito: 1–2 per line ----------
+    per_lin = rng.integers(1, 3, n_lin)
+    cir_lin = np.repeat(lin["id"].to_numpy(), per_lin)
+    cir = pd.DataFrame({"id": np.arange(1, len(cir_lin) + 1), "linea_id": cir_lin})
+
+    # ---------- Tramo: 1–3 per circuit, parallel edges between the line's end barras ----------
+    per_cir = rng.integers(1, 4, len(cir))
+    tra_cir = np.repeat(cir["id"].to_numpy(), per_cir)
+    tra_lin = cir_lin[tra_cir - 1] - 1
+    sa, sb = a[tra_lin], b[tra_lin]
+    tra = pd.DataFrame({
+        "id": np.arange(1, len(tra_cir) + 1),
+        "circuito_id": tra_cir,
+        "nodo1_id": first_bar[sa],
+        "nodo2_id": first_bar[sb],
+    })
+
+    xlsx = raw / "instalaciones_activos.xlsx"
+    with pd.ExcelWriter(xlsx, engine="openpyxl") as xw:
+        for sheet, df in (("Empresa", emp), ("Subestaciones", sub), ("Barras", bar),
+                          ("Linea", lin), ("Circuito", cir), ("Tramo", tra)):
+            df.to_excel(xw, sheet_name=sheet, index=False)
+
+    # ---------- IDE shapefile: one feature per Tramo ----------
+    n_vtx = 12
+    t = np.linspace(0, 1, n_vtx)
+    x = lon[sa, None] + (lon[sb] - lon[sa])[:, None] * t + rng.normal(0, 0.01, (len(tra), n_vtx))
+    y = lat[sa, None] + (lat[sb] - lat[sa])[:, None] * t + rng.normal(0, 0.01, (len(tra), n_vtx))
+    geoms = linestrings(np.stack([x, y], axis=-1))
+    lname = lin["name"].to_numpy()[tra_lin]
+    shp = gpd.GeoDataFrame({
+        "ID_LIN_TRA": tra["id"].to_numpy(),
+        "NOMBRE":     lname,
+        "CIRCUITO":   [f"C{c}" for c in rng.integers(1, 3, len(tra))],
+        "TENSION_KV": lin_kv[tra_lin].astype(float),
+        "PROPIEDAD":  emp["name"].to_numpy()[lin["propietario_id"].to_numpy()[tra_lin] - 1],
+        "TIPO":       rng.choice(TIPOS, len(tra), p=[0.3, 0.5, 0.2]),
+        "ESTADO":     "En Operacion",
+        "COMUNA":     sub["name"].to_numpy()[sa],
+    }, geometry=geoms, crs="EPSG:4326")
+    shp.to_file(raw / "Lineas_220" / "Lineas_220.shp")
+
+    # ---------- cmg payload: priced barras × every hour of the month ----------
+    n_priced = min(BASE["priced"] * scale, len(bar))
+    priced = rng.choice(len(bar), n_priced, replace=False)
+    spelled = [sub["name"].iat[s - 1] if rng.random() < 0.7 else bar["name"].iat[i].upper()
+               for i, s in zip(priced, bar_sub[priced])]
+    hours = pd.date_range(f"{MONTH}-01", periods=pd.Period(MONTH).days_in_month * 24, freq="h")
+    base_price = rng.uniform(20, 90, n_priced)
+    daily = 15 * np.sin(2 * np.pi * hours.hour.to_numpy() / 24)
+    cmg = np.round(base_price[None, :] + daily[:, None]
+                   + rng.normal(0, 5, (len(hours), n_priced)), 1)
+    fecha = hours.strftime("%Y-%m-%d %H:%M:%S")
+    payload = [{"barra": b_, "fecha": f, "cmg": float(c)}
+               for f, row in zip(fecha, cmg) for b_, c in zip(spelled, row)]
+    (raw / f"costo_marginal_{MONTH.replace('-', '')}.tsv").write_text(json.dumps(payload))
+
+    # ---------- generation barras (≈ 15 % of substations) ----------
+    gen = sub["name"].to_numpy()[rng.random(n_sub) < 0.15]
+    (root / "public" / "generation_barras.json").write_text(
+        json.dumps(sorted(g.lower() for g in gen)))
+    return root
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Synthetic SEN-scale benchmark inputs")
+    ap.add_argument("--out", required=True, help="directorio raíz del dataset")
+    ap.add_argument("--scale", type=int, default=1, help="1, 10, 100 × SEN")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+    out = generate(args.out, args.scale, args.seed)
+    print(f"✅ synthetic SEN ×{args.scale} → {out}")
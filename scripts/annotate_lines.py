@@ -2,48 +2,94 @@
 """
 Create lines_barras.geojson with rich, ASCII-safe attributes.
 
-Columns kept (all renamed to ASCII): startBarra, endBarra, volt, owner,
-circuit, tipo, estado, comuna, nombre, length_km.
+Columns kept (all renamed to ASCII): tramo, startBarra, endBarra, volt,
+owner, circuit, tipo, estado, comuna, nombre, length_km, dir, dirSrc.
+
+Geometries are written already oriented in the direction power flows, so
+the viewer draws arrows in vertex order:
+  • DC power flow available       dominant direction over the day from
+                                  public/line_flows.json (etl/08_dc_power_flow.py)
+  • tipo == "dedicado"            keep IDE order (IDE stores gen → grid)
+  • exactly one end generates     start at the generating barra
+  • nominal DC flow only          direction of 08's nominal case (1 MW per
+                                  generating barra, dirSrc flujo_dc_nominal)
+  • otherwise                     keep IDE order (best guess)
+dir is +1 (IDE order) or -1 (reversed; start/end barras swapped too) and
+dirSrc names the rule that decided it.
 """
-import geopandas as gpd, unicodedata, re, pathlib
+import geopandas as gpd, numpy as np, shapely, re, pathlib, json
+
+from enerviz.instrument import stage
+from enerviz.names import ascii, clean
 
 RAW = pathlib.Path("data/raw/Lineas_220/Lineas_220.shp")
+GEN = pathlib.Path("public/generation_barras.json")   # extract_generation_barras.py
+FLOWS = pathlib.Path("public/line_flows.json")        # etl/08_dc_power_flow.py
 OUT = pathlib.Path("public/lines_barras.geojson")
 
-def ascii(s: str) -> str:
-    return unicodedata.normalize("NFKD", s).encode("ascii","ignore").decode()
-
-def clean_name(txt: str) -> str:
-    return re.sub(r"\s+", " ", ascii(txt).lower()).strip()
-
 # ------------------------------------------------------------------ #
-gdf = gpd.read_file(RAW)
+with stage("read_shapefile") as st:
+    gdf = gpd.read_file(RAW)
+    st.rows_out = len(gdf)
 
 # split NOMBRE into start / end barras
-starts, ends = [], []
-for name in gdf["NOMBRE"]:
-    parts = re.split(r"-|/", name, maxsplit=1)
-    a = parts[0]; b = parts[1] if len(parts) > 1 else parts[0]
-    starts.append(clean_name(a))
-    ends.append(clean_name(b))
-
-gdf = gdf.assign(
-    startBarra = starts,
-    endBarra   = ends,
-    volt       = gdf["TENSION_KV"].fillna(0).astype(int),
-    owner      = gdf["PROPIEDAD"].fillna("—").apply(ascii),
-    circuit    = gdf["CIRCUITO"].fillna("—").apply(ascii),
-    tipo       = gdf["TIPO"].fillna("—").apply(ascii),
-    estado     = gdf["ESTADO"].fillna("—").apply(ascii),
-    comuna     = gdf["COMUNA"].fillna("—").apply(ascii),
-    nombre     = gdf["NOMBRE"].apply(ascii),
-)
+with stage("attributes", rows_in=len(gdf)):
+    starts, ends = [], []
+    for name in gdf["NOMBRE"]:
+        parts = re.split(r"-|/", name, maxsplit=1)
+        a = parts[0]; b = parts[1] if len(parts) > 1 else parts[0]
+        starts.append(clean(a))
+        ends.append(clean(b))
+
+    gdf = gdf.assign(
+        tramo      = gdf["ID_LIN_TRA"].astype(str),
+        startBarra = starts,
+        endBarra   = ends,
+        volt       = gdf["TENSION_KV"].fillna(0).astype(int),
+        owner      = gdf["PROPIEDAD"].fillna("—").apply(ascii),
+        circuit    = gdf["CIRCUITO"].fillna("—").apply(ascii),
+        tipo       = gdf["TIPO"].fillna("—").apply(ascii),
+        estado     = gdf["ESTADO"].fillna("—").apply(ascii),
+        comuna     = gdf["COMUNA"].fillna("—").apply(ascii),
+        nombre     = gdf["NOMBRE"].apply(ascii),
+    )
+
+# flow direction: DC power flow, else generation → grid
+with stage("direction", rows_in=len(gdf)) as st:
+    gen = {clean(b) for b in json.loads(GEN.read_text())} if GEN.exists() else set()
+    if not gen:
+        print(f"⚠️  {GEN} missing or empty – every line keeps IDE order")
+    dc = np.zeros(len(gdf), dtype=int)                   # +1 / -1 vs IDE order, 0 = no flow
+    nominal = False                                      # 08 ran without real injections
+    if FLOWS.exists():
+        fl = json.loads(FLOWS.read_text())
+        nominal = fl.get("dirSrc") == "flujo_dc_nominal"
+        net = np.sign((np.array(fl["dir"]) * np.array(fl["mw"])).sum(axis=1)).astype(int)
+        dc = gdf["tramo"].map(dict(zip(fl["tramo"], net.tolist()))).fillna(0).astype(int).to_numpy()
+    a_gen    = gdf["startBarra"].isin(gen).to_numpy()
+    b_gen    = gdf["endBarra"].isin(gen).to_numpy()
+    dedicado = gdf["tipo"].str.lower().eq("dedicado").to_numpy()
+    real     = (dc != 0) & (not nominal)
+    by_gen   = ~real & ~dedicado & (a_gen != b_gen)
+    by_nom   = ~real & ~dedicado & ~by_gen & (dc != 0)
+    flip     = (real & (dc < 0)) | (by_gen & b_gen) | (by_nom & (dc < 0))
+
+    geom = gdf.geometry.to_numpy()
+    geom[flip] = shapely.reverse(geom[flip])
+    gdf = gdf.set_geometry(geom, crs=gdf.crs)
+    gdf.loc[flip, ["startBarra", "endBarra"]] = gdf.loc[flip, ["endBarra", "startBarra"]].to_numpy()
+    gdf["dir"]    = np.where(flip, -1, 1)
+    gdf["dirSrc"] = np.select([real, dedicado, by_gen, by_nom],
+                              ["flujo_dc", "dedicado", "generacion", "flujo_dc_nominal"], "orden_ide")
+    st.rows_out = int(flip.sum())
 
 # precise length in km (World Mercator metres)
-gdf_proj = gdf.to_crs(3395)
-gdf["length_km"] = gdf_proj.length / 1_000
+with stage("length_km", rows_in=len(gdf)):
+    gdf_proj = gdf.to_crs(3395)
+    gdf["length_km"] = gdf_proj.length / 1_000
 
-cols = ["startBarra","endBarra","volt","owner","circuit",
-        "tipo","estado","comuna","length_km","nombre","geometry"]
-gdf[cols].to_file(OUT, driver="GeoJSON")
-print("✅ wrote", OUT, "features:", len(gdf))
+cols = ["tramo","startBarra","endBarra","volt","owner","circuit",
+        "tipo","estado","comuna","length_km","nombre","dir","dirSrc","geometry"]
+with stage("write_geojson", rows_in=len(gdf)):
+    gdf[cols].to_file(OUT, driver="GeoJSON")
+print("✅ wrote", OUT, "features:", len(gdf), "reversed:", int(flip.sum()))
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Compile the barra-name lookup the viewer uses instead of barra_alias.csv.
+
+Inputs:
+    data/curated/inventory.duckdb        canonical Barras (+ substation coords)
+    data/processed/barra_alias.csv       optional alias,barra overrides
+    public/generation_barras.json        } every name the pipeline emits is
+    public/lines_barras.geojson          } resolved here once, so the browser
+    data/raw/costo_marginal_*.tsv        } only does clean() + a map lookup
+Outputs:
+    viewer/src/data/barra_lookup.json    {barras:{id:{name,lat,lon}}, lookup:{key:id}}
+    data/processed/barra_unmatched.csv   names that stayed below min_score
+"""
+import csv, json, pathlib
+
+from enerviz.instrument import stage
+from enerviz.names import BarraResolver, write_lookup
+
+GEN   = pathlib.Path("public/generation_barras.json")
+LINES = pathlib.Path("public/lines_barras.geojson")
+RAW   = pathlib.Path("data/raw")
+OUT   = pathlib.Path("viewer/src/data/barra_lookup.json")
+MISS  = pathlib.Path("data/processed/barra_unmatched.csv")
+
+def seen_names() -> set[str]:
+    names: set[str] = set()
+    if GEN.exists():
+        names.update(json.loads(GEN.read_text()))
+    if LINES.exists():
+        for f in json.loads(LINES.read_text())["features"]:
+            p = f["properties"]
+            names.update(n for n in (p.get("startBarra"), p.get("endBarra")) if n)
+    for tsv in sorted(RAW.glob("costo_marginal_*.tsv")):
+        with open(tsv, encoding="utf-8") as f:
+            names.update(r["barra"] for r in json.load(f))
+    return names
+
+with stage("load_resolver") as st:
+    resolver = BarraResolver.from_inventory()
+    st.rows_out = len(resolver.ids)
+with stage("collect_names") as st:
+    names = seen_names()
+    st.rows_out = len(names)
+
+with stage("resolve", rows_in=len(names)) as st:
+    matches = dict(zip(names, resolver.resolve_many(names)))
+    st.rows_out = resolved = sum(m is not None for m in matches.values())
+
+with stage("write_lookup"):
+    write_lookup(resolver.compile_lookup(names), OUT)
+print(f"✅ wrote {OUT}  canonical: {len(resolver.ids)}  "
+      f"resolved: {resolved}/{len(names)}")
+
+missing = sorted(n for n, m in matches.items() if m is None)
+MISS.parent.mkdir(parents=True, exist_ok=True)
+with open(MISS, "w", newline="", encoding="utf-8") as f:
+    w = csv.writer(f)
+    w.writerow(["name"])
+    w.writerows([n] for n in missing)
+if missing:
+    print(f"⚠️  {len(missing)} names unmatched → {MISS}")
@@ -0,0 +1,6 @@
+"""
+Shared helpers for the EnerViz data pipeline.
+
+The scripts under ``scripts/`` and ``scripts/etl/`` import from here instead
+of re-implementing the same logic in every file.
+"""
@@ -0,0 +1,4 @@
+"""python -m enerviz …  (with scripts/ on sys.path) – same as bin/enerviz."""
+from enerviz.cli import main
+
+main()
@@ -0,0 +1,197 @@
+"""
+Online CMg spike and decoupling detector with O(1) state per barra.
+
+Each hour of prices updates, for every barra that published one,
+
+    mean, var   exponentially weighted (half-life HALFLIFE_H updates)
+    hist        the same decay applied to a fixed log-spaced price
+                histogram, read back as a rolling quantile sketch
+
+and, for every pair of neighbouring barras (adjacent price zones on the
+transmission graph, enerviz.congestion.Corridors), the EWMA mean and
+variance of their spread.  An hour is flagged before it is folded in:
+
+    spike       price − mean > max(MIN_JUMP, Z·sd) and above the rolling Q quantile
+    decoupling  |spread| > max(DECOUPLE_MIN, DECOUPLE_REL · price level) and
+                |spread − mean spread| > max(DECOUPLE_MIN, Z·sd of the spread)
+
+Stats need WARMUP updates before they can flag anything.  The whole state
+is a handful of arrays, saved as one .npz between batches:
+
+    watch = PriceWatch.load(STATE) if STATE.exists() else PriceWatch.empty()
+    cols = watch.add_barras(ids, names, lat, lon)       # batch columns → state columns
+    alerts = watch.run(hours, prices)                   # H×K, NaN = no price that hour
+    watch.save(STATE)
+
+Hours at or before ``watch.last`` are skipped, so overlapping batches can
+be fed again without double counting.
+"""
+from __future__ import annotations
+import pathlib
+from dataclasses import dataclass, fields
+from typing import Sequence
+
+import numpy as np
+
+STATE  = pathlib.Path("data/processed/cmg_watch.npz")
+ALERTS = pathlib.Path("public/cmg_alerts.jsonl")
+
+HALFLIFE_H   = 72.0                       # updates for a sample's weight to halve
+WARMUP       = 48                         # updates before a barra / pair can alert
+Z            = 4.0                        # deviations from the EWMA mean
+Q            = 0.99                       # rolling quantile a spike must exceed
+MIN_JUMP     = 20.0                       # USD/MWh above the mean for a spike
+DECOUPLE_MIN = 15.0                       # USD/MWh between neighbours
+DECOUPLE_REL = 0.25                       # of the pair's mean price
+# histogram edges (USD/MWh): < 0, then log-spaced 1 … 5000, then ≥ 5000
+EDGES = np.r_[0.0, np.geomspace(1.0, 5000.0, 63)]
+_LO, _HI = np.r_[EDGES[0], EDGES], np.r_[EDGES, EDGES[-1]]
+
+@dataclass
+class PriceWatch:
+    ids:   np.ndarray                     # K inventory barra ids
+    names: np.ndarray                     # K first spelling seen
+    lat:   np.ndarray                     # K, NaN if unknown
+    lon:   np.ndarray                     # K
+    n:     np.ndarray                     # K updates so far
+    mean:  np.ndarray                     # K EWMA price
+    var:   np.ndarray                     # K EWMA variance
+    hist:  np.ndarray                     # K×(len(EDGES)+1) decayed price histogram
+    pa:    np.ndarray                     # P neighbour pairs (state columns, a < b)
+    pb:    np.ndarray                     # P
+    pn:    np.ndarray                     # P updates so far
+    pmean: np.ndarray                     # P EWMA spread price[b] − price[a]
+    pvar:  np.ndarray                     # P EWMA spread variance
+    last:  str = ""                       # last hour folded in, UTC 'YYYY-MM-DDTHH:00:00Z'
+    halflife: float = HALFLIFE_H
+
+    @classmethod
+    def empty(cls, halflife: float = HALFLIFE_H) -> "PriceWatch":
+        f, i = np.empty(0), np.empty(0, np.int64)
+        return cls(np.empty(0, str), np.empty(0, str), f, f, i, f, f,
+                   np.empty((0, len(EDGES) + 1), np.float32), i, i, i, f, f, "", halflife)
+
+    @property
+    def alpha(self) -> float:
+        return 1.0 - 0.5 ** (1.0 / self.halflife)
+
+    # ───────────────────────── persistence ─────────────────────────
+    def save(self, path: str | pathlib.Path = STATE) -> pathlib.Path:
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, **{f.name: np.asarray(getattr(self, f.name)) for f in fields(self)})
+        return path
+
+    @classmethod
+    def load(cls, path: str | pathlib.Path = STATE) -> "PriceWatch":
+        with np.load(path, allow_pickle=False) as z:
+            kw = {f.name: z[f.name] for f in fields(cls)}
+        return cls(**{**kw, "last": str(kw["last"]), "halflife": float(kw["halflife"])})
+
+    # ───────────────────────── barras / pairs ─────────────────────────
+    def add_barras(self, ids: Sequence[str], names: Sequence[str],
+                   lat: Sequence[float], lon: Sequence[float]) -> np.ndarray:
+        """State column of each id, appending the ones not seen before."""
+        ids = np.asarray(ids, dtype=str)
+        col = {k: i for i, k in enumerate(self.ids.tolist())}
+        new = np.array([k not in col for k in ids.tolist()], dtype=bool)
+        k = new.sum()
+        if k:
+            col.update((x, len(self.ids) + j) for j, x in enumerate(ids[new].tolist()))
+            self.ids = np.r_[self.ids, ids[new]]
+            self.names = np.r_[self.names, np.asarray(names, dtype=str)[new]]
+            self.lat = np.r_[self.lat, np.asarray(lat, dtype=float)[new]]
+            self.lon = np.r_[self.lon, np.asarray(lon, dtype=float)[new]]
+            self.n = np.r_[self.n, np.zeros(k, np.int64)]
+            self.mean = np.r_[self.mean, np.zeros(k)]
+            self.var = np.r_[self.var, np.zeros(k)]
+            self.hist = np.r_[self.hist, np.zeros((k, self.hist.shape[1]), np.float32)]
+        return np.array([col[x] for x in ids.tolist()], dtype=np.int64)
+
+    def set_pairs(self, a: np.ndarray, b: np.ndarray) -> None:
+        """Replace the neighbour pairs; pairs already tracked keep their stats."""
+        a, b = np.minimum(a, b).astype(np.int64), np.maximum(a, b).astype(np.int64)
+        K = max(len(self.ids), 1)
+        old = {k: i for i, k in enumerate((self.pa * K + self.pb).tolist())}
+        at = np.array([old.get(k, -1) for k in (a * K + b).tolist()], dtype=np.int64)
+        kept = at >= 0
+        take = lambda x, fill: np.where(kept, x[np.maximum(at, 0)] if len(x) else fill, fill)
+        self.pn = take(self.pn, 0).astype(np.int64)
+        self.pmean, self.pvar = take(self.pmean, 0.0), take(self.pvar, 0.0)
+        self.pa, self.pb = a, b
+
+    # ───────────────────────────── update ─────────────────────────────
+    def quantile(self, q: float, rows: np.ndarray) -> np.ndarray:
+        """Rolling q-quantile of the given barras, interpolated inside its bin."""
+        h = self.hist[rows].astype(np.float64)
+        cum = np.cumsum(h, axis=1)
+        target = q * cum[:, -1]
+        j = np.minimum((cum < target[:, None]).sum(axis=1), h.shape[1] - 1)
+        r = np.arange(len(rows))
+        mass = h[r, j]
+        frac = np.divide(target - (cum[r, j] - mass), mass, out=np.zeros_like(mass), where=mass > 0)
+        return _LO[j] + np.clip(frac, 0, 1) * (_HI[j] - _LO[j])
+
+    def step(self, hour: str, x: np.ndarray) -> list[dict]:
+        """Fold in one hour (K prices, NaN = none); returns that hour's alerts."""
+        a = self.alpha
+        alerts = []
+        rows = np.flatnonzero(~np.isnan(x))
+        v = x[rows]
+        m, s2, n = self.mean[rows], self.var[rows], self.n[rows]
+        sd = np.sqrt(s2)
+        q = self.quantile(Q, rows)
+        spike = (n >= WARMUP) & (v - m > np.maximum(MIN_JUMP, Z * sd)) & (v > q)
+        for i in np.flatnonzero(spike).tolist():
+            k = rows[i]
+            alerts.append({"ts": hour, "kind": "spike", "id": str(self.ids[k]),
+                           "barra": str(self.names[k]), "price": round(float(v[i]), 2),
+                           "mean": round(float(m[i]), 2), "q": round(float(q[i]), 2),
+                           "z": round(float((v[i] - m[i]) / sd[i]), 1) if sd[i] > 0 else None,
+                           "lat": _f(self.lat[k]), "lon": _f(self.lon[k])})
+        d = v - m
+        first = n == 0
+        self.mean[rows] = np.where(first, v, m + a * d)
+        self.var[rows] = np.where(first, 0.0, (1 - a) * (s2 + a * d * d))
+        self.hist[rows] *= np.float32(1 - a)
+        self.hist[rows, np.searchsorted(EDGES, v, side="right")] += np.float32(a)
+        self.n[rows] = n + 1
+
+        if len(self.pa):
+            xa, xb = x[self.pa], x[self.pb]
+            both = np.flatnonzero(~np.isnan(xa) & ~np.isnan(xb))
+            s = xb[both] - xa[both]
+            pm, pv, pn = self.pmean[both], self.pvar[both], self.pn[both]
+            level = (np.abs(xa[both]) + np.abs(xb[both])) / 2
+            dev = s - pm
+            dec = ((pn >= WARMUP) & (np.abs(s) > np.maximum(DECOUPLE_MIN, DECOUPLE_REL * level))
+                   & (np.abs(dev) > np.maximum(DECOUPLE_MIN, Z * np.sqrt(pv))))
+            for i in np.flatnonzero(dec).tolist():
+                p = both[i]
+                ka, kb = self.pa[p], self.pb[p]
+                alerts.append({"ts": hour, "kind": "decoupling", "id": str(self.ids[ka]),
+                               "barra": str(self.names[ka]), "price": round(float(xa[p]), 2),
+                               "other": str(self.ids[kb]), "other_barra": str(self.names[kb]),
+                               "other_price": round(float(xb[p]), 2),
+                               "spread": round(float(s[i]), 2), "mean": round(float(pm[i]), 2),
+                               "z": round(float(dev[i] / np.sqrt(pv[i])), 1) if pv[i] > 0 else None,
+                               "lat": _f(self.lat[ka]), "lon": _f(self.lon[ka]),
+                               "lat2": _f(self.lat[kb]), "lon2": _f(self.lon[kb])})
+            first = pn == 0
+            self.pmean[both] = np.where(first, s, pm + a * dev)
+            self.pvar[both] = np.where(first, 0.0, (1 - a) * (pv + a * dev * dev))
+            self.pn[both] = pn + 1
+
+        self.last = hour
+        return alerts
+
+    def run(self, hours: Sequence[str], prices: np.ndarray) -> list[dict]:
+        """Fold in an H×K block in hour order, skipping hours ≤ last."""
+        alerts = []
+        for h, x in zip(hours, np.asarray(prices, dtype=np.float64)):
+            if h > self.last:
+                alerts += self.step(h, x)
+        return alerts
+
+def _f(x: float) -> float | None:
+    return None if x != x else round(float(x), 5)
@@ -0,0 +1,334 @@
+"""
+Static HTTP/1.1 server for the pipeline's artifacts, standard library only.
+
+The viewer reads large files (lines.geojson, sen_graph.bin, price and
+heatmap outputs) that the Vite dev server sends whole and uncompressed.
+This server, on asyncio streams with keep-alive connections:
+
+  • picks a precompressed sibling (x.br, x.gz) by Accept-Encoding when it
+    is at least as new as x; precompress() writes them
+  • honours single-range requests (Range / If-Range) on the identity
+    bytes, so packed binaries can be read piecewise
+  • sets a strong ETag per representation from a hash of its bytes and
+    answers If-None-Match with 304
+  • keeps hot files in a byte-bounded LRU; files above `max_item` are
+    streamed from disk in CHUNK reads and never cached
+
+    server = ArtifactServer(["public", "data/processed"], cache_bytes=256 << 20)
+    asyncio.run(server.serve("127.0.0.1", 8008))
+
+Cache entries are keyed by (path, size, mtime), so a rewritten artifact is
+a miss on its next request and the stale bytes age out of the LRU.
+"""
+from __future__ import annotations
+import asyncio, email.utils, gzip, hashlib, mimetypes, pathlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+from urllib.parse import unquote, urlsplit
+
+ROOTS       = ("public", "data/processed")
+PORT        = 8008
+CACHE_BYTES = 256 << 20
+MAX_ITEM    = 32 << 20                    # larger files are streamed, not cached
+CHUNK       = 1 << 20
+MAX_HEAD    = 16 << 10                    # request line + headers
+ENCODINGS   = (("br", ".br"), ("gzip", ".gz"))       # server preference
+COMPRESSIBLE = {".json", ".geojson", ".jsonl", ".csv", ".tsv", ".txt", ".html",
+                ".svg", ".js", ".css", ".xml", ".bin"}
+TYPES = {".geojson": "application/geo+json", ".jsonl": "application/x-ndjson",
+         ".bin": "application/octet-stream", ".npz": "application/octet-stream",
+         ".parquet": "application/vnd.apache.parquet", ".pbf": "application/x-protobuf"}
+REASON = {200: "OK", 206: "Partial Content", 304: "Not Modified", 400: "Bad Request",
+          404: "Not Found", 405: "Method Not Allowed", 416: "Range Not Satisfiable",
+          500: "Internal Server Error"}
+
+# ─────────────────────────── cache ───────────────────────────
+class LRU:
+    """Byte-bounded least-recently-used map of file contents."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes, self.bytes = max_bytes, 0
+        self.hits = self.misses = 0
+        self._d: OrderedDict[tuple, bytes] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._d)
+
+    def get(self, key: tuple) -> bytes | None:
+        data = self._d.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self._d.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def put(self, key: tuple, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        if key in self._d:
+            self.bytes -= len(self._d.pop(key))
+        self._d[key] = data
+        self.bytes += len(data)
+        while self.bytes > self.max_bytes:
+            _, old = self._d.popitem(last=False)
+            self.bytes -= len(old)
+
+# ─────────────────────── representations ───────────────────────
+@dataclass(frozen=True)
+class Rep:
+    """One file on disk serving a URL, possibly content-encoded."""
+    path:     pathlib.Path
+    size:     int
+    mtime_ns: int
+    encoding: str | None = None
+
+    @classmethod
+    def of(cls, path: pathlib.Path, encoding: str | None = None) -> "Rep | None":
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return cls(path, st.st_size, st.st_mtime_ns, encoding)
+
+    @property
+    def key(self) -> tuple:
+        return str(self.path), self.size, self.mtime_ns
+
+def accepted(header: str) -> set[str]:
+    """Codings with q > 0 in an Accept-Encoding header ('*' kept as is)."""
+    out = set()
+    for part in header.split(","):
+        name, *params = (p.strip() for p in part.split(";"))
+        q = next((p[2:] for p in params if p.startswith("q=")), "1")
+        try:
+            if name and float(q) > 0:
+                out.add(name.lower())
+        except ValueError:
+            continue
+    return out
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None | bool:
+    """(first, last) byte of a single 'bytes=' range; None to ignore, False if unsatisfiable."""
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None                               # other units / multipart: send it all
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:                             # suffix: the last N bytes
+            n = int(last)
+            return (max(size - n, 0), size - 1) if n > 0 and size else False
+        a = int(first)
+        b = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    return (a, b) if a <= b and a < size else False
+
+def content_type(path: pathlib.Path) -> str:
+    t = TYPES.get(path.suffix.lower()) or mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    return f"{t}; charset=utf-8" if t.startswith("text/") or t.endswith(("json", "+xml")) else t
+
+# ─────────────────────────── server ───────────────────────────
+class ArtifactServer:
+    def __init__(self, roots: Sequence[str | pathlib.Path] = ROOTS, *,
+                 cache_bytes: int = CACHE_BYTES, max_item: int = MAX_ITEM):
+        self.roots = [pathlib.Path(r).resolve() for r in roots]
+        self.cache = LRU(cache_bytes)
+        self.max_item = min(max_item, cache_bytes)
+        self.requests = 0
+        self._etags: dict[tuple, str] = {}
+
+    # ── lookup ──
+    def resolve(self, target: str) -> pathlib.Path | None:
+        """First root holding the URL path as a regular file, never outside a root."""
+        rel = unquote(urlsplit(target).path).lstrip("/")
+        if not rel or "\0" in rel:
+            return None
+        for root in self.roots:
+            p = (root / rel).resolve()
+            if p.is_relative_to(root) and p.is_file():
+                return p
+        return None
+
+    def choose(self, path: pathlib.Path, accept: str) -> Rep | None:
+        """Best fresh precompressed sibling the client accepts, else the file itself."""
+        ident = Rep.of(path)
+        if ident is None:
+            return None
+        ok = accepted(accept)
+        for coding, suffix in ENCODINGS:
+            if coding in ok or "*" in ok:
+                rep = Rep.of(path.with_name(path.name + suffix), coding)
+                if rep is not None and rep.mtime_ns >= ident.mtime_ns:
+                    return rep
+        return ident
+
+    async def body(self, rep: Rep) -> bytes | None:
+        """Whole file, through the LRU; None above max_item (stream it instead)."""
+        if rep.size > self.max_item:
+            return None
+        data = self.cache.get(rep.key)
+        if data is None:
+            data = await asyncio.to_thread(rep.path.read_bytes)
+            self.cache.put(rep.key, data)
+            self._etags.setdefault(rep.key, _etag(hashlib.blake2b(data, digest_size=16)))
+        return data
+
+    async def etag(self, rep: Rep, data: bytes | None) -> str:
+        if (tag := self._etags.get(rep.key)) is None:
+            if data is not None:
+                tag = _etag(hashlib.blake2b(data, digest_size=16))
+            else:
+                tag = await asyncio.to_thread(_hash_file, rep.path)
+            self._etags[rep.key] = tag
+        return tag
+
+    # ── HTTP ──
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                line, *lines = head.decode("latin-1").split("\r\n")
+                parts = line.split(" ")
+                if len(parts) != 3:
+                    await self._send(writer, 400, {}, b"", keep=False)
+                    break
+                method, target, version = parts
+                headers = {}
+                for h in lines:
+                    k, sep, v = h.partition(":")
+                    if sep:
+                        headers[k.strip().lower()] = v.strip()
+                if n := int(headers.get("content-length") or 0):
+                    await reader.readexactly(n)
+                conn = headers.get("connection", "").lower()
+                keep = conn != "close" if version == "HTTP/1.1" else conn == "keep-alive"
+                self.requests += 1
+                try:
+                    await self.respond(writer, method, target, headers, keep)
+                except (ConnectionError, asyncio.CancelledError):
+                    break
+                except Exception:                 # keep serving other requests
+                    await self._send(writer, 500, {}, b"", keep=False)
+                    break
+                if not keep:
+                    break
+        finally:
+            writer.close()
+
+    async def respond(self, writer: asyncio.StreamWriter, method: str, target: str,
+                      headers: dict[str, str], keep: bool) -> None:
+        if method not in ("GET", "HEAD"):
+            return await self._send(writer, 405, {"Allow": "GET, HEAD"}, b"", keep)
+        path = self.resolve(target)
+        rng = headers.get("range")
+        rep = path and self.choose(path, "" if rng else headers.get("accept-encoding", ""))
+        if rep is None:
+            return await self._send(writer, 404, {}, b"", keep)
+
+        data = await self.body(rep)
+        tag = await self.etag(rep, data)
+        h = {"Content-Type": content_type(path), "ETag": tag,
+             "Last-Modified": email.utils.formatdate(rep.mtime_ns / 1e9, usegmt=True),
+             "Cache-Control": "no-cache", "Vary": "Accept-Encoding", "Accept-Ranges": "bytes",
+             "Access-Control-Allow-Origin": "*",
+             "Access-Control-Expose-Headers": "ETag, Content-Range, Content-Encoding, Accept-Ranges"}
+        if rep.encoding:
+            h["Content-Encoding"] = rep.encoding
+        inm = headers.get("if-none-match")
+        if inm and (inm.strip() == "*" or tag in (t.strip() for t in inm.split(","))):
+            return await self._send(writer, 304, h, b"", keep, length=False)
+
+        first, last, status = 0, rep.size - 1, 200
+        if rng and headers.get("if-range", tag) == tag:
+            r = parse_range(rng, rep.size)
+            if r is False:
+                h["Content-Range"] = f"bytes */{rep.size}"
+                return await self._send(writer, 416, h, b"", keep)
+            if r is not None:
+                (first, last), status = r, 206
+                h["Content-Range"] = f"bytes {first}-{last}/{rep.size}"
+        n = max(last - first + 1, 0)
+        if method == "HEAD":
+            return await self._send(writer, status, h, b"", keep, length=n)
+        if data is not None:
+            return await self._send(writer, status, h, memoryview(data)[first:last + 1], keep)
+
+        await self._send(writer, status, h, b"", keep, length=n)
+        with open(rep.path, "rb") as f:
+            f.seek(first)
+            while n > 0:
+                chunk = await asyncio.to_thread(f.read, min(CHUNK, n))
+                if not chunk:
+                    break
+                writer.write(chunk)
+                await writer.drain()
+                n -= len(chunk)
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, status: int, headers: dict[str, str],
+                    body: bytes | memoryview, keep: bool, *, length: int | bool | None = None) -> None:
+        """Status line, headers and body; `length` overrides Content-Length (False: none)."""
+        h = dict(headers)
+        if length is not False:
+            h["Content-Length"] = str(len(body) if length is None else length)
+        h["Connection"] = "keep-alive" if keep else "close"
+        head = f"HTTP/1.1 {status} {REASON[status]}\r\n" + "".join(f"{k}: {v}\r\n" for k, v in h.items())
+        writer.write(head.encode("latin-1") + b"\r\n")
+        if body:
+            writer.write(body)
+        await writer.drain()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = PORT) -> None:
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEAD)
+        async with server:
+            await server.serve_forever()
+
+def _etag(h: "hashlib._Hash") -> str:
+    return f'"{h.hexdigest()}"'
+
+def _hash_file(path: pathlib.Path) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK):
+            h.update(chunk)
+    return _etag(h)
+
+# ─────────────────────── precompression ───────────────────────
+def precompress(roots: Iterable[str | pathlib.Path] = ROOTS, *, min_bytes: int = 1024,
+                force: bool = False) -> list[pathlib.Path]:
+    """Write x.gz (and x.br with the optional `brotli` package) next to each
+    compressible artifact ≥ min_bytes, unless a fresh one exists or it would
+    not be ≥ 10 % smaller.  Returns the files written."""
+    try:
+        import brotli
+    except ImportError:                       # pip install brotli
+        brotli = None
+    coders = [(".gz", lambda b: gzip.compress(b, 9, mtime=0))]
+    if brotli is not None:
+        coders.insert(0, (".br", lambda b: brotli.compress(b, quality=11)))
+    out = []
+    for root in roots:
+        for p in sorted(pathlib.Path(root).rglob("*")):
+            if p.suffix.lower() not in COMPRESSIBLE or not p.is_file():
+                continue
+            st = p.stat()
+            if st.st_size < min_bytes:
+                continue
+            data = None
+            for suffix, enc in coders:
+                dst = p.with_name(p.name + suffix)
+                if not force and dst.exists() and dst.stat().st_mtime_ns >= st.st_mtime_ns:
+                    continue
+                data = data if data is not None else p.read_bytes()
+                packed = enc(data)
+                if len(packed) <= 0.9 * len(data):
+                    dst.write_bytes(packed)
+                    out.append(dst)
+                elif dst.exists():
+                    dst.unlink()                  # stale variant of a now-incompressible file
+    return out
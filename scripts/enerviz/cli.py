@@ -0,0 +1,74 @@
+"""
+enerviz – one entry point for every pipeline script.
+
+    enerviz --help
+    enerviz fetch list
+    enerviz ingest --xlsx data/raw/instalaciones_activos.xlsx --shp data/raw/Lineas_220
+    enerviz annotate && enerviz tessellate
+
+Each subcommand runs the existing script in-process (runpy), so its own
+argparse options, prints and stage metrics stay exactly as before.  This
+module imports nothing but the standard library: geopandas, networkx,
+duckdb, pyvis, … are loaded by the script of the chosen subcommand only,
+which keeps ``--help`` and ``fetch list`` well under 200 ms.
+"""
+from __future__ import annotations
+import argparse, pathlib, runpy, sys
+
+SCRIPTS = pathlib.Path(__file__).resolve().parents[1]
+
+# name: (script relative to scripts/, has its own argparse CLI, help)
+COMMANDS: dict[str, tuple[str, bool, str]] = {
+    "fetch":      ("fetch_sip.py",                             True,  "descarga datasets SIP (list | fetch | peek)"),
+    "ingest":     ("etl/01_ingest_inventory.py",               True,  "Excel + shapefiles IDE → inventory.duckdb"),
+    "diff":       ("inventory_diff.py",                        True,  "cambios entre snapshots del inventario"),
+    "graph":      ("etl/02_build_transmission_graph.py",       True,  "grafo de transmisión y métricas"),
+    "review":     ("etl/03_review_shapefile.py",               True,  "shapefile IDE vs inventario maestro"),
+    "kg":         ("etl/04_build_knowledge_graph.py",          True,  "knowledge graph del SEN (GEXF)"),
+    "query":      ("kg_query.py",                              True,  "consultas jerárquicas sobre el KG"),
+    "graphbin":   ("etl/12_export_graph_binary.py",            True,  "grafo Barra–Tramo → sen_graph.bin (visor, N-1)"),
+    "graphml":    ("etl/05_export_graphml.py",                 True,  "knowledge graph → GraphML"),
+    "pyvis":      ("etl/06_export_pyvis.py",                   True,  "knowledge graph → HTML PyVis"),
+    "resilience": ("etl/07_visualize_resilience_graph.py",     True,  "grafo de resiliencia Empresa→Línea→S/E (o una vista por empresa)"),
+    "subgraph":   ("etl/07_visualize_subgraph.py",             True,  "subgrafo del KG a k saltos de semillas → HTML PyVis"),
+    "flow":       ("etl/08_dc_power_flow.py",                  True,  "flujo DC horario por tramo → line_flows.json"),
+    "cascade":    ("etl/09_cascade_outages.py",                True,  "fallas en cascada (LODF) sobre el modelo DC"),
+    "congestion": ("etl/10_price_congestion.py",              True,  "congestión por separación de CMg → line_congestion.json"),
+    "feeds":      ("etl/11_ingest_sip_feeds.py",               True,  "feeds SIP descargados → Parquet por mes"),
+    "anomalies":  ("etl/13_detect_price_anomalies.py",         True,  "peaks de CMg y desacoples entre vecinas → cmg_alerts.jsonl"),
+    "generation": ("extract_generation_barras.py",             False, "barras con generación → public/"),
+    "annotate":   ("annotate_lines.py",                        False, "shapefile → lines_barras.geojson"),
+    "tessellate": ("tessellate_lines.py",                      False, "trocea líneas para el globo"),
+    "shp2geojson": ("shp2geojson.py",                          False, "shapefile → GeoJSON simplificado"),
+    "lookup":     ("build_barra_lookup.py",                    False, "nombres de barra → ids del inventario"),
+    "prices":     ("make_price_sample.py",                     False, "muestra horaria de CMg para el visor"),
+    "heatmap":    ("make_price_heatmap.py",                    True,  "teselas horarias de CMg"),
+    "report":     ("pipeline_report.py",                       True,  "resumen de tiempos por etapa"),
+    "serve":      ("serve_artifacts.py",                       True,  "servidor HTTP de public/ y data/processed (.br/.gz, Range, ETag)"),
+    "loadtest":   ("loadtest_artifacts.py",                    True,  "prueba de carga local del servidor de artefactos"),
+}
+
+def run(name: str, argv: list[str]) -> None:
+    """Run one subcommand's script as __main__ with argv as its arguments."""
+    script = SCRIPTS / COMMANDS[name][0]
+    if str(SCRIPTS) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS))       # scripts import enerviz.*
+    sys.argv = [str(script), *argv]
+    runpy.run_path(str(script), run_name="__main__")
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(
+        prog="enerviz",
+        description="Pipeline de datos EnerViz: un subcomando por script.",
+    )
+    sub = ap.add_subparsers(dest="cmd", required=True, metavar="<comando>")
+    for name, (_, own_cli, help_) in COMMANDS.items():
+        # scripts with their own argparse handle --help and the rest of argv
+        sub.add_parser(name, help=help_, add_help=not own_cli)
+    args, rest = ap.parse_known_args(argv)
+    if rest and not COMMANDS[args.cmd][1]:
+        ap.error(f"{args.cmd} no acepta argumentos: {' '.join(rest)}")
+    run(args.cmd, rest)
+
+if __name__ == "__main__":
+    main()
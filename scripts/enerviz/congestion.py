@@ -0,0 +1,148 @@
+"""
+Congestion from marginal-price separation on the CSR transmission graph.
+
+Only some barras publish a CMg.  Every barra of the graph is assigned to its
+nearest priced barra (multi-source Dijkstra over tramo length), which splits
+the grid into price zones.  A tramo whose ends fall in different zones a, b
+sits on the boundary between them; the corridor a–b is every such boundary
+tramo plus the shortest-path tramos leading from it back to a and to b:
+
+    cor = Corridors.from_graph(g, priced)          # priced: graph node per price column
+    st  = spread_stats(prices, cor.a, cor.b)       # prices: H×K, NaN = missing
+
+The price matrix is compared column-wise in one pass, H hours × C corridors:
+an hour is congested when |CMg_b − CMg_a| exceeds both an absolute floor
+and a share of the mean price (losses alone separate prices a little).
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from enerviz.graph import CSRGraph
+
+MIN_SPREAD = 1.0                          # USD/MWh
+REL_SPREAD = 0.05                         # of the mean of both prices
+BLOCK      = 1024                         # corridors per pass (bounds the H×C temporaries)
+
+@dataclass
+class Corridors:
+    a: np.ndarray                         # C price column of one end (a < b)
+    b: np.ndarray                         # C price column of the other end
+    tramos: list[np.ndarray]              # C edge indices on each corridor
+    zone: np.ndarray                      # N price column of the nearest priced barra, −1 if none
+    boundary: np.ndarray                  # E corridor of a boundary tramo, −1 inside a zone
+
+    @classmethod
+    def from_graph(cls, g: "CSRGraph", priced: np.ndarray,
+                   length_km: np.ndarray | None = None) -> "Corridors":
+        """Zones and corridors for the priced graph nodes (one per price column)."""
+        from scipy import sparse
+        from scipy.sparse.csgraph import dijkstra
+
+        priced = np.asarray(priced, dtype=np.int64)
+        km = g.attrs.get("length_km", g.geometry.lengths_km()) if length_km is None else length_km
+        km = np.asarray(km, dtype=float)
+        known = np.isfinite(km) & (km > 0)
+        km = np.maximum(np.where(known, km, np.median(km[known]) if known.any() else 1.0), 0.01)
+
+        # shortest parallel circuit per node pair (coo would add them up)
+        lo, hi = np.minimum(g.u, g.v), np.maximum(g.u, g.v)
+        order = np.lexsort((km, hi, lo))
+        order = order[lo[order] != hi[order]]
+        first = np.r_[True, (lo[order][1:] != lo[order][:-1]) | (hi[order][1:] != hi[order][:-1])]
+        pick = order[first]
+        adj = sparse.csr_matrix((km[pick], (lo[pick], hi[pick])), shape=(g.n_nodes,) * 2)
+
+        col = np.full(g.n_nodes, -1, np.int64)
+        col[priced] = np.arange(len(priced))
+        if not len(priced):
+            return cls(np.empty(0, np.int64), np.empty(0, np.int64), [], col,
+                       np.full(g.n_edges, -1, np.int64))
+        _, pred, src = dijkstra(adj, directed=False, indices=priced, min_only=True,
+                                return_predecessors=True)
+        zone = np.where(src >= 0, col[np.maximum(src, 0)], -1)
+
+        za, zb = zone[g.u], zone[g.v]
+        cross = (za >= 0) & (zb >= 0) & (za != zb)
+        keys = np.minimum(za, zb)[cross] * len(priced) + np.maximum(za, zb)[cross]
+        uniq, which = np.unique(keys, return_inverse=True)
+        boundary = np.full(g.n_edges, -1, np.int64)
+        boundary[cross] = which
+
+        # each boundary tramo + the tramos back to both zone centres
+        members: list[set[int]] = [set() for _ in uniq]
+        for e, c in zip(np.flatnonzero(cross).tolist(), which.tolist()):
+            members[c].add(e)
+            for n in (int(g.u[e]), int(g.v[e])):
+                while (p := pred[n]) >= 0:
+                    nb, eids = g.neighbours(n)
+                    members[c].update(eids[nb == p].tolist())
+                    n = p
+        tramos = [np.array(sorted(m), dtype=np.int64) for m in members]
+        return cls(uniq // len(priced), uniq % len(priced), tramos, zone, boundary)
+
+    def __len__(self) -> int:
+        return len(self.a)
+
+    def per_tramo(self, score: np.ndarray, n_edges: int) -> np.ndarray:
+        """E corridor index for each tramo, the highest-`score` one if several, −1 if none."""
+        out = np.full(n_edges, -1, np.int64)
+        for c in np.argsort(-np.nan_to_num(score, nan=-np.inf), kind="stable"):
+            t = self.tramos[c]
+            t = t[out[t] < 0]
+            out[t] = c
+        return out
+
+def barra_nodes(g: "CSRGraph", ids: "pd.Series", db_path: str) -> "pd.Series":
+    """Inventory barra id → graph node: the barra itself, else one of its substation's."""
+    import pandas as pd
+    from enerviz.inventory import connect
+
+    index = g.index
+    con = connect(db_path)
+    sub = con.execute("SELECT id, subestacion_id FROM inv.barra").df().set_index("id")["subestacion_id"]
+    con.close()
+    in_graph = sub[sub.index.isin(index)]
+    by_sub = {s: index[i] for i, s in zip(in_graph.index, in_graph) if pd.notna(s)}
+    return ids.map(lambda i: index.get(i, by_sub.get(sub.get(i))))
+
+def spread_stats(prices: np.ndarray, a: np.ndarray, b: np.ndarray, *,
+                 min_spread: float = MIN_SPREAD, rel_spread: float = REL_SPREAD,
+                 block: int = BLOCK) -> dict[str, np.ndarray]:
+    """Per corridor over the H×K price matrix (NaN = no price that hour).
+
+    spread = CMg_b − CMg_a, so a positive mean means b is dearer and the
+    corridor tends to be loaded from a towards b.  Returns C-arrays:
+    hours (both ends priced), congested (hours above the threshold),
+    freq, mean_abs, mean_signed, p95_abs, max_abs.
+    """
+    prices = np.asarray(prices, dtype=np.float32)
+    C = len(a)
+    out = {k: np.full(C, np.nan) for k in ("freq", "mean_abs", "mean_signed", "p95_abs", "max_abs")}
+    out["hours"] = np.zeros(C, np.int64)
+    out["congested"] = np.zeros(C, np.int64)
+    for lo in range(0, C, block):
+        s = slice(lo, min(lo + block, C))
+        pa, pb = prices[:, a[s]], prices[:, b[s]]
+        d = pb - pa
+        ad = np.abs(d)
+        valid = ~np.isnan(d)
+        thr = np.maximum(min_spread, rel_spread * 0.5 * (np.abs(pa) + np.abs(pb)))
+        n = valid.sum(axis=0)
+        hot = (ad > thr).sum(axis=0)                        # NaN compares False
+        out["hours"][s], out["congested"][s] = n, hot
+        has = n > 0
+        if not has.any():
+            continue
+        idx = np.arange(s.start, s.stop)[has]
+        dz, adz = np.where(valid, d, 0)[:, has], np.where(valid, ad, 0)[:, has]
+        out["freq"][idx] = hot[has] / n[has]
+        out["mean_abs"][idx] = adz.sum(axis=0) / n[has]
+        out["mean_signed"][idx] = dz.sum(axis=0) / n[has]
+        out["max_abs"][idx] = np.where(valid, ad, -np.inf)[:, has].max(axis=0)
+        out["p95_abs"][idx] = np.nanpercentile(ad[:, has], 95, axis=0)
+    return out
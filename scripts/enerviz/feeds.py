@@ -0,0 +1,286 @@
+"""
+Typed, month-partitioned Parquet tables for the SIP operation feeds.
+
+fetch_sip.py saves each download as a pipe-separated gzip CSV with the
+portal's own column names.  normalize() reads every file of a feed in one
+DuckDB scan, resolves the column spellings (like enerviz.inventory does
+for the workbook) and writes
+
+    data/curated/sip/<feed>/month=YYYY-MM/*.parquet
+    data/curated/sip/names.parquet        feed, name, id, score
+
+Every table shares one time axis, ``ts`` = start of the hour (sub-hourly
+readings are averaged, 1–24 "hora" columns shifted to 0–23), and carries
+the inventory id of its entity, resolved once per distinct spelling:
+
+  demanda              ts, barra_id, name, mw
+  generacion           ts, barra_id, name, mw     (barra = connection point)
+  potencia_transitada  ts, linea_id, name, mw
+  embalses             ts, name, cota_msnm, volumen
+
+Readers scan the partitions, so a month filter only touches that month:
+
+    con = connect()
+    con.execute("SELECT * FROM sip.demanda WHERE month = '2025-03'")
+    hours, mw = matrix("demanda", g.index, "barra_id", month="2025-03")   # N×T
+"""
+from __future__ import annotations
+import pathlib, re, shutil
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+from enerviz.inventory import INVENTORY
+
+if TYPE_CHECKING:
+    import duckdb
+    import numpy as np
+    import pandas as pd
+    from enerviz.names import BarraResolver
+
+RAW   = pathlib.Path(__file__).resolve().parents[1] / "data"   # fetch_sip.py DATA_DIR
+SIP   = pathlib.Path("data/curated/sip")
+NAMES = "names.parquet"
+SCHEMA = "sip"
+
+# first time spellings are full timestamps; HOUR ones carry the hour of a date
+TIME  = ("fecha_hora", "fechahora", "timestamp", "datetime", "fecha")
+HOUR  = ("hora", "hr")
+TIME_FORMATS = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d",
+                "%d-%m-%Y %H:%M:%S", "%d-%m-%Y %H:%M", "%d-%m-%Y",
+                "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y"]
+
+@dataclass(frozen=True)
+class Feed:
+    files:   str                                      # glob of fetch_sip.py outputs
+    entity:  str                                      # barra | central | linea | embalse
+    names:   tuple[str, ...]                          # spellings of the entity column
+    values:  dict[str, tuple[str, ...]]               # canonical value: spellings
+
+FEEDS: dict[str, Feed] = {
+    "demanda": Feed("demanda_real_*.csv.gz", "barra",
+                    ("barra", "nombre_barra", "subestacion"),
+                    {"mw": ("demanda_mw", "demanda", "mw", "valor")}),
+    "generacion": Feed("generacion_*.csv.gz", "central",
+                       ("central", "nombre_central", "planta", "unidad"),
+                       {"mw": ("generacion_mw", "generacion", "mwh", "mw", "valor")}),
+    "potencia_transitada": Feed("pot_transitada_*.csv.gz", "linea",
+                                ("linea", "nombre_linea", "tramo", "instalacion"),
+                                {"mw": ("potencia_mw", "potencia", "flujo", "mw", "valor")}),
+    "embalses": Feed("embalses_*.csv.gz", "embalse",
+                     ("embalse", "nombre_embalse", "nombre"),
+                     {"cota_msnm": ("cota_msnm", "cota", "nivel"),
+                      "volumen": ("volumen", "vol")}),
+}
+ID_COLUMN = {"barra": "barra_id", "central": "barra_id", "linea": "linea_id"}
+
+# ───────────────────────── time axis ─────────────────────────
+TZ       = "America/Santiago"            # timestamps without a UTC offset are Chile time
+UTC_HOUR = "%Y-%m-%dT%H:00:00Z"
+
+def utc_hours(fecha: Iterable[str]) -> list[str | None]:
+    """Start of each timestamp's hour in UTC ('2025-03-01T17:00:00Z').
+
+    A timestamp with an offset keeps it; one without is Chile time with DST
+    (the repeated autumn hour is read as standard time, like DuckDB does).
+    The viewer's clock-driven layers (price orbs, heatmap, CMg alerts) all
+    use this one axis.  None where the text does not parse."""
+    import numpy as np
+    import pandas as pd
+
+    s = pd.Series(list(fecha), dtype=object).astype(str).str.strip().str.replace(" ", "T", n=1)
+    aware = s.str.contains(r"(?:Z|[+-]\d\d:?\d\d)$").to_numpy()
+    out = pd.Series(None, index=s.index, dtype=object)
+    if (~aware).any():
+        t = pd.to_datetime(s[~aware], format="ISO8601", errors="coerce").dt.floor("h")
+        t = t.dt.tz_localize(TZ, ambiguous=np.zeros(len(t), bool), nonexistent="shift_forward")
+        out[~aware] = t.dt.tz_convert("UTC").dt.strftime(UTC_HOUR)
+    if aware.any():
+        t = pd.to_datetime(s[aware], format="ISO8601", utc=True, errors="coerce")
+        out[aware] = t.dt.floor("h").dt.strftime(UTC_HOUR)
+    return [x if isinstance(x, str) else None for x in out]
+
+# ───────────────────────── resolution ─────────────────────────
+def _pick(columns: Sequence[str], spellings: Iterable[str]) -> str | None:
+    """Exact (case-insensitive) spelling first, then the first substring hit."""
+    lower = {c.lower(): c for c in columns}
+    spellings = tuple(spellings)
+    return (next((lower[s] for s in spellings if s in lower), None)
+            or next((c for s in spellings for c in columns if s in c.lower()), None))
+
+def resolve_columns(feed: str, columns: Sequence[str]) -> dict[str, str | None]:
+    """{time, hour, name, <values>: source column or None}; KeyError without time/name."""
+    spec = FEEDS[feed]
+    lower = {c.lower(): c for c in columns}
+    hour = next((lower[s] for s in HOUR if s in lower), None)
+    time = _pick([c for c in columns if c != hour], TIME)
+    out = {"time": time, "hour": hour, "name": _pick(columns, spec.names)}
+    taken = {time, hour, out["name"]}
+    for canon, spellings in spec.values.items():
+        out[canon] = _pick([c for c in columns if c not in taken], spellings)
+        taken.add(out[canon])
+    if missing := [k for k in ("time", "name") if out[k] is None]:
+        raise KeyError(f"{feed}: faltan columnas {missing} (hay {list(columns)})")
+    if not any(out[k] for k in spec.values):
+        raise KeyError(f"{feed}: ninguna columna de valores {list(spec.values)} (hay {list(columns)})")
+    return out
+
+def _q(col: str) -> str:
+    return '"' + col.replace('"', '""') + '"'
+
+def _num(col: str | None) -> str:
+    """'1.234,5' / '1234.5' / 1234.5 → DOUBLE."""
+    if col is None:
+        return "NULL::DOUBLE"
+    c = f"TRIM(CAST({_q(col)} AS VARCHAR))"
+    return (f"COALESCE(TRY_CAST({c} AS DOUBLE), "
+            f"TRY_CAST(replace(replace({c}, '.', ''), ',', '.') AS DOUBLE))")
+
+def _ts(m: dict[str, str | None], one_based: bool) -> str:
+    t = f"try_strptime(TRIM(CAST({_q(m['time'])} AS VARCHAR)), {TIME_FORMATS!r})"
+    if m["hour"] is None:
+        return f"date_trunc('hour', {t})"
+    h = f"TRY_CAST({_q(m['hour'])} AS INTEGER) - {int(one_based)}"
+    return f"date_trunc('day', {t}) + to_hours({h})"
+
+# ───────────────────────── name → id ─────────────────────────
+def resolver(entity: str, db_path: str | pathlib.Path = INVENTORY,
+             raw_dir: str | pathlib.Path = "data/raw") -> "BarraResolver | None":
+    """Name resolver for a feed entity; plants go through their connection barra."""
+    from enerviz.inventory import connect
+    from enerviz.names import BarraResolver
+
+    if entity == "barra":
+        return BarraResolver.from_inventory(db_path)
+    if entity == "linea":
+        con = connect(db_path)
+        df = con.execute("SELECT id, name FROM inv.linea").df()
+        con.close()
+        return BarraResolver(df["id"], df["name"])
+    if entity == "central":
+        return _PlantResolver(BarraResolver.from_inventory(db_path), raw_dir)
+    return None
+
+class _PlantResolver:
+    """Plant name → first connection barra of the 'Centrales' sheet → barra id.
+
+    Plants missing from the sheet (or without a workbook) are matched by
+    their own name, which BarraResolver only accepts above its min_score.
+    """
+    SHEET = "Centrales"
+    COL   = "11.1.2 Puntos de conexión al SI a través de los cuales inyecta energía."
+
+    def __init__(self, barras: "BarraResolver", raw_dir: str | pathlib.Path):
+        from enerviz.names import clean
+        from enerviz.workbook import find_workbook, read_sheet
+
+        self.barras, self.point = barras, {}
+        if xlsx := find_workbook(raw_dir, self.SHEET):
+            df = read_sheet(xlsx, self.SHEET, header=6)
+            name = _pick(list(map(str, df.columns)), ("nombre", "central"))
+            if name and self.COL in df.columns:
+                for n, p in zip(df[name], df[self.COL]):
+                    first = re.split(r"[;,/]| y | Y |-|\n", str(p))[0] if p == p else ""
+                    if clean(str(n)) and clean(first):
+                        self.point.setdefault(clean(str(n)), first)
+
+    def resolve_many(self, names: Iterable[str]) -> list:
+        from enerviz.names import clean
+        return self.barras.resolve_many(self.point.get(clean(str(n)), str(n)) for n in names)
+
+# ───────────────────────── ingest ─────────────────────────
+def normalize(feed: str, files: Sequence[str | pathlib.Path], out: str | pathlib.Path = SIP,
+              resolve: "BarraResolver | _PlantResolver | None" = None) -> tuple[int, "pd.DataFrame"]:
+    """Files of one feed → out/<feed>/month=*/…parquet; returns (rows, names table)."""
+    import duckdb
+    import pandas as pd
+
+    spec = FEEDS[feed]
+    con = duckdb.connect()
+    con.execute("""CREATE TEMP TABLE src AS SELECT * FROM read_csv(?, delim='|', header=true,
+                   all_varchar=true, union_by_name=true)""", [[str(f) for f in files]])
+    m = resolve_columns(feed, [r[0] for r in con.execute("DESCRIBE src").fetchall()])
+    one_based = bool(m["hour"]) and con.execute(         # CEN hours run 1–24
+        f"SELECT max(TRY_CAST({_q(m['hour'])} AS INTEGER)) = 24 FROM src").fetchone()[0] is True
+
+    values = list(spec.values)
+    con.execute(f"""
+        CREATE TEMP TABLE rows AS
+        SELECT {_ts(m, one_based)} AS ts, TRIM(CAST({_q(m['name'])} AS VARCHAR)) AS name,
+               {', '.join(f'{_num(m[v])} AS {v}' for v in values)}
+        FROM src
+    """)
+    con.execute("DELETE FROM rows WHERE ts IS NULL OR name IS NULL OR name = ''")
+
+    # each distinct spelling resolved once
+    names = con.execute("SELECT DISTINCT name FROM rows ORDER BY name").df()["name"]
+    hits = resolve.resolve_many(names) if resolve is not None else [None] * len(names)
+    table = pd.DataFrame({"feed": feed, "name": names,
+                          "id": [h.id if h else None for h in hits],
+                          "score": [h.score if h else None for h in hits]})
+    con.register("names", table)
+
+    id_col = ID_COLUMN.get(spec.entity)
+    key = f"n.id AS {id_col}, " if id_col else ""
+    dest = pathlib.Path(out) / feed
+    shutil.rmtree(dest, ignore_errors=True)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    con.execute(f"""
+        COPY (
+            SELECT r.ts, strftime(r.ts, '%Y-%m') AS month, {key}r.name,
+                   {', '.join(f'avg(r.{v}) AS {v}' for v in values)}
+            FROM rows r JOIN names n USING (name)
+            GROUP BY ALL
+            ORDER BY r.ts, r.name
+        ) TO '{dest}' (FORMAT PARQUET, PARTITION_BY (month), COMPRESSION zstd)
+    """)
+    n = con.execute(f"SELECT count(*) FROM read_parquet('{dest}/**/*.parquet')").fetchone()[0]
+    con.close()
+    return n, table
+
+def write_names(tables: Sequence["pd.DataFrame"], out: str | pathlib.Path = SIP) -> pathlib.Path:
+    """Merge per-feed name tables into out/names.parquet (other feeds' rows kept)."""
+    import pandas as pd
+
+    path = pathlib.Path(out) / NAMES
+    fresh = pd.concat(tables, ignore_index=True)
+    if path.exists():
+        old = pd.read_parquet(path)
+        fresh = pd.concat([old[~old["feed"].isin(fresh["feed"])], fresh], ignore_index=True)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fresh.to_parquet(path, index=False)
+    return path
+
+# ─────────────────────────── readers ───────────────────────────
+def connect(root: str | pathlib.Path = SIP) -> "duckdb.DuckDBPyConnection":
+    """In-memory connection with a sip.<feed> view per ingested feed."""
+    import duckdb
+
+    root = pathlib.Path(root)
+    con = duckdb.connect()
+    con.execute(f"CREATE SCHEMA {SCHEMA}")
+    for feed in FEEDS:
+        if any((root / feed).glob("month=*/*.parquet")):
+            con.execute(f"CREATE VIEW {SCHEMA}.{feed} AS SELECT * FROM "
+                        f"read_parquet('{root / feed}/*/*.parquet', hive_partitioning=true)")
+    if (root / NAMES).exists():
+        con.execute(f"CREATE VIEW {SCHEMA}.names AS SELECT * FROM read_parquet('{root / NAMES}')")
+    return con
+
+def matrix(feed: str, index: dict[str, int], id_col: str, value: str = "mw", *,
+           month: str | None = None, root: str | pathlib.Path = SIP) -> tuple[list[str], "np.ndarray"]:
+    """(hour labels 'YYYY-MM-DDTHH', len(index)×T matrix); rows with ids outside `index` dropped."""
+    import numpy as np
+
+    con = connect(root)
+    where = "WHERE month = ?" if month else ""
+    df = con.execute(f"""
+        SELECT strftime(ts, '%Y-%m-%dT%H') AS hour, {id_col} AS id, sum({value}) AS v
+        FROM {SCHEMA}.{feed} {where}
+        GROUP BY ALL
+    """, [month] if month else []).df()
+    con.close()
+    df = df[df["id"].isin(index)]
+    hours, col = np.unique(df["hour"].to_numpy(str), return_inverse=True)
+    out = np.zeros((len(index), len(hours)))
+    np.add.at(out, (df["id"].map(index).to_numpy(int), col), df["v"].fillna(0).to_numpy(float))
+    return hours.tolist(), out
@@ -0,0 +1,239 @@
+"""
+Transmission graph in CSR form with its edge geometry kept columnar.
+
+Edges are the inventory's tramos (parallel circuits stay separate edges);
+their shapefile polylines are stored GeoArrow-style as one contiguous
+coordinate buffer plus offsets, indexed by the same edge number the CSR
+adjacency points to:
+
+    edge e → parts  geom_offsets[e] : geom_offsets[e+1]
+    part p → coords part_offsets[p] : part_offsets[p+1]
+
+so per-edge length, bbox and midpoint are numpy reductions over the whole
+network, and the buffers can be written to a binary file as-is.
+
+    g = CSRGraph.load("data/processed/transmission_graph.npz")
+    nbr, e = g.neighbours(g.index["123"])
+    km = g.geometry.lengths_km()[e]
+"""
+from __future__ import annotations
+import pathlib
+from dataclasses import dataclass, field
+from typing import Sequence
+
+import numpy as np
+
+R_KM = 6371.0088
+
+def _haversine_km(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    lon1, lat1, lon2, lat2 = np.radians([a[:, 0], a[:, 1], b[:, 0], b[:, 1]])
+    h = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * R_KM * np.arcsin(np.sqrt(h))
+
+# ──────────────────────────── geometry ────────────────────────────
+@dataclass
+class Geometry:
+    """MultiLineString column (lon/lat, EPSG:4326); an edge may have 0 parts."""
+    coords: np.ndarray                    # K×2 float64
+    part_offsets: np.ndarray              # P+1 int64 into coords
+    geom_offsets: np.ndarray              # E+1 int64 into parts
+
+    @classmethod
+    def empty(cls, n: int) -> "Geometry":
+        return cls(np.empty((0, 2)), np.zeros(1, np.int64), np.zeros(n + 1, np.int64))
+
+    @classmethod
+    def from_wkt(cls, wkt: Sequence[str | None]) -> "Geometry":
+        """One (Multi)LineString WKT per edge, None/NaN for edges without one."""
+        import shapely
+
+        wkt = np.asarray([w if isinstance(w, str) else None for w in wkt], dtype=object)
+        geoms = shapely.from_wkt(wkt)                       # None stays None
+        parts, edge_of_part = shapely.get_parts(geoms, return_index=True)
+        coords, part_of_coord = shapely.get_coordinates(parts, return_index=True)
+        part_offsets = np.zeros(len(parts) + 1, np.int64)
+        np.cumsum(np.bincount(part_of_coord, minlength=len(parts)), out=part_offsets[1:])
+        geom_offsets = np.zeros(len(wkt) + 1, np.int64)
+        np.cumsum(np.bincount(edge_of_part, minlength=len(wkt)), out=geom_offsets[1:])
+        return cls(coords, part_offsets, geom_offsets)
+
+    def __len__(self) -> int:
+        return len(self.geom_offsets) - 1
+
+    @property
+    def has_geom(self) -> np.ndarray:
+        return np.diff(self.geom_offsets) > 0
+
+    def coords_of(self, e: int) -> list[np.ndarray]:
+        """The parts of one edge as K×2 views into the buffer."""
+        po = self.part_offsets
+        return [self.coords[po[p]:po[p + 1]]
+                for p in range(self.geom_offsets[e], self.geom_offsets[e + 1])]
+
+    def _edge_of_coord(self) -> tuple[np.ndarray, np.ndarray]:
+        """(edge, part) of every coordinate."""
+        part = np.repeat(np.arange(len(self.part_offsets) - 1), np.diff(self.part_offsets))
+        edge_of_part = np.repeat(np.arange(len(self)), np.diff(self.geom_offsets))
+        return edge_of_part[part], part
+
+    def _segments(self) -> tuple[np.ndarray, np.ndarray]:
+        """(segment length km, edge) for coord i → i+1; 0 across part breaks."""
+        edge, part = self._edge_of_coord()
+        if len(self.coords) < 2:
+            return np.zeros(0), np.zeros(0, np.int64)
+        seg = _haversine_km(self.coords[:-1], self.coords[1:])
+        seg[part[:-1] != part[1:]] = 0.0
+        return seg, edge[:-1]
+
+    def lengths_km(self) -> np.ndarray:
+        """Great-circle length per edge (0 without geometry)."""
+        seg, edge = self._segments()
+        return np.bincount(edge, weights=seg, minlength=len(self))
+
+    def bounds(self) -> np.ndarray:
+        """E×4 (minx, miny, maxx, maxy); NaN without geometry."""
+        out = np.full((len(self), 4), np.nan)
+        has = self.has_geom
+        if not has.any():
+            return out
+        start = self.part_offsets[self.geom_offsets[:-1][has]]
+        out[has, :2] = np.minimum.reduceat(self.coords, start)
+        out[has, 2:] = np.maximum.reduceat(self.coords, start)
+        return out
+
+    def midpoints(self) -> np.ndarray:
+        """E×2 point halfway along each edge (by length); NaN without geometry."""
+        out = np.full((len(self), 2), np.nan)
+        has = self.has_geom
+        if not has.any():
+            return out
+        seg, edge = self._segments()
+        cum = np.concatenate([[0.0], np.cumsum(seg)])       # distance at coord i
+        first = self.part_offsets[self.geom_offsets[:-1][has]]
+        target = cum[first] + self.lengths_km()[has] / 2
+        # last coord whose distance ≤ target, kept inside the edge's own coords
+        last = self.part_offsets[self.geom_offsets[1:][has]] - 1
+        i = np.clip(np.searchsorted(cum, target, side="right") - 1, first, last)
+        j = np.minimum(i + 1, last)
+        step = cum[j] - cum[i]
+        t = np.divide(target - cum[i], step, out=np.zeros_like(step), where=step > 0)
+        out[has] = self.coords[i] + np.clip(t, 0, 1)[:, None] * (self.coords[j] - self.coords[i])
+        return out
+
+# ───────────────────────────── graph ─────────────────────────────
+@dataclass
+class CSRGraph:
+    """Undirected multigraph: row i of the CSR lists i's neighbours and edge ids."""
+    node_ids: np.ndarray                  # N str
+    u: np.ndarray                         # E int64
+    v: np.ndarray                         # E int64
+    indptr: np.ndarray                    # N+1
+    indices: np.ndarray                   # 2E neighbour node
+    edges: np.ndarray                     # 2E edge id (u, v, geometry, attrs)
+    geometry: Geometry
+    attrs: dict[str, np.ndarray] = field(default_factory=dict)   # E each
+
+    @classmethod
+    def from_edges(cls, a: Sequence[str], b: Sequence[str], *,
+                   geometry: Geometry | None = None, **attrs: Sequence) -> "CSRGraph":
+        """Edges given as node-id pairs; nodes numbered by sorted id."""
+        a, b = np.asarray(a, dtype=str), np.asarray(b, dtype=str)
+        node_ids, inv = np.unique(np.concatenate([a, b]), return_inverse=True)
+        u, v = inv[:len(a)].astype(np.int64), inv[len(a):].astype(np.int64)
+        src, dst = np.concatenate([u, v]), np.concatenate([v, u])
+        eid = np.concatenate([np.arange(len(u)), np.arange(len(u))])
+        order = np.lexsort((dst, src))
+        indptr = np.zeros(len(node_ids) + 1, np.int64)
+        np.cumsum(np.bincount(src, minlength=len(node_ids)), out=indptr[1:])
+        if geometry is None:
+            geometry = Geometry.empty(len(u))
+        if len(geometry) != len(u):
+            raise ValueError(f"geometría para {len(geometry)} aristas, grafo con {len(u)}")
+        cols = {k: np.asarray(x) for k, x in attrs.items()}
+        cols = {k: x.astype(str) if x.dtype == object else x for k, x in cols.items()}
+        return cls(node_ids, u, v, indptr, dst[order], eid[order], geometry, cols)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.u)
+
+    @property
+    def index(self) -> dict[str, int]:
+        return {k: i for i, k in enumerate(self.node_ids.tolist())}
+
+    def degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def neighbours(self, i: int) -> tuple[np.ndarray, np.ndarray]:
+        """(neighbour nodes, edge ids) of node i."""
+        s = slice(self.indptr[i], self.indptr[i + 1])
+        return self.indices[s], self.edges[s]
+
+    def bridges(self) -> tuple[np.ndarray, np.ndarray]:
+        """(E bool bridge, N bool articulation point), iterative Tarjan over the CSR.
+
+        The DFS skips the edge it arrived by, not the parent node, so a
+        parallel circuit keeps its twin from being a bridge; loops are ignored.
+        """
+        indptr, nbr, eid = self.indptr.tolist(), self.indices.tolist(), self.edges.tolist()
+        n = self.n_nodes
+        disc, low = [-1] * n, [0] * n
+        bridge, art = np.zeros(self.n_edges, bool), np.zeros(n, bool)
+        t = 0
+        for root in range(n):
+            if disc[root] >= 0:
+                continue
+            disc[root] = low[root] = t
+            t += 1
+            children = 0
+            stack = [[root, -1, indptr[root]]]           # node, edge in, next slot
+            while stack:
+                top = stack[-1]
+                x, via, k = top
+                if k < indptr[x + 1]:
+                    top[2] += 1
+                    y, e = nbr[k], eid[k]
+                    if e == via or y == x:
+                        continue
+                    if disc[y] < 0:
+                        disc[y] = low[y] = t
+                        t += 1
+                        children += x == root
+                        stack.append([y, e, indptr[y]])
+                    elif disc[y] < low[x]:
+                        low[x] = disc[y]
+                    continue
+                stack.pop()
+                if stack:
+                    p = stack[-1][0]
+                    low[p] = min(low[p], low[x])
+                    if low[x] > disc[p]:
+                        bridge[via] = True
+                    if p != root and low[x] >= disc[p]:
+                        art[p] = True
+            art[root] = children > 1
+        return bridge, art
+
+    # ── persistence ──
+    def save(self, path: str | pathlib.Path) -> pathlib.Path:
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        g = self.geometry
+        np.savez(path, node_ids=self.node_ids, u=self.u, v=self.v, indptr=self.indptr,
+                 indices=self.indices, edges=self.edges, coords=g.coords,
+                 part_offsets=g.part_offsets, geom_offsets=g.geom_offsets,
+                 **{f"attr_{k}": x for k, x in self.attrs.items()})
+        return path
+
+    @classmethod
+    def load(cls, path: str | pathlib.Path) -> "CSRGraph":
+        with np.load(path, allow_pickle=False) as z:
+            geom = Geometry(z["coords"], z["part_offsets"], z["geom_offsets"])
+            attrs = {k[5:]: z[k] for k in z.files if k.startswith("attr_")}
+            return cls(z["node_ids"], z["u"], z["v"], z["indptr"], z["indices"],
+                       z["edges"], geom, attrs)
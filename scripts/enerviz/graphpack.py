@@ -0,0 +1,112 @@
+"""
+Binary transmission-graph package for the browser (viewer/src/utils/graphPackage.ts).
+
+One little-endian file, every section 8-byte aligned, so the viewer wraps
+each one in a typed array over the fetched ArrayBuffer without parsing:
+
+    0   magic  b"ENVZGRF\\0"
+    8   u32 version, u32 n_nodes, u32 n_edges, u32 n_sections
+    24  n_sections × 32 B: name (16 B ASCII, NUL-padded), u32 dtype,
+                            u32 byte offset, u32 element count, u32 0
+    …   section data
+
+Sections (N nodes = barras, E edges = tramos):
+
+    indptr        u32 N+1   CSR row pointers
+    indices       u32 2E    neighbour barra of each CSR slot
+    adj_edge      u32 2E    tramo of each CSR slot
+    edge_u/edge_v u32 E     end barras per tramo
+    tension_kv    f32 E     NaN if unknown
+    length_km     f32 E
+    bridge        u8  E     1 = removing it splits its component
+    articulation  u8  N     1 = removing the barra splits its component
+    node_lonlat   f32 2N    substation lon, lat (NaN if unknown)
+    <t>.off/.str  string table t: u32 offsets (count+1) into a UTF-8 blob,
+                  for t in node_id, node_name, tramo_id
+"""
+from __future__ import annotations
+import pathlib, struct
+from typing import TYPE_CHECKING, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from enerviz.graph import CSRGraph
+
+MAGIC   = b"ENVZGRF\0"
+VERSION = 1
+HEADER  = struct.Struct("<8sIIII")
+SECTION = struct.Struct("<16sIIII")
+ALIGN   = 8
+DTYPES  = {1: np.dtype("<u1"), 2: np.dtype("<u4"), 3: np.dtype("<i4"), 4: np.dtype("<f4")}
+CODES   = {v: k for k, v in DTYPES.items()}
+
+def strings(values: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+    """(u32 offsets, u8 UTF-8 blob) string table."""
+    enc = [("" if v is None else str(v)).encode("utf-8") for v in values]
+    off = np.zeros(len(enc) + 1, np.uint32)
+    np.cumsum([len(b) for b in enc], out=off[1:])
+    return off, np.frombuffer(b"".join(enc), np.uint8)
+
+def sections(g: "CSRGraph", *, node_names: Sequence[str] | None = None,
+             lonlat: np.ndarray | None = None) -> dict[str, np.ndarray]:
+    """Every section of the package for graph g, in file order."""
+    bridge, art = g.bridges()
+    nan = np.full(g.n_edges, np.nan)
+    out = {
+        "indptr":       g.indptr.astype(np.uint32),
+        "indices":      g.indices.astype(np.uint32),
+        "adj_edge":     g.edges.astype(np.uint32),
+        "edge_u":       g.u.astype(np.uint32),
+        "edge_v":       g.v.astype(np.uint32),
+        "tension_kv":   g.attrs.get("tension_kv", nan).astype(np.float32),
+        "length_km":    g.attrs.get("length_km", g.geometry.lengths_km()).astype(np.float32),
+        "bridge":       bridge.astype(np.uint8),
+        "articulation": art.astype(np.uint8),
+        "node_lonlat":  (np.full((g.n_nodes, 2), np.nan) if lonlat is None
+                         else np.asarray(lonlat)).astype(np.float32).ravel(),
+    }
+    tables = {"node_id": g.node_ids.tolist(),
+              "node_name": list(node_names) if node_names is not None else [""] * g.n_nodes,
+              "tramo_id": g.attrs.get("tramo_id", np.arange(g.n_edges)).astype(str).tolist()}
+    for t, values in tables.items():
+        out[f"{t}.off"], out[f"{t}.str"] = strings(values)
+    return out
+
+def write(g: "CSRGraph", path: str | pathlib.Path, **kw) -> pathlib.Path:
+    """Write the package; keyword arguments go to sections()."""
+    secs = sections(g, **kw)
+    pos = HEADER.size + SECTION.size * len(secs)
+    table, blobs = [], []
+    for name, arr in secs.items():
+        pos += -pos % ALIGN
+        data = np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder("<")).tobytes()
+        table.append(SECTION.pack(name.encode("ascii"), CODES[arr.dtype.newbyteorder("<")],
+                                  pos, arr.size, 0))
+        blobs.append((pos, data))
+        pos += len(data)
+    buf = bytearray(pos)
+    buf[:HEADER.size] = HEADER.pack(MAGIC, VERSION, g.n_nodes, g.n_edges, len(secs))
+    buf[HEADER.size:HEADER.size + SECTION.size * len(secs)] = b"".join(table)
+    for off, data in blobs:
+        buf[off:off + len(data)] = data
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(buf)
+    return path
+
+def read(path: str | pathlib.Path) -> dict[str, np.ndarray]:
+    """{section: array view over the file bytes} plus n_nodes / n_edges."""
+    buf = pathlib.Path(path).read_bytes()
+    magic, version, n, e, k = HEADER.unpack_from(buf)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: no es un paquete de grafo v{VERSION}")
+    out: dict = {"n_nodes": n, "n_edges": e}
+    for i in range(k):
+        name, code, off, count, _ = SECTION.unpack_from(buf, HEADER.size + i * SECTION.size)
+        out[name.rstrip(b"\0").decode("ascii")] = np.frombuffer(buf, DTYPES[code], count, off)
+    return out
+
+def string_at(pack: dict[str, np.ndarray], table: str, i: int) -> str:
+    off, blob = pack[f"{table}.off"], pack[f"{table}.str"]
+    return blob[off[i]:off[i + 1]].tobytes().decode("utf-8")
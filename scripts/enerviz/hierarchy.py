@@ -0,0 +1,304 @@
+"""
+Interval index over the SEN knowledge graph (04_build_knowledge_graph.py).
+
+The KG's containment edges form a forest:
+
+    Empresa ─owns→ Subestacion ←part_of─ Barra
+            └owns→ Linea ─has_circuito→ Circuito ─has_tramo→ Tramo
+
+One DFS numbers every node so that a node's descendants occupy the
+contiguous position range [tin, tout); per-type position arrays are
+sorted, so "barras under X" is two bisections and a slice.  The
+many-to-many Tramo ─connects→ Barra edges are kept twice, sorted by
+tramo position and by barra position, so both directions of the cross
+link are range lookups too:
+
+    idx = HierarchyIndex.from_inventory()
+    idx.descendants("E_12", "Tramo")      # assets owned by company 12
+    idx.reachable("E_12", "Barra")        # + barras its tramos connect to
+    idx.owners("S_40")                    # companies touching substation 40
+
+For neighbourhood queries the same arrays give a CSR adjacency over
+positions (containment both ways plus connects), built once on first use:
+
+    pos, hop = idx.khop(["S_40"], 2)      # everything ≤ 2 KG edges away
+    a, b, rel = idx.induced(pos)          # its edges, as the KG orients them
+
+Node ids are the KG's ("E_<id>", "S_<id>", "B_<id>", "L_<id>", "C_<id>",
+"T_<id>").  A node whose parent is missing from the inventory is a root.
+"""
+from __future__ import annotations
+import pathlib
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import duckdb
+    import networkx as nx
+
+TYPES  = ("Empresa", "Subestacion", "Barra", "Linea", "Circuito", "Tramo")
+PREFIX = {"Empresa": "E", "Subestacion": "S", "Barra": "B",
+          "Linea": "L", "Circuito": "C", "Tramo": "T"}
+INDEX  = pathlib.Path("data/processed/kg_index.npz")
+RELATIONS = ("owns", "part_of", "has_circuito", "has_tramo", "connects")
+# relation of the containment edge above a node of each type (-1: Empresa is a root)
+_UP_REL = np.array([-1, 0, 1, 0, 2, 3], dtype=np.int8)
+
+@dataclass
+class HierarchyIndex:
+    ids: np.ndarray          # N str, in DFS order (position = tin)
+    type: np.ndarray         # N int8 into TYPES
+    tout: np.ndarray         # N: descendants of p are positions p+1 .. tout[p]-1
+    parent: np.ndarray       # N position of the parent, -1 for roots
+    root: np.ndarray         # N position of the root
+    conn_t: np.ndarray       # connects edges sorted by tramo position …
+    conn_b: np.ndarray       # … and their barra positions
+    rconn_b: np.ndarray      # the same edges sorted by barra position …
+    rconn_t: np.ndarray      # … and their tramo positions
+
+    def __post_init__(self) -> None:
+        self.pos = {k: i for i, k in enumerate(self.ids.tolist())}
+        self.by_type = [np.flatnonzero(self.type == t) for t in range(len(TYPES))]
+        self._conn_t = self.conn_t.tolist()          # bisect on lists is fastest
+        self._rconn_b = self.rconn_b.tolist()
+        self._by_type = [a.tolist() for a in self.by_type]
+        self._adj: tuple[np.ndarray, ...] | None = None
+
+    # ───────────────────────────── build ─────────────────────────────
+    @classmethod
+    def from_edges(cls, nodes: dict[str, str], parent: dict[str, str],
+                   connects: Iterable[tuple[str, str]]) -> "HierarchyIndex":
+        """nodes {id: type}, parent {child: parent} (containment), connects (tramo, barra)."""
+        ids = list(nodes)
+        code = {t: i for i, t in enumerate(TYPES)}
+        k = {n: i for i, n in enumerate(ids)}
+        par = np.array([k.get(parent.get(n), -1) for n in ids], dtype=np.int64)
+
+        # children lists as CSR, then an explicit-stack DFS
+        kids = np.argsort(par, kind="stable")
+        kids = kids[par[kids] >= 0]
+        start = np.searchsorted(par[kids], np.arange(len(ids) + 1))
+        order, tout_of = [], np.zeros(len(ids), np.int64)
+        for r in np.flatnonzero(par < 0).tolist():
+            stack = [(r, False)]
+            while stack:
+                n, done = stack.pop()
+                if done:
+                    tout_of[n] = len(order)
+                    continue
+                order.append(n)
+                stack.append((n, True))
+                stack.extend((c, False) for c in kids[start[n]:start[n + 1]][::-1].tolist())
+        order = np.asarray(order, dtype=np.int64)
+        tin_of = np.empty(len(ids), np.int64)
+        tin_of[order] = np.arange(len(order))
+
+        parent_pos = np.where(par[order] >= 0, tin_of[np.maximum(par[order], 0)], -1)
+        root = np.arange(len(order))
+        for _ in range(len(TYPES)):                     # depth ≤ len(TYPES)
+            up = parent_pos[root]
+            root = np.where(up >= 0, up, root)
+
+        pairs = np.array([(k[t], k[b]) for t, b in connects if t in k and b in k],
+                         dtype=np.int64).reshape(-1, 2)
+        ct, cb = tin_of[pairs[:, 0]], tin_of[pairs[:, 1]]
+        o1, o2 = np.lexsort((cb, ct)), np.lexsort((ct, cb))
+        return cls(np.asarray(ids, dtype=str)[order],
+                   np.array([code[nodes[ids[i]]] for i in order.tolist()], dtype=np.int8),
+                   tout_of[order], parent_pos, root,
+                   ct[o1], cb[o1], cb[o2], ct[o2])
+
+    @classmethod
+    def from_graph(cls, G: "nx.DiGraph") -> "HierarchyIndex":
+        """From the KG as 04 builds it (or as read back from kg_sen.graphml)."""
+        nodes = {n: d["type"] for n, d in G.nodes(data=True)}
+        parent, connects = {}, []
+        for a, b, rel in G.edges(data="relation"):
+            if rel == "connects":
+                connects.append((a, b))
+            elif rel == "part_of":                       # barra → subestacion
+                parent[a] = b
+            else:                                        # owns / has_circuito / has_tramo
+                parent[b] = a
+        return cls.from_edges(nodes, parent, connects)
+
+    @classmethod
+    def from_inventory(cls, con: "duckdb.DuckDBPyConnection | None" = None) -> "HierarchyIndex":
+        """Straight from the inv.* views, without building the networkx KG."""
+        from enerviz.inventory import connect, read
+
+        own = con is None
+        con = con or connect()
+        try:
+            frames = {   # type: (ids + parent id, parent type)
+                "Empresa":     (read(con, "empresa", ["id"]), None),
+                "Subestacion": (read(con, "subestacion", ["id", "propietario_id AS p"]), "E"),
+                "Barra":       (read(con, "barra", ["id", "subestacion_id AS p"]), "S"),
+                "Linea":       (read(con, "linea", ["id", "propietario_id AS p"]), "E"),
+                "Circuito":    (read(con, "circuito", ["id", "linea_id AS p"]), "L"),
+                "Tramo":       (read(con, "tramo", ["id", "circuito_id AS p", "nodo1_id", "nodo2_id"]), "C"),
+            }
+        finally:
+            if own:
+                con.close()
+        nodes, parent, connects = {}, {}, []
+        for t, (df, up) in frames.items():
+            ids = [f"{PREFIX[t]}_{i}" for i in df["id"]]
+            nodes.update(dict.fromkeys(ids, t))
+            if up:
+                parent.update((n, f"{up}_{p}") for n, p in zip(ids, df["p"]) if isinstance(p, str))
+        tra = frames["Tramo"][0]
+        for end in ("nodo1_id", "nodo2_id"):
+            connects += [(f"T_{t}", f"B_{b}") for t, b in zip(tra["id"], tra[end]) if isinstance(b, str)]
+        return cls.from_edges(nodes, parent, connects)
+
+    # ────────────────────────── persistence ──────────────────────────
+    _ARRAYS = ("ids", "type", "tout", "parent", "root", "conn_t", "conn_b", "rconn_b", "rconn_t")
+
+    def save(self, path: str | pathlib.Path = INDEX) -> pathlib.Path:
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, **{k: getattr(self, k) for k in self._ARRAYS})
+        return path
+
+    @classmethod
+    def load(cls, path: str | pathlib.Path = INDEX) -> "HierarchyIndex":
+        with np.load(path, allow_pickle=False) as z:
+            return cls(*(z[k] for k in cls._ARRAYS))
+
+    # ─────────────────────────── queries ───────────────────────────
+    def _span(self, p: int, t: str | None) -> tuple[np.ndarray, int, int]:
+        """(positions, lo, hi): positions[lo:hi] are p's descendants of type t."""
+        if t is None:
+            return self.ids, p, int(self.tout[p])      # positions are the identity
+        k = TYPES.index(t)
+        a = self._by_type[k]
+        return self.by_type[k], bisect_left(a, p), bisect_left(a, int(self.tout[p]))
+
+    def _ids(self, positions: Sequence[int] | np.ndarray) -> list[str]:
+        return self.ids[np.asarray(positions, dtype=np.int64)].tolist()
+
+    def is_ancestor(self, a: str, x: str) -> bool:
+        """a contains x (a node contains itself)."""
+        pa, px = self.pos[a], self.pos[x]
+        return pa <= px < self.tout[pa]
+
+    def ancestors(self, x: str) -> list[str]:
+        """Containers of x, nearest first."""
+        out, p = [], int(self.parent[self.pos[x]])
+        while p >= 0:
+            out.append(p)
+            p = int(self.parent[p])
+        return self._ids(out)
+
+    def owner(self, x: str) -> str | None:
+        """Company at the top of x's hierarchy (None for orphans)."""
+        r = int(self.root[self.pos[x]])
+        return str(self.ids[r]) if self.type[r] == 0 else None
+
+    def count(self, x: str, t: str | None = None) -> int:
+        """Number of descendants of x (x included) of type t."""
+        _, lo, hi = self._span(self.pos[x], t)
+        return hi - lo
+
+    def descendants(self, x: str, t: str | None = None) -> list[str]:
+        """x and everything it contains, optionally only of type t."""
+        a, lo, hi = self._span(self.pos[x], t)
+        return (a[lo:hi] if t is None else self.ids[a[lo:hi]]).tolist()
+
+    def connected_barras(self, x: str) -> np.ndarray:
+        """Positions of the barras connected by tramos under x (with repeats)."""
+        p = self.pos[x]
+        lo = bisect_left(self._conn_t, p)
+        hi = bisect_left(self._conn_t, int(self.tout[p]), lo)
+        return self.conn_b[lo:hi]
+
+    def connecting_tramos(self, x: str) -> np.ndarray:
+        """Positions of the tramos connecting to barras under x (with repeats)."""
+        p = self.pos[x]
+        lo = bisect_left(self._rconn_b, p)
+        hi = bisect_left(self._rconn_b, int(self.tout[p]), lo)
+        return self.rconn_t[lo:hi]
+
+    def reachable(self, x: str, t: str | None = None) -> list[str]:
+        """Descendants of x plus the barras its tramos connect to and their substations."""
+        p = self.pos[x]
+        b = np.unique(self.connected_barras(x))
+        extra = np.concatenate([b, self.parent[b][self.parent[b] >= 0]])
+        extra = np.unique(extra[(extra < p) | (extra >= self.tout[p])])   # outside the subtree
+        if t is not None:
+            extra = extra[self.type[extra] == TYPES.index(t)]
+        return self.descendants(x, t) + self._ids(extra)
+
+    def owners(self, x: str) -> list[str]:
+        """Companies owning x, anything inside it, or a tramo/substation wired to it."""
+        roots = [self.root[[self.pos[x]]],
+                 self.root[self.connecting_tramos(x)],             # lines into its barras
+                 self.root[self.connected_barras(x)]]              # substations its tramos reach
+        r = np.unique(np.concatenate(roots))
+        return self._ids(r[self.type[r] == 0])
+
+    # ────────────────────────── neighbourhoods ──────────────────────────
+    def adjacency(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """CSR over positions: (indptr, neighbour, relation code, True if stored as in the KG)."""
+        if self._adj is None:
+            child = np.flatnonzero(self.parent >= 0)
+            par = self.parent[child]
+            up = self.type[child] == TYPES.index("Barra")         # part_of: barra → substation
+            src = np.r_[np.where(up, child, par), self.conn_t]
+            dst = np.r_[np.where(up, par, child), self.conn_b]
+            rel = np.r_[_UP_REL[self.type[child]], np.full(len(self.conn_t), 4, np.int8)]
+            a, b = np.r_[src, dst], np.r_[dst, src]
+            order = np.argsort(a, kind="stable")
+            indptr = np.searchsorted(a[order], np.arange(len(self.ids) + 1))
+            fwd = np.r_[np.ones(len(src), bool), np.zeros(len(src), bool)]
+            self._adj = indptr, b[order], np.r_[rel, rel][order], fwd[order]
+        return self._adj
+
+    def _slots(self, nodes: np.ndarray) -> np.ndarray:
+        """CSR slots of all of `nodes`' neighbours, concatenated."""
+        indptr = self.adjacency()[0]
+        lo, n = indptr[nodes], indptr[nodes + 1] - indptr[nodes]
+        return np.repeat(lo - np.r_[0, np.cumsum(n)[:-1]], n) + np.arange(n.sum())
+
+    def khop(self, seeds: Iterable[str], hops: int, *,
+             stop: Sequence[str] = ("Empresa",)) -> tuple[np.ndarray, np.ndarray]:
+        """(positions, hop distance) of every node within `hops` edges of a seed.
+
+        Nodes of a `stop` type are reached but not expanded, unless they are
+        seeds: one company would otherwise pull in its whole portfolio.
+        """
+        nbr = self.adjacency()[1]
+        dist = np.full(len(self.ids), -1, np.int32)
+        front = np.unique(np.array([self.pos[s] for s in seeds], dtype=np.int64))
+        dist[front] = 0
+        halt = np.isin(self.type, [TYPES.index(t) for t in stop])
+        for h in range(1, hops + 1):
+            grow = front if h == 1 else front[~halt[front]]
+            nb = np.unique(nbr[self._slots(grow)])
+            front = nb[dist[nb] < 0]
+            if not front.size:
+                break
+            dist[front] = h
+        pos = np.flatnonzero(dist >= 0)
+        return pos, dist[pos]
+
+    def induced(self, positions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """KG edges among `positions`: (source, target positions, relation code), each once."""
+        indptr, nbr, rel, fwd = self.adjacency()
+        positions = np.asarray(positions, dtype=np.int64)
+        inside = np.zeros(len(self.ids), bool)
+        inside[positions] = True
+        slots = self._slots(positions)
+        src = np.repeat(positions, np.diff(indptr)[positions])
+        keep = fwd[slots] & inside[nbr[slots]]
+        return src[keep], nbr[slots][keep], rel[slots][keep]
+
+    def stats(self) -> dict[str, int]:
+        out = {t: len(a) for t, a in zip(TYPES, self.by_type)}
+        out["connects"] = len(self.conn_t)
+        out["roots"] = int((self.parent < 0).sum())
+        return out
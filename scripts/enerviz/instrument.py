@@ -0,0 +1,192 @@
+"""
+Stage-level timing for the pipeline scripts.
+
+    from enerviz.instrument import stage, timed
+
+    with stage("read_shapefile") as st:
+        gdf = gpd.read_file(RAW)
+        st.rows_out = len(gdf)
+
+    @timed("build_graph")
+    def build_graph(...): ...
+
+Every stage appends one JSON line to $ENERVIZ_METRICS (default
+data/metrics/stages.jsonl) with wall and CPU seconds, rows in/out, rows/s,
+resident memory before/after the stage (psutil when installed, else /proc)
+and the process-lifetime peak RSS so far, which is not the stage's own.
+Records share a run id ($ENERVIZ_RUN_ID, or one per process) so report()
+can summarise a whole pipeline run.
+
+Profiling: ENERVIZ_PROFILE=cprofile (or pyinstrument, if installed) writes
+one profile per outermost stage to data/metrics/profiles/.
+"""
+from __future__ import annotations
+import functools, json, os, pathlib, sys, time, uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, ContextManager, Iterator
+
+try:
+    import resource
+except ImportError:                 # Windows
+    resource = None
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+METRICS  = pathlib.Path(os.environ.get("ENERVIZ_METRICS", "data/metrics/stages.jsonl"))
+PROFILES = METRICS.parent / "profiles"
+RUN_ID   = os.environ.get("ENERVIZ_RUN_ID") or time.strftime("%Y%m%dT%H%M%S-") + uuid.uuid4().hex[:6]
+PROFILE  = os.environ.get("ENERVIZ_PROFILE", "").lower()
+
+_depth = 0
+_SKIP = {__file__}
+
+def _caller() -> str:
+    """Stem of the script that opened the stage (not sys.argv[0]: runpy, pytest)."""
+    f = sys._getframe(1)
+    while f is not None and f.f_code.co_filename in _SKIP:
+        f = f.f_back
+    return pathlib.Path(f.f_code.co_filename).stem if f is not None else "python"
+
+def rss_mb() -> float | None:
+    """Current resident set size of this process."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 1_048_576
+    try:
+        pages = int(pathlib.Path("/proc/self/statm").read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1_048_576
+
+def process_peak_rss_mb() -> float | None:
+    """Peak RSS over the whole process so far (ru_maxrss), not per stage."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1_048_576 if sys.platform == "darwin" else peak / 1024   # bytes vs KiB
+
+@dataclass
+class Stage:
+    name:     str
+    rows_in:  int | None = None
+    rows_out: int | None = None
+    extra:    dict = field(default_factory=dict)
+
+def _emit(rec: dict) -> None:
+    METRICS.parent.mkdir(parents=True, exist_ok=True)
+    with METRICS.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+@contextmanager
+def _profiled(script: str, name: str) -> Iterator[None]:
+    """Profile only the outermost stage (profilers do not nest)."""
+    if not PROFILE or _depth > 1:
+        yield
+        return
+    PROFILES.mkdir(parents=True, exist_ok=True)
+    base = PROFILES / f"{RUN_ID}_{script}_{name}"
+    if PROFILE == "pyinstrument":
+        from pyinstrument import Profiler
+        prof = Profiler()
+        prof.start()
+        try:
+            yield
+        finally:
+            prof.stop()
+            base.with_suffix(".html").write_text(prof.output_html())
+    else:
+        import cProfile
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            prof.dump_stats(base.with_suffix(".prof"))
+
+def stage(name: str, rows_in: int | None = None, **extra) -> ContextManager[Stage]:
+    """Time a block; set st.rows_in / st.rows_out inside it when known."""
+    return _stage(_caller(), Stage(name, rows_in, extra=extra))
+
+@contextmanager
+def _stage(script: str, st: Stage) -> Iterator[Stage]:
+    global _depth
+    name = st.name
+    _depth += 1
+    ok = False
+    rss0 = rss_mb()
+    t0, c0 = time.perf_counter(), time.process_time()
+    try:
+        with _profiled(script, name):
+            yield st
+        ok = True
+    finally:
+        wall, cpu = time.perf_counter() - t0, time.process_time() - c0
+        _depth -= 1
+        rows = st.rows_out if st.rows_out is not None else st.rows_in
+        rss1 = rss_mb()
+        _emit({
+            "ts":          time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "run":         RUN_ID,
+            "script":      script,
+            "stage":       name,
+            "depth":       _depth,
+            "ok":          ok,
+            "wall_s":      round(wall, 4),
+            "cpu_s":       round(cpu, 4),
+            "rows_in":     st.rows_in,
+            "rows_out":    st.rows_out,
+            "rows_per_s":  round(rows / wall, 1) if rows and wall > 0 else None,
+            "rss_before_mb": None if rss0 is None else round(rss0, 1),
+            "rss_after_mb":  None if rss1 is None else round(rss1, 1),
+            "process_peak_rss_mb": round(p, 1) if (p := process_peak_rss_mb()) is not None else None,
+            **st.extra,
+        })
+
+def timed(name: str | None = None) -> Callable:
+    """Decorator form of stage(); the function's name is the default label."""
+    def deco(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            script = pathlib.Path(fn.__code__.co_filename).stem
+            with _stage(script, Stage(name or fn.__name__)):
+                return fn(*a, **kw)
+        return wrapper
+    return deco
+
+# ───────────────────────── report ─────────────────────────
+def load(path: str | pathlib.Path = METRICS, run: str | None = None) -> list[dict]:
+    """Records of one run (default: the most recent one in the file)."""
+    path = pathlib.Path(path)
+    if not path.exists():
+        return []
+    recs = [json.loads(l) for l in path.read_text(encoding="utf-8").splitlines() if l.strip()]
+    if not recs:
+        return []
+    run = run or recs[-1]["run"]
+    return [r for r in recs if r["run"] == run]
+
+def report(path: str | pathlib.Path = METRICS, run: str | None = None) -> str:
+    """Plain-text table of a run's stages, slowest first."""
+    recs = load(path, run)
+    if not recs:
+        return f"no stage records in {path}"
+    top = [r for r in recs if r.get("depth", 0) == 0]
+    total = sum(r["wall_s"] for r in top)
+    lines = [f"run {recs[0]['run']}  stages: {len(recs)}  total wall: {total:.1f} s",
+             f"{'script':<28} {'stage':<28} {'wall s':>8} {'cpu s':>8} "
+             f"{'rows':>10} {'rows/s':>11} {'ΔRSS MB':>8} {'proc peak MB':>12}"]
+    for r in sorted(recs, key=lambda r: -r["wall_s"]):
+        rows = r["rows_out"] if r["rows_out"] is not None else r["rows_in"]
+        before, after = r.get("rss_before_mb"), r.get("rss_after_mb")
+        delta = "" if before is None or after is None else f"{after - before:+.1f}"
+        peak = r.get("process_peak_rss_mb", r.get("peak_rss_mb"))   # older records
+        lines.append(
+            f"{r['script'][:28]:<28} {('  ' * r.get('depth', 0) + r['stage'])[:28]:<28} "
+            f"{r['wall_s']:>8.2f} {r['cpu_s']:>8.2f} "
+            f"{'' if rows is None else rows:>10} {'' if r['rows_per_s'] is None else r['rows_per_s']:>11} "
+            f"{delta:>8} {'' if peak is None else peak:>12}"
+            + ("" if r["ok"] else "  ✖ failed"))
+    return "\n".join(lines)
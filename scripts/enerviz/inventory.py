@@ -0,0 +1,209 @@
+"""
+Canonical views over data/curated/inventory.duckdb.
+
+01_ingest_inventory.py loads every workbook sheet as-is (tables empresa,
+subestacion, barra, linea, circuito, tramo, geom_tramo) and then calls
+create_views(), which resolves sheet and column spellings once and
+publishes the result as views in schema ``inv``:
+
+  inv.empresa      id, name
+  inv.subestacion  id, name, propietario_id, lat, lon
+  inv.barra        id, name, subestacion_id, tension_kv
+  inv.linea        id, name, propietario_id, tension_kv,
+                   sub_origen_id, sub_destino_id
+  inv.circuito     id, linea_id
+  inv.tramo        id, circuito_id, nodo1_id, nodo2_id, has_geom
+  inv.geom         tramo_id, wkt        (one shapefile geometry per tramo)
+
+Ids are VARCHAR everywhere (a float 12.0 in Excel becomes '12'), names are
+never NULL.  When Linea has no origin/destination substation columns they
+are derived from its tramos' end barras.
+
+Stages 02–07 read through read(), which only selects the requested
+columns, so DuckDB scans just those:
+
+    con = connect()
+    bar = read(con, "barra", ["id", "subestacion_id"])
+"""
+from __future__ import annotations
+import pathlib
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+if TYPE_CHECKING:
+    import duckdb
+    import pandas as pd
+
+INVENTORY = pathlib.Path("data/curated/inventory.duckdb")
+SCHEMA    = "inv"
+
+# table: keywords that identify its sheet (first match wins, case-insensitive)
+SHEETS: dict[str, tuple[str, ...]] = {
+    "empresa":     ("empresa",),
+    "subestacion": ("subestac",),
+    "barra":       ("barra", "patio"),
+    "linea":       ("linea", "línea"),
+    "circuito":    ("circuito",),
+    "tramo":       ("tramo",),
+}
+
+# table: {canonical column: source spellings, exact (case-insensitive) first}
+COLUMNS: dict[str, dict[str, tuple[str, ...]]] = {
+    "empresa": {
+        "id":             ("id", "empresa_id"),
+        "name":           ("name", "nombre", "razon_social"),
+    },
+    "subestacion": {
+        "id":             ("id", "subestacion_id"),
+        "name":           ("name", "nombre"),
+        "propietario_id": ("propietario_id", "propietario", "empresa_id"),
+        "lat":            ("lat", "latitud"),
+        "lon":            ("lon", "longitud"),
+    },
+    "barra": {
+        "id":             ("id", "barra_id"),
+        "name":           ("name", "nombre"),
+        "subestacion_id": ("patio_subestacion_id", "subestacion_id"),
+        "tension_kv":     ("tension_kv", "voltaje_kv", "tension"),
+    },
+    "linea": {
+        "id":             ("id", "linea_id"),
+        "name":           ("name", "nombre"),
+        "propietario_id": ("propietario_id", "propietario", "empresa_id"),
+        "tension_kv":     ("voltaje_kv", "tension_kv", "voltaje"),
+        "sub_origen_id":  ("subestacion_origen_id", "sub_origen_id"),
+        "sub_destino_id": ("subestacion_destino_id", "sub_destino_id"),
+    },
+    "circuito": {
+        "id":             ("id", "circuito_id"),
+        "linea_id":       ("linea_id",),
+    },
+    "tramo": {
+        "id":             ("id", "tramo_id"),
+        "circuito_id":    ("circuito_id",),
+        "nodo1_id":       ("nodo1_id",),
+        "nodo2_id":       ("nodo2_id",),
+    },
+}
+REQUIRED = {
+    "empresa":     {"id"},
+    "subestacion": {"id"},
+    "barra":       {"id", "subestacion_id"},
+    "linea":       {"id"},
+    "circuito":    {"id", "linea_id"},
+    "tramo":       {"id", "circuito_id", "nodo1_id", "nodo2_id"},
+}
+IDS   = {"id", "propietario_id", "subestacion_id", "linea_id", "circuito_id",
+         "nodo1_id", "nodo2_id", "sub_origen_id", "sub_destino_id"}
+NAMES = {"name"}
+VIEWS = (*COLUMNS, "geom")
+
+# ───────────────────────── resolution ─────────────────────────
+def resolve_sheets(sheet_names: Iterable[str]) -> dict[str, str]:
+    """{table: sheet} for the workbook's sheet names; KeyError if one is missing."""
+    names = list(sheet_names)
+    out = {}
+    for tbl, keys in SHEETS.items():
+        hit = next((s for s in names if any(k in s.lower() for k in keys)), None)
+        if hit is None:
+            raise KeyError(f"ninguna hoja para «{tbl}» (busca {keys}) en {names}")
+        out[tbl] = hit
+    return out
+
+def resolve_columns(tbl: str, columns: Sequence[str]) -> dict[str, str | None]:
+    """{canonical: source column or None}; exact spellings before substrings."""
+    lower = {c.lower(): c for c in columns}
+    out: dict[str, str | None] = {}
+    for canon, spellings in COLUMNS[tbl].items():
+        src = next((lower[s] for s in spellings if s in lower), None)
+        if src is None and canon != "id":
+            src = next((c for c in columns for s in spellings if s in c.lower()), None)
+        out[canon] = src
+    if missing := sorted(c for c in REQUIRED[tbl] if out[c] is None):
+        raise KeyError(f"tabla {tbl}: faltan columnas {missing} (hay {list(columns)})")
+    return out
+
+def _q(col: str) -> str:
+    return '"' + col.replace('"', '""') + '"'
+
+def _expr(canon: str, src: str | None) -> str:
+    if src is None:
+        return f"'' AS {canon}" if canon in NAMES else f"NULL AS {canon}"
+    c = _q(src)
+    if canon in IDS:       # 12 / 12.0 / '12' → '12'
+        return (f"COALESCE(CAST(TRY_CAST({c} AS BIGINT) AS VARCHAR), "
+                f"NULLIF(TRIM(CAST({c} AS VARCHAR)), '')) AS {canon}")
+    if canon in NAMES:
+        return f"COALESCE(CAST({c} AS VARCHAR), '') AS {canon}"
+    return f"TRY_CAST({c} AS DOUBLE) AS {canon}"
+
+def create_views(con: "duckdb.DuckDBPyConnection") -> dict[str, dict[str, str | None]]:
+    """(Re)create the inv.* views over the raw sheet tables; returns the mapping."""
+    con.execute(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}")
+    mapping = {}
+    for tbl in COLUMNS:
+        cols = [r[0] for r in con.execute(f"DESCRIBE {tbl}").fetchall()]
+        mapping[tbl] = m = resolve_columns(tbl, cols)
+        select = [_expr(c, s) for c, s in m.items()
+                  if not (tbl == "linea" and c.startswith("sub_") and s is None)]
+        con.execute(f"CREATE OR REPLACE VIEW {SCHEMA}._{tbl} AS "
+                    f"SELECT {', '.join(select)} FROM main.{tbl}")
+
+    for tbl in ("empresa", "subestacion", "barra", "circuito"):
+        con.execute(f"CREATE OR REPLACE VIEW {SCHEMA}.{tbl} AS SELECT * FROM {SCHEMA}._{tbl}")
+
+    con.execute(f"""
+        CREATE OR REPLACE VIEW {SCHEMA}.tramo AS
+        SELECT t.*, t.id IN (SELECT CAST(tramo_ref_id AS VARCHAR)
+                             FROM main.geom_tramo WHERE geom IS NOT NULL) AS has_geom
+        FROM {SCHEMA}._tramo t
+    """)
+
+    con.execute(f"""
+        CREATE OR REPLACE VIEW {SCHEMA}.geom AS
+        SELECT CAST(tramo_ref_id AS VARCHAR) AS tramo_id, any_value(geom) AS wkt
+        FROM main.geom_tramo WHERE geom IS NOT NULL
+        GROUP BY tramo_ref_id
+    """)
+
+    if mapping["linea"]["sub_origen_id"] and mapping["linea"]["sub_destino_id"]:
+        con.execute(f"CREATE OR REPLACE VIEW {SCHEMA}.linea AS SELECT * FROM {SCHEMA}._linea")
+    else:  # ends of the line = substations of its first / last tramo's barras
+        con.execute(f"""
+            CREATE OR REPLACE VIEW {SCHEMA}.linea AS
+            WITH ends AS (
+                SELECT c.linea_id,
+                       arg_min(b1.subestacion_id, TRY_CAST(t.id AS BIGINT)) AS sub_origen_id,
+                       arg_max(b2.subestacion_id, TRY_CAST(t.id AS BIGINT)) AS sub_destino_id
+                FROM {SCHEMA}._tramo t
+                JOIN {SCHEMA}._circuito c ON c.id = t.circuito_id
+                LEFT JOIN {SCHEMA}._barra b1 ON b1.id = t.nodo1_id
+                LEFT JOIN {SCHEMA}._barra b2 ON b2.id = t.nodo2_id
+                GROUP BY c.linea_id
+            )
+            SELECT l.*, e.sub_origen_id, e.sub_destino_id
+            FROM {SCHEMA}._linea l LEFT JOIN ends e ON e.linea_id = l.id
+        """)
+    return mapping
+
+# ─────────────────────────── readers ───────────────────────────
+def connect(db_path: str | pathlib.Path = INVENTORY) -> "duckdb.DuckDBPyConnection":
+    """Read-only connection; fails early if the db predates the inv.* views."""
+    import duckdb
+
+    db_path = pathlib.Path(db_path)
+    if not db_path.exists():
+        raise FileNotFoundError(f"{db_path} no existe: corre 01_ingest_inventory.py")
+    con = duckdb.connect(str(db_path), read_only=True)
+    have = {r[0] for r in con.execute("SELECT table_name FROM information_schema.tables "
+                                      "WHERE table_schema = ?", [SCHEMA]).fetchall()}
+    if missing := [v for v in VIEWS if v not in have]:
+        con.close()
+        raise RuntimeError(f"{db_path} no tiene las vistas {SCHEMA}.{missing}: "
+                           "vuelve a correr 01_ingest_inventory.py")
+    return con
+
+def read(con: "duckdb.DuckDBPyConnection", table: str,
+         columns: Sequence[str] | None = None) -> "pd.DataFrame":
+    """SELECT only `columns` (default: all canonical ones) from inv.<table>."""
+    cols = ", ".join(columns) if columns else "*"
+    return con.execute(f"SELECT {cols} FROM {SCHEMA}.{table}").df()
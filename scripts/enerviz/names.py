@@ -0,0 +1,184 @@
+"""
+Barra-name normalisation and fuzzy resolution against the inventory.
+
+Every script used to clean names its own way (`clean()`, `clean_name()`,
+`norm()`, the viewer's `normalise()`), so the same barra could end up with
+three different keys.  This module is the single implementation:
+
+  • clean()          ASCII-fold, lower-case, drop "220 kV" tokens and
+                     punctuation.  viewer/src/hooks/usePrices.ts mirrors it.
+  • BarraResolver    trigram + token index over the canonical Barras of
+                     data/curated/inventory.duckdb; resolves any spelling
+                     to a barra id with a score (memoised).
+  • compile_lookup() flat {clean-name: id} table for the viewer, so the
+                     browser never has to do fuzzy matching itself.
+"""
+from __future__ import annotations
+import csv, json, pathlib, re, unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Mapping
+
+from enerviz.inventory import INVENTORY, connect
+
+ALIASES   = pathlib.Path("data/processed/barra_alias.csv")
+
+_KV       = re.compile(r"\b\d+\s*k?v\b")        # '220 kV', '110KV', '13.8kv'
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+def ascii(s: str) -> str:
+    return unicodedata.normalize("NFKD", str(s)).encode("ascii", "ignore").decode()
+
+def clean(txt: str) -> str:
+    """Canonical key for a barra name: 'S/E Crucero 220kV' → 's e crucero'."""
+    t = _KV.sub(" ", ascii(txt).lower())
+    return " ".join(_NON_ALNUM.sub(" ", t).split())
+
+def trigrams(key: str) -> frozenset[str]:
+    padded = f"  {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+# ───────────────────────── resolver ─────────────────────────
+@dataclass(frozen=True)
+class Match:
+    id:    str
+    name:  str
+    score: float          # 1.0 = exact key or alias, else fuzzy score
+
+class BarraResolver:
+    """
+    Resolve free-text barra names to canonical inventory ids.
+
+    Exact keys and aliases win outright; otherwise candidates sharing the
+    most trigrams are scored as 0.6·Dice(trigrams) + 0.4·(share of the
+    query's non-numeric tokens found in the candidate) and the best one is
+    returned if it reaches `min_score`.
+    """
+    N_CANDIDATES = 25
+
+    def __init__(self, ids: Iterable, names: Iterable[str], *,
+                 lat: Iterable[float] | None = None,
+                 lon: Iterable[float] | None = None,
+                 aliases: Mapping[str, str] | None = None,
+                 min_score: float = 0.7) -> None:
+        self.ids   = [str(i) for i in ids]
+        self.names = ["" if n is None or n != n else str(n) for n in names]
+        self.lat   = list(lat) if lat is not None else [None] * len(self.ids)
+        self.lon   = list(lon) if lon is not None else [None] * len(self.ids)
+        self.min_score = min_score
+
+        self._keys   = [clean(n) for n in self.names]
+        self._grams  = [trigrams(k) for k in self._keys]
+        self._tokens = [frozenset(k.split()) for k in self._keys]
+        self._by_id  = {i: n for n, i in enumerate(self.ids)}
+
+        self._exact: dict[str, int] = {}
+        for n, k in enumerate(self._keys):
+            if k:
+                self._exact.setdefault(k, n)
+        for alias, target in (aliases or {}).items():
+            n = self._by_id.get(str(target), self._exact.get(clean(target)))
+            if n is not None:
+                self._exact[clean(alias)] = n
+
+        self._gram_idx: dict[str, list[int]] = defaultdict(list)
+        self._tok_idx:  dict[str, list[int]] = defaultdict(list)
+        for n, (grams, toks) in enumerate(zip(self._grams, self._tokens)):
+            for g in grams:
+                self._gram_idx[g].append(n)
+            for t in toks:
+                self._tok_idx[t].append(n)
+
+        self.resolve = lru_cache(maxsize=None)(self._resolve)
+
+    # ---------- constructors ----------
+    @classmethod
+    def from_inventory(cls, db_path: str | pathlib.Path = INVENTORY,
+                       alias_csv: str | pathlib.Path | None = ALIASES,
+                       **kw) -> "BarraResolver":
+        """Barras of inventory.duckdb, located through their substation."""
+        con = connect(db_path)
+        df = con.execute(
+            """
+            SELECT b.id, b.name, s.lat, s.lon
+            FROM inv.barra b
+            LEFT JOIN inv.subestacion s ON s.id = b.subestacion_id
+            """
+        ).df()
+        con.close()
+        aliases = load_aliases(alias_csv) if alias_csv else None
+        return cls(df["id"], df["name"], lat=df["lat"], lon=df["lon"],
+                   aliases=aliases, **kw)
+
+    # ---------- lookups ----------
+    def _resolve(self, name: str) -> Match | None:
+        key = clean(name)
+        if not key:
+            return None
+        if (n := self._exact.get(key)) is not None:
+            return Match(self.ids[n], self.names[n], 1.0)
+
+        q_grams, q_toks = trigrams(key), frozenset(key.split())
+        q_words = frozenset(t for t in q_toks if not t.isdigit()) or q_toks
+        shared: Counter[int] = Counter()
+        for g in q_grams:
+            shared.update(self._gram_idx.get(g, ()))
+        for t in q_toks:
+            shared.update(self._tok_idx.get(t, ()))
+
+        best, best_score = None, 0.0
+        for n, _ in shared.most_common(self.N_CANDIDATES):
+            c_grams = self._grams[n]
+            dice = 2 * len(q_grams & c_grams) / (len(q_grams) + len(c_grams))
+            toks = len(q_words & self._tokens[n]) / len(q_words)
+            score = 0.6 * dice + 0.4 * toks
+            if score > best_score:
+                best, best_score = n, score
+        if best is None or best_score < self.min_score:
+            return None
+        return Match(self.ids[best], self.names[best], round(best_score, 3))
+
+    def resolve_many(self, names: Iterable[str]) -> list[Match | None]:
+        """Resolve a column of names; each distinct spelling is scored once."""
+        return [self.resolve(str(n)) for n in names]
+
+    def coords(self, barra_id: str) -> tuple[float, float] | None:
+        n = self._by_id.get(str(barra_id))
+        if n is None or self.lat[n] is None or self.lat[n] != self.lat[n]:
+            return None
+        return float(self.lat[n]), float(self.lon[n])
+
+    # ---------- viewer export ----------
+    def compile_lookup(self, extra_names: Iterable[str] = ()) -> dict:
+        """
+        {barras: {id: {name, lat, lon}}, lookup: {clean-name: id}}
+
+        `lookup` holds every canonical key and alias plus the resolved key of
+        each name in `extra_names`, so the viewer only needs clean() + a map.
+        """
+        lookup = {k: self.ids[n] for k, n in self._exact.items()}
+        for name in extra_names:
+            key = clean(name)
+            if key and key not in lookup and (m := self.resolve(name)):
+                lookup[key] = m.id
+        barras = {}
+        for n, i in enumerate(self.ids):
+            c = self.coords(i)
+            barras[i] = {"name": self.names[n],
+                         "lat": c[0] if c else None,
+                         "lon": c[1] if c else None}
+        return {"barras": barras, "lookup": dict(sorted(lookup.items()))}
+
+def load_aliases(path: str | pathlib.Path) -> dict[str, str]:
+    """alias,barra CSV → {alias: barra}; missing file → {}."""
+    path = pathlib.Path(path)
+    if not path.exists():
+        return {}
+    with path.open(encoding="utf-8") as f:
+        return {r["alias"]: r["barra"] for r in csv.DictReader(f)}
+
+def write_lookup(table: dict, out: str | pathlib.Path) -> None:
+    out = pathlib.Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(table, ensure_ascii=True, separators=(",", ":")))
@@ -0,0 +1,209 @@
+"""
+DC power flow over the CSR transmission graph (enerviz.graph).
+
+Each tramo is a branch with susceptance b = 1/x, x estimated from its kV
+class and length (no impedance data in the inventory).  The reduced bus
+susceptance matrix B = Aᵀ·diag(b)·A (one slack per island removed) is
+factorised once with SuperLU; every later solve reuses the factors:
+
+    g = CSRGraph.load("data/processed/transmission_graph.npz")
+    model = DCModel.from_graph(g)
+    inj = load_injections(g, "gen.csv", "dem.csv")          # barra,hora,mw CSVs
+    mw = model.flows(model.balance(inj.gen, inj.demand))    # N×T MW → E×T flows
+    for rows, block in model.ptdf_blocks(512):
+        ...                                                 # PTDF[rows, :], E_blk×N
+
+Flows are positive from u to v (CSRGraph.u → CSRGraph.v).  Each island's
+slack is its highest-degree barra and absorbs that island's imbalance.
+"""
+from __future__ import annotations
+import json, pathlib
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterator
+
+import numpy as np
+
+from enerviz.inventory import INVENTORY
+
+if TYPE_CHECKING:
+    from enerviz.graph import CSRGraph
+    from enerviz.names import BarraResolver
+
+X_OHM_KM = ((345, 0.33), (0, 0.40))     # (min kV, Ω/km): typical overhead lines
+KV_DEFAULT = 220.0
+BASE_MVA   = 100.0
+MIN_KM     = 0.1
+GEN_BARRAS = pathlib.Path("public/generation_barras.json")   # extract_generation_barras.py
+
+def reactance_pu(kv: np.ndarray, length_km: np.ndarray) -> np.ndarray:
+    """Series reactance in p.u. on BASE_MVA; unknown kV → KV_DEFAULT, unknown length → median."""
+    kv = np.where(np.isfinite(kv) & (kv > 0), kv, KV_DEFAULT)
+    km = np.asarray(length_km, dtype=float)
+    known = np.isfinite(km) & (km > 0)
+    km = np.where(known, km, np.median(km[known]) if known.any() else 10.0)
+    per_km = np.select([kv >= lo for lo, _ in X_OHM_KM], [x for _, x in X_OHM_KM])
+    return per_km * np.maximum(km, MIN_KM) / (kv ** 2 / BASE_MVA)
+
+class DCModel:
+    """Factorised DC model: angles, branch flows and PTDF rows on demand."""
+
+    def __init__(self, n: int, u: np.ndarray, v: np.ndarray, x_pu: np.ndarray):
+        from scipy import sparse
+        from scipy.sparse.csgraph import connected_components
+        from scipy.sparse.linalg import splu
+
+        self.n, self.u, self.v = n, np.asarray(u), np.asarray(v)
+        self.b = np.where(self.u != self.v, 1.0 / np.asarray(x_pu, dtype=float), 0.0)
+        e = len(self.u)
+        self.A = sparse.csr_matrix(
+            (np.r_[np.ones(e), -np.ones(e)], (np.r_[np.arange(e), np.arange(e)], np.r_[self.u, self.v])),
+            shape=(e, n))
+        B = (self.A.T @ sparse.diags(self.b) @ self.A).tocsr()
+
+        self.n_islands, self.island = connected_components(B, directed=False)
+        deg = np.bincount(np.r_[self.u, self.v], minlength=n)
+        order = np.lexsort((-deg, self.island))               # per island, highest degree first
+        first = np.r_[True, self.island[order][1:] != self.island[order][:-1]]
+        self.slack = np.sort(order[first])
+        self.keep = np.setdiff1d(np.arange(n), self.slack)
+        self.lu = splu(B[self.keep][:, self.keep].tocsc())
+
+    @classmethod
+    def from_graph(cls, g: "CSRGraph") -> "DCModel":
+        kv = g.attrs.get("tension_kv", np.full(g.n_edges, np.nan)).astype(float)
+        km = g.attrs.get("length_km", g.geometry.lengths_km()).astype(float)
+        return cls(g.n_nodes, g.u, g.v, reactance_pu(kv, km))
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.u)
+
+    def angles(self, P: np.ndarray) -> np.ndarray:
+        """N×T bus angles (rad·BASE_MVA scale, slack = 0) for N×T injections."""
+        P = np.asarray(P, dtype=float)
+        flat = P.ndim == 1
+        P = P[:, None] if flat else P
+        theta = np.zeros_like(P)
+        theta[self.keep] = self.lu.solve(np.ascontiguousarray(P[self.keep]))
+        return theta[:, 0] if flat else theta
+
+    def flows(self, P: np.ndarray) -> np.ndarray:
+        """E×T branch flows (same unit as P) for N×T injections, one batched solve."""
+        theta = self.angles(P)
+        d = theta[self.u] - theta[self.v]
+        return (self.b[:, None] * d) if d.ndim == 2 else self.b * d
+
+    def ptdf_blocks(self, block: int = 512) -> Iterator[tuple[slice, np.ndarray]]:
+        """(edge slice, PTDF rows) for consecutive edge blocks; slack columns are 0.
+
+        B is symmetric, so the PTDF rows of a block are the solution of
+        B·Y = b_e (e_u − e_v) for its edges, transposed.
+        """
+        for lo in range(0, self.n_edges, block):
+            rows = slice(lo, min(lo + block, self.n_edges))
+            rhs = (self.A[rows].multiply(self.b[rows, None])).T.tocsr()[self.keep].toarray()
+            out = np.zeros((rows.stop - rows.start, self.n))
+            out[:, self.keep] = self.lu.solve(rhs).T
+            yield rows, out
+
+    def ptdf(self, block: int = 512, dtype=np.float64) -> np.ndarray:
+        """Dense E×N PTDF assembled block by block."""
+        out = np.empty((self.n_edges, self.n), dtype=dtype)
+        for rows, blk in self.ptdf_blocks(block):
+            out[rows] = blk
+        return out
+
+    def balance(self, gen: np.ndarray, demand: np.ndarray) -> np.ndarray:
+        """N×T injections with each island's demand scaled to its generation.
+
+        Islands with generation but no demand leave the surplus to the slack.
+        """
+        gen, demand = np.asarray(gen, dtype=float), np.asarray(demand, dtype=float)
+        g = np.zeros((self.n_islands, gen.shape[1]))
+        d = np.zeros_like(g)
+        np.add.at(g, self.island, gen)
+        np.add.at(d, self.island, demand)
+        scale = np.divide(g, d, out=np.ones_like(g), where=d > 0)
+        return gen - demand * scale[self.island]
+
+# ─────────────────────────── injections ───────────────────────────
+@dataclass
+class Injections:
+    gen:    np.ndarray                    # N×T MW
+    demand: np.ndarray                    # N×T MW (withdrawals, positive)
+    hours:  list[str]
+    nominal: bool = False                 # True: generation_barras.json unit case
+    unmatched: list[str] = field(default_factory=list)   # barras outside the graph
+
+@lru_cache(maxsize=None)
+def _resolver(db_path: str) -> "BarraResolver":
+    from enerviz.names import BarraResolver
+    return BarraResolver.from_inventory(db_path)
+
+def read_injections(path: str | pathlib.Path, g: "CSRGraph",
+                    db_path: str | pathlib.Path = INVENTORY) -> tuple[np.ndarray, list[str], list[str]]:
+    """CSV barra,hora,mw → (N×T MW, hour labels, unmatched barras).
+
+    `barra` may be an inventory id or any spelling BarraResolver knows;
+    numeric hours are ordered numerically, anything else as text.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(path, sep=None, engine="python")
+    df.columns = [c.strip().lower() for c in df.columns]
+    hour = next((c for c in ("hora", "hour", "fecha", "ts") if c in df.columns), None)
+    if not {"barra", "mw"} <= set(df.columns) or hour is None:
+        raise KeyError(f"{path}: se esperan columnas barra, hora, mw (hay {list(df.columns)})")
+
+    index = g.index
+    barra = df["barra"].astype(str).str.strip()
+    if not barra.isin(index).all():            # names → ids, each spelling resolved once
+        ids = {n: (m.id if (m := _resolver(str(db_path)).resolve(n)) else None)
+               for n in barra[~barra.isin(index)].unique()}
+        barra = barra.map(lambda b: b if b in index else ids[b])
+    ok = barra.isin(index).to_numpy()
+
+    labels = df[hour].astype(str).unique()
+    numeric = pd.to_numeric(pd.Series(labels), errors="coerce")
+    hours = (labels[np.argsort(numeric.to_numpy())] if numeric.notna().all()
+             else np.sort(labels)).tolist()
+    col = {h: i for i, h in enumerate(hours)}
+    P = np.zeros((g.n_nodes, len(hours)))
+    np.add.at(P, (barra[ok].map(index).to_numpy(int),
+                  df.loc[ok, hour].astype(str).map(col).to_numpy(int)),
+              df.loc[ok, "mw"].astype(float).to_numpy())
+    return P, hours, sorted(df.loc[~ok, "barra"].astype(str).unique())
+
+def nominal_injections(g: "CSRGraph", db_path: str | pathlib.Path = INVENTORY) -> Injections:
+    """1 MW at every barra of generation_barras.json, 1 MW demand at every other one."""
+    from enerviz.inventory import connect
+    from enerviz.names import clean
+
+    gen = np.zeros((g.n_nodes, 1))
+    if GEN_BARRAS.exists():
+        keys = {clean(b) for b in json.loads(GEN_BARRAS.read_text())}
+        con = connect(db_path)
+        names = con.execute("SELECT id, name FROM inv.barra").df()
+        con.close()
+        index = g.index
+        for i, name in zip(names["id"], names["name"]):
+            if clean(name) in keys and i in index:
+                gen[index[i]] = 1.0
+    return Injections(gen, np.where(gen > 0, 0.0, 1.0), ["nominal"], nominal=True)
+
+def load_injections(g: "CSRGraph", gen_csv: str | None = None, demand_csv: str | None = None,
+                    db_path: str | pathlib.Path = INVENTORY) -> Injections:
+    """Hourly generation/demand CSVs on the graph's barras; nominal case without gen_csv."""
+    if not gen_csv:
+        return nominal_injections(g, db_path)
+    gen, hours, miss = read_injections(gen_csv, g, db_path)
+    demand = np.zeros_like(gen)
+    if demand_csv:
+        dem, dem_hours, miss_d = read_injections(demand_csv, g, db_path)
+        col = {h: i for i, h in enumerate(dem_hours)}
+        for t, h in enumerate(hours):
+            if h in col:
+                demand[:, t] = dem[:, col[h]]
+        miss = sorted(set(miss) | set(miss_d))
+    return Injections(gen, demand, hours, unmatched=miss)
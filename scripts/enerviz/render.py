@@ -0,0 +1,190 @@
+"""
+Whole-topology raster/vector rendering of the transmission graph.
+
+Nodes are placed at their substation's lon/lat.  Nodes without
+coordinates take a position from the layout cache, else a harmonic
+interpolation between their placed neighbours, else (components with no located node at all)
+a spring layout drawn beside the map; every non-geographic position is
+written back to the cache so the picture is stable between runs.
+
+All edges go into one LineCollection per panel, so drawing the full SEN
+is a single vectorised pass instead of one matplotlib artist per edge:
+
+    xy, src = layout(ids, anchors, u, v, cache=Path("data/processed/graph_layout.npz"))
+    draw(xy[u], xy[v], kv, comp, "data/processed/transmission_graph.png")
+"""
+from __future__ import annotations
+import pathlib
+from typing import Mapping, Sequence
+
+import numpy as np
+
+# same classes / colours as the viewer (viewer/src/utils/lineTable.ts)
+KV_CLASSES = [   # (min kV, colour, label)
+    (400, "#ff0000", "≥ 400 kV"),
+    (200, "#00ffff", "200–399 kV"),
+    (100, "#00ff00", "100–199 kV"),
+    (0,   "#ffff00", "< 100 kV"),
+]
+NO_KV = "#808080"
+BG    = "#101418"     # dark, like the globe: the viewer colours need it
+MAIN  = "#9a9a9a"     # largest component in the component panel
+SOURCES = ("coords", "cache", "neighbours", "spring")
+
+def kv_class(kv: np.ndarray) -> np.ndarray:
+    """Index into KV_CLASSES (len(KV_CLASSES) = unknown)."""
+    kv = np.asarray(kv, dtype=float)
+    cls = np.full(kv.shape, len(KV_CLASSES), dtype=np.int8)
+    for i, (lo, _, _) in reversed(list(enumerate(KV_CLASSES))):
+        cls[kv >= lo] = i
+    return cls
+
+# ───────────────────────────── layout ─────────────────────────────
+def layout(ids: Sequence[str], anchors: Mapping[str, tuple[float, float]],
+           u: np.ndarray, v: np.ndarray, *, cache: pathlib.Path | None = None,
+           sweeps: int = 50, seed: int = 42) -> tuple[np.ndarray, np.ndarray]:
+    """→ xy (N×2) and the source of each position (index into SOURCES)."""
+    n = len(ids)
+    xy = np.full((n, 2), np.nan)
+    src = np.full(n, -1, dtype=np.int8)
+    index = {k: i for i, k in enumerate(ids)}
+
+    for k, p in anchors.items():
+        if (i := index.get(k)) is not None and np.isfinite(p).all():
+            xy[i], src[i] = p, 0
+
+    if cache is not None and cache.exists():
+        c = np.load(cache, allow_pickle=False)
+        for k, p in zip(c["ids"], c["xy"]):
+            if (i := index.get(str(k))) is not None and src[i] < 0:
+                xy[i], src[i] = p, 1
+
+    # neighbour averaging, all unplaced nodes at once per sweep
+    uu, vv = np.concatenate([u, v]), np.concatenate([v, u])
+    for _ in range(sweeps):
+        todo = src < 0
+        if not todo.any():
+            break
+        ok = (src[vv] >= 0) & todo[uu]
+        if not ok.any():
+            break
+        acc = np.zeros((n, 2))
+        cnt = np.zeros(n)
+        np.add.at(acc, uu[ok], xy[vv[ok]])
+        np.add.at(cnt, uu[ok], 1)
+        hit = cnt > 0
+        xy[hit] = acc[hit] / cnt[hit, None]
+        src[hit] = 2
+
+    # then relax them (Jacobi): each = mean of all neighbours, so chains
+    # between two located substations spread out along the way
+    free = (src == 2)[uu]
+    if free.any():
+        deg = np.bincount(uu[free], minlength=n)
+        mobile = deg > 0
+        for _ in range(sweeps):
+            acc = np.zeros((n, 2))
+            np.add.at(acc, uu[free], xy[vv[free]])
+            xy[mobile] = acc[mobile] / deg[mobile, None]
+
+    if (rest := np.flatnonzero(src < 0)).size:
+        xy[rest] = _spring_block(rest, u, v, xy[src >= 0], seed)
+        src[rest] = 3
+
+    # tiny deterministic offsets so stacked neighbour placements stay visible
+    moved = src == 2
+    if moved.any():
+        span = np.nanmax(xy, axis=0) - np.nanmin(xy, axis=0)
+        jitter = np.random.default_rng(seed).normal(0, 1e-3, (moved.sum(), 2))
+        xy[moved] += jitter * np.where(span > 0, span, 1)
+
+    if cache is not None:
+        keep = src > 0
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(cache, ids=np.asarray(ids, dtype=str)[keep], xy=xy[keep])
+    return xy, src
+
+def _spring_block(rest: np.ndarray, u: np.ndarray, v: np.ndarray,
+                  placed: np.ndarray, seed: int) -> np.ndarray:
+    """Spring layout of the unanchored nodes, in a box east of the placed ones."""
+    import networkx as nx
+
+    g = nx.Graph()
+    g.add_nodes_from(rest.tolist())
+    inside = np.isin(u, rest) & np.isin(v, rest)
+    g.add_edges_from(zip(u[inside].tolist(), v[inside].tolist()))
+    pos = nx.spring_layout(g, seed=seed)
+    p = np.array([pos[i] for i in rest.tolist()])             # in [-1, 1]
+    if placed.size:
+        lo, hi = placed.min(axis=0), placed.max(axis=0)
+        size = max((hi - lo).max() * 0.25, 1e-6)
+        return np.column_stack([hi[0] + size * 0.2 + (p[:, 0] + 1) / 2 * size,
+                                lo[1] + (p[:, 1] + 1) / 2 * size])
+    return p
+
+# ────────────────────────────── draw ──────────────────────────────
+def draw(a: np.ndarray, b: np.ndarray, kv: np.ndarray, comp: np.ndarray,
+         path: str | pathlib.Path, *, geographic: bool = True,
+         title: str = "Topología SEN", formats: Sequence[str] = ("png",),
+         dpi: int = 200, linewidth: float = 0.5) -> list[pathlib.Path]:
+    """Two panels (kV class | connected component), one LineCollection each.
+
+    a, b: E×2 end points; kv: E voltages; comp: E component ids (0 = largest).
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+    from matplotlib.lines import Line2D
+
+    seg = np.stack([a, b], axis=1)
+    ok = np.isfinite(seg).all(axis=(1, 2))
+    seg, kv, comp = seg[ok], np.asarray(kv)[ok], np.asarray(comp)[ok]
+
+    pts = seg.reshape(-1, 2)
+    lo, hi = pts.min(axis=0), pts.max(axis=0)
+    aspect = 1 / np.cos(np.radians((lo[1] + hi[1]) / 2)) if geographic else 1.0
+    w, h = (hi - lo) * [1, aspect] + 1e-9
+    height = 12.0
+    width = min(max(height * w / h, 4.0), 12.0) * 2 + 1
+
+    fig, axes = plt.subplots(1, 2, figsize=(width, height), sharex=True, sharey=True,
+                             facecolor=BG)
+
+    kv_cols = np.array([c for _, c, _ in KV_CLASSES] + [NO_KV])
+    cls = kv_class(kv)
+    order = np.argsort(-cls)                              # high voltage on top
+    axes[0].add_collection(LineCollection(seg[order], colors=kv_cols[cls[order]],
+                                          linewidths=linewidth))
+    axes[0].legend(handles=[Line2D([], [], color=c, label=l) for _, c, l in KV_CLASSES]
+                           + [Line2D([], [], color=NO_KV, label="sin tensión")],
+                   loc="lower left", fontsize=8, frameon=False, labelcolor="white")
+    fig.suptitle(title, color="white")
+    axes[0].set_title("tensión", color="white")
+
+    n_comp = int(comp.max()) + 1 if comp.size else 0
+    palette = plt.get_cmap("tab20")(np.arange(20))
+    comp_cols = np.where((comp == 0)[:, None], matplotlib.colors.to_rgba(MAIN),
+                         palette[(comp - 1) % 20])
+    axes[1].add_collection(LineCollection(seg, colors=comp_cols,
+                                          linewidths=np.where(comp == 0, linewidth, linewidth * 3)))
+    axes[1].set_title(f"{n_comp} componentes\n(gris = principal)", color="white")
+
+    for ax in axes:
+        ax.set_xlim(lo[0], hi[0])
+        ax.set_ylim(lo[1], hi[1])
+        ax.set_aspect(aspect)
+        ax.set_facecolor(BG)
+        ax.set_xticks([]); ax.set_yticks([])
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+    fig.tight_layout()
+
+    path = pathlib.Path(path)
+    out = []
+    for ext in formats:
+        p = path.with_suffix(f".{ext}")
+        fig.savefig(p, dpi=dpi, facecolor=BG)
+        out.append(p)
+    plt.close(fig)
+    return out
@@ -0,0 +1,173 @@
+"""
+Dated inventory snapshots and their diff.
+
+01_ingest_inventory.py overwrites inventory.duckdb on every run; before it
+finishes it also calls take(), which freezes the canonical views of the
+grid entities as
+
+    data/curated/snapshots/<YYYY-MM-DD>/<table>.parquet     inv.<table> + row_hash
+    data/curated/snapshots/<YYYY-MM-DD>/manifest.json       source, rows per table
+
+row_hash is the md5 of every canonical column but the id (tramos also hash
+their shapefile geometry), so two snapshots are compared with one hash
+join per table on (id, row_hash); the column-by-column comparison only
+runs for the rows whose hash differs:
+
+    d = diff("2025-03-01", "2025-04-01")
+    d.tables["tramo"].added, d.tables["tramo"].modified, d.connectivity
+"""
+from __future__ import annotations
+import datetime, json, pathlib
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import duckdb
+    import numpy as np
+
+SNAPSHOTS = pathlib.Path("data/curated/snapshots")
+ENTITIES  = ("subestacion", "barra", "linea", "tramo")
+MANIFEST  = "manifest.json"
+
+def _q(col: str) -> str:
+    return '"' + col.replace('"', '""') + '"'
+
+def take(con: "duckdb.DuckDBPyConnection", date: str | None = None, *,
+         root: str | pathlib.Path = SNAPSHOTS, source: str | None = None) -> pathlib.Path:
+    """Write the inv.* entities of `con` as snapshot `date` (default today); replaces it."""
+    date = date or datetime.date.today().isoformat()
+    dest = pathlib.Path(root) / date
+    dest.mkdir(parents=True, exist_ok=True)
+    rows = {}
+    for tbl in ENTITIES:
+        src = f"inv.{tbl}"
+        if tbl == "tramo":      # geometry edits count as modifications
+            src = ("(SELECT t.*, md5(g.wkt) AS geom_md5 FROM inv.tramo t "
+                   "LEFT JOIN inv.geom g ON g.tramo_id = t.id)")
+        cols = [r[0] for r in con.execute(f"DESCRIBE SELECT * FROM {src}").fetchall()]
+        parts = ", ".join(f"coalesce(CAST({_q(c)} AS VARCHAR), '\\N')" for c in cols if c != "id")
+        out = dest / f"{tbl}.parquet"
+        con.execute(f"""
+            COPY (SELECT *, md5(concat_ws(chr(31), {parts})) AS row_hash
+                  FROM {src} WHERE id IS NOT NULL ORDER BY id)
+            TO '{out}' (FORMAT PARQUET, COMPRESSION zstd)
+        """)
+        rows[tbl] = con.execute(f"SELECT count(*) FROM '{out}'").fetchone()[0]
+    (dest / MANIFEST).write_text(json.dumps({
+        "date": date, "source": source, "rows": rows,
+        "taken": datetime.datetime.now().isoformat(timespec="seconds"),
+    }, indent=1, ensure_ascii=False))
+    return dest
+
+def available(root: str | pathlib.Path = SNAPSHOTS) -> list[str]:
+    """Snapshot dates, oldest first."""
+    root = pathlib.Path(root)
+    return sorted(p.parent.name for p in root.glob(f"*/{MANIFEST}")) if root.exists() else []
+
+def manifest(date: str, root: str | pathlib.Path = SNAPSHOTS) -> dict:
+    return json.loads((pathlib.Path(root) / date / MANIFEST).read_text())
+
+# ───────────────────────────── diff ─────────────────────────────
+@dataclass
+class TableDiff:
+    added:    list[str] = field(default_factory=list)
+    removed:  list[str] = field(default_factory=list)
+    modified: dict[str, list[str]] = field(default_factory=dict)    # id → changed columns
+
+    def counts(self) -> dict[str, int]:
+        return {"added": len(self.added), "removed": len(self.removed),
+                "modified": len(self.modified)}
+
+@dataclass
+class Diff:
+    a: str
+    b: str
+    tables: dict[str, TableDiff]
+    connectivity: dict
+
+    def summary(self) -> dict:
+        return {"a": self.a, "b": self.b,
+                "tables": {t: d.counts() for t, d in self.tables.items()},
+                "connectivity": {k: v for k, v in self.connectivity.items()
+                                 if not isinstance(v, list)}}
+
+def _table_diff(con: "duckdb.DuckDBPyConnection", pa: pathlib.Path, pb: pathlib.Path) -> TableDiff:
+    keys = con.execute(f"""
+        SELECT coalesce(a.id, b.id) AS id, a.id IS NULL AS added, b.id IS NULL AS removed
+        FROM (SELECT id, row_hash FROM '{pa}') a
+        FULL OUTER JOIN (SELECT id, row_hash FROM '{pb}') b ON a.id = b.id
+        WHERE a.row_hash IS DISTINCT FROM b.row_hash
+        ORDER BY 1
+    """).df()
+    out = TableDiff(keys.loc[keys["added"], "id"].tolist(), keys.loc[keys["removed"], "id"].tolist())
+    mod = keys.loc[~keys["added"] & ~keys["removed"], ["id"]]
+    if len(mod):
+        ca = {r[0] for r in con.execute(f"DESCRIBE SELECT * FROM '{pa}'").fetchall()}
+        cb = [r[0] for r in con.execute(f"DESCRIBE SELECT * FROM '{pb}'").fetchall()]
+        cols = [c for c in cb if c in ca and c not in ("id", "row_hash")]
+        flags = ", ".join(f"CASE WHEN a.{_q(c)} IS DISTINCT FROM b.{_q(c)} THEN '{c}' END" for c in cols)
+        con.register("mod", mod)
+        for i, changed in con.execute(f"""
+            SELECT a.id, list_filter([{flags}], x -> x IS NOT NULL)
+            FROM '{pa}' a JOIN '{pb}' b ON a.id = b.id
+            WHERE a.id IN (SELECT id FROM mod)
+            ORDER BY a.id
+        """).fetchall():
+            out.modified[i] = changed or sorted(set(cb) ^ ca)     # only the schema changed
+        con.unregister("mod")
+    return out
+
+def _components(u: "np.ndarray", v: "np.ndarray", nodes: "np.ndarray") -> "np.ndarray":
+    """Component label per node of `nodes` for the edge list u–v (node ids)."""
+    import numpy as np
+    from scipy import sparse
+    from scipy.sparse.csgraph import connected_components
+
+    iu, iv = np.searchsorted(nodes, u), np.searchsorted(nodes, v)
+    adj = sparse.coo_matrix((np.ones(len(iu)), (iu, iv)), shape=(len(nodes),) * 2)
+    return connected_components(adj, directed=False)[1]
+
+def connectivity(con: "duckdb.DuckDBPyConnection", pa: pathlib.Path, pb: pathlib.Path,
+                 barra_a: pathlib.Path, barra_b: pathlib.Path) -> dict:
+    """Components of the barra–tramo graph in both snapshots and who left / joined the main one."""
+    import numpy as np
+
+    out = {}
+    mains = []
+    for tag, tramo, barra in (("a", pa, barra_a), ("b", pb, barra_b)):
+        e = con.execute(f"""SELECT nodo1_id, nodo2_id FROM '{tramo}'
+                            WHERE nodo1_id IS NOT NULL AND nodo2_id IS NOT NULL""").fetchnumpy()
+        u, v = e["nodo1_id"].astype(str), e["nodo2_id"].astype(str)
+        nodes = np.union1d(np.unique(np.r_[u, v]),
+                           con.execute(f"SELECT id FROM '{barra}'").fetchnumpy()["id"].astype(str))
+        label = _components(u, v, nodes)
+        size = np.bincount(label)
+        main = nodes[label == np.argmax(size)] if len(size) else nodes[:0]
+        mains.append((nodes, main))
+        out[f"components_{tag}"] = int(len(size))
+        out[f"main_{tag}"] = int(size.max()) if len(size) else 0
+        out[f"isolated_{tag}"] = int((size == 1).sum())
+    (na, ma), (nb, mb) = mains
+    out["components_delta"] = out["components_b"] - out["components_a"]
+    out["main_delta"] = out["main_b"] - out["main_a"]
+    # barras present in both snapshots that changed side of the main component
+    both = np.intersect1d(na, nb)
+    out["left_main"] = np.setdiff1d(np.intersect1d(ma, both), mb).tolist()
+    out["joined_main"] = np.setdiff1d(np.intersect1d(mb, both), ma).tolist()
+    return out
+
+def diff(a: str, b: str, root: str | pathlib.Path = SNAPSHOTS) -> Diff:
+    """Added / removed / modified rows per entity and the connectivity change from a to b."""
+    import duckdb
+
+    root = pathlib.Path(root)
+    for d in (a, b):
+        if not (root / d / MANIFEST).exists():
+            raise FileNotFoundError(f"no hay snapshot {d} en {root} (hay {available(root)})")
+    con = duckdb.connect()
+    tables = {t: _table_diff(con, root / a / f"{t}.parquet", root / b / f"{t}.parquet")
+              for t in ENTITIES}
+    conn = connectivity(con, root / a / "tramo.parquet", root / b / "tramo.parquet",
+                        root / a / "barra.parquet", root / b / "barra.parquet")
+    con.close()
+    return Diff(a, b, tables, conn)
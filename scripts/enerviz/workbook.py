@@ -0,0 +1,107 @@
+"""
+Fast .xlsx access for the pipeline.
+
+  • sheet_names()   reads xl/workbook.xml straight from the zip: no cell
+                    data is parsed, so probing every workbook under
+                    data/raw for a sheet costs milliseconds.
+  • read_sheet()    one sheet → DataFrame with the Rust calamine engine
+                    (pip install python-calamine) when available, else
+                    openpyxl in read-only streaming mode (rows are pulled
+                    from the XML one at a time instead of building the
+                    full DOM that pd.read_excel's default path builds),
+                    handed to pandas' own TextParser so both engines give
+                    the same frame.
+  • read_sheets()   several sheets of one workbook, one process each.
+
+    from enerviz.workbook import read_sheets, sheet_names
+    frames = read_sheets(xlsx, ["Linea", "Tramo"])      # {sheet: DataFrame}
+"""
+from __future__ import annotations
+import importlib.util, os, pathlib, zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Iterable, Sequence
+from xml.etree import ElementTree
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else "openpyxl"
+
+_NS = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+def sheet_names(path: str | pathlib.Path) -> list[str]:
+    """Sheet names in workbook order, from the zip index only."""
+    try:
+        with zipfile.ZipFile(path) as z, z.open("xl/workbook.xml") as f:
+            root = ElementTree.parse(f).getroot()
+    except (zipfile.BadZipFile, KeyError):       # .xls or a damaged file
+        import pandas as pd
+        with pd.ExcelFile(path) as xls:
+            return list(xls.sheet_names)
+    return [s.get("name") for s in root.iterfind("m:sheets/m:sheet", _NS)]
+
+def find_workbook(root: str | pathlib.Path, sheet: str) -> pathlib.Path | None:
+    """First .xlsx under root (recursive) that has a sheet called `sheet`."""
+    for p in sorted(pathlib.Path(root).rglob("*.xlsx")):
+        try:
+            if sheet in sheet_names(p):
+                return p
+        except Exception:
+            pass
+    return None
+
+def read_sheet(path: str | pathlib.Path, sheet: str, *, header: int = 0,
+               usecols: Sequence[str] | None = None, engine: str = ENGINE) -> "pd.DataFrame":
+    """One sheet as a DataFrame; `header` is the 0-based header row."""
+    import pandas as pd
+
+    if engine == "calamine":
+        return pd.read_excel(path, sheet_name=sheet, header=header,
+                             usecols=usecols, engine="calamine")
+
+    import openpyxl
+    from pandas.io.parsers import TextParser
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet]
+        ws.reset_dimensions()                 # the declared <dimension> may be stale
+        data = [[_cell(v) for v in r] for r in ws.iter_rows(values_only=True)]
+    finally:
+        wb.close()
+    # the rows pandas' own readers hand to TextParser: trailing empty cells and
+    # rows trimmed, padded to the widest row; blank rows inside are kept, so
+    # `header` offsets, 'x', 'x.1' dedup and dtypes match the calamine path
+    for r in data:
+        while r and r[-1] == "":
+            r.pop()
+    while data and not data[-1]:
+        data.pop()
+    width = max(map(len, data), default=0)
+    data = [r + [""] * (width - len(r)) for r in data]
+    if not data:
+        return pd.DataFrame()
+    return TextParser(data, header=header, usecols=usecols, skip_blank_lines=False).read()
+
+def _cell(v):
+    """openpyxl value as pandas' Excel readers pass it on: '' for empty, int for 1.0."""
+    if v is None:
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    return v
+
+def _read_one(args: tuple) -> "pd.DataFrame":
+    path, sheet, header, engine = args
+    return read_sheet(path, sheet, header=header, engine=engine)
+
+def read_sheets(path: str | pathlib.Path, sheets: Iterable[str], *, header: int = 0,
+                workers: int | None = None, engine: str = ENGINE) -> dict[str, "pd.DataFrame"]:
+    """{sheet: DataFrame}, parsing the sheets in parallel processes."""
+    sheets = list(sheets)
+    workers = min(workers or os.cpu_count() or 1, len(sheets))
+    jobs = [(str(path), s, header, engine) for s in sheets]
+    if workers <= 1:
+        return {s: _read_one(j) for s, j in zip(sheets, jobs)}
+    with ProcessPoolExecutor(workers) as pool:
+        return dict(zip(sheets, pool.map(_read_one, jobs)))
@@ -6,34 +6,41 @@ Carga:
   • uno o varios shapefiles IDE (66-500 kV)
 
 Genera:
-  data/curated/inventory.duckdb
+  data/curated/inventory.duckdb   (hojas tal cual + vistas canónicas inv.*,
+                                   ver scripts/enerviz/inventory.py)
   data/curated/subestacion.parquet
   data/curated/tramo_geom.parquet
+  data/curated/snapshots/<fecha>/   snapshot fechado de inv.* con hash por fila
+                                    (scripts/enerviz/snapshots.py, ver inventory_diff.py)
 """
 from __future__ import annotations
-import argparse, pathlib
-import duckdb, pandas as pd, pyogrio
+import argparse, pathlib, sys
+import duckdb, pyogrio
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))   # scripts/ → enerviz
+from enerviz.instrument import stage
+from enerviz.inventory import create_views, resolve_sheets
+from enerviz.snapshots import take
+from enerviz.workbook import ENGINE, read_sheets, sheet_names
 
 # ───────────────────────── helpers ──────────────────────────
-def ingest(xlsx_path: str, shp_paths: list[str]) -> None:
+def ingest(xlsx_path: str, shp_paths: list[str], snapshot_date: str | None = None) -> None:
     curated = pathlib.Path("data/curated")
     curated.mkdir(parents=True, exist_ok=True)
 
     con = duckdb.connect(curated / "inventory.duckdb", read_only=False)
 
     # ---------- 1. hojas clave del Excel ----------
-    sheet_map = {
-        "linea":        "Linea",
-        "circuito":     "Circuito",
-        "tramo":        "Tramo",
-        "subestacion":  "Subestaciones",
-        "barra":        "Barras",
-        "empresa":      "Empresa",
-    }
+    sheet_map = resolve_sheets(sheet_names(xlsx_path))     # índice del zip, sin celdas
+    with stage("read_sheets", engine=ENGINE) as st:       # una hoja por proceso
+        frames = read_sheets(xlsx_path, sheet_map.values())
+        st.rows_out = sum(len(df) for df in frames.values())
     for tbl, sheet in sheet_map.items():
         print(f"→ hoja «{sheet}» → tabla {tbl}")
-        df = pd.read_excel(xlsx_path, sheet_name=sheet)
-        con.execute(f"CREATE OR REPLACE TABLE {tbl} AS SELECT * FROM df")
+        with stage(f"sheet_{tbl}") as st:
+            df = frames[sheet]
+            con.execute(f"CREATE OR REPLACE TABLE {tbl} AS SELECT * FROM df")
+            st.rows_out = len(df)
 
     # ---------- 2. geometría de líneas ----------
     con.execute(
@@ -43,43 +50,59 @@ def ingest(xlsx_path: str, shp_paths: list[str]) -> None:
 
     for shp in shp_paths:
         print(f"→ leyendo shapefile {shp}")
-        gdf = (
-            pyogrio.read_dataframe(
-                shp,
-                columns=["ID_LIN_TRA", "TENSION_KV", "geometry"],
-            )
-            .rename(
-                columns={
-                    "ID_LIN_TRA": "tramo_ref_id",
-                    "TENSION_KV": "kv",
-                    "geometry": "geom",
-                }
+        with stage("read_shapefile", shp=str(shp)) as st:
+            gdf = (
+                pyogrio.read_dataframe(
+                    shp,
+                    columns=["ID_LIN_TRA", "TENSION_KV", "geometry"],
+                )
+                .rename(
+                    columns={
+                        "ID_LIN_TRA": "tramo_ref_id",
+                        "TENSION_KV": "kv",
+                        "geometry": "geom",
+                    }
+                )
+                .astype({"tramo_ref_id": "int64", "kv": "float64"})
             )
-            .astype({"tramo_ref_id": "int64", "kv": "float64"})
-        )
-        gdf["geom"] = gdf["geom"].apply(lambda g: g.wkt if g is not None else None)
+            gdf["geom"] = gdf["geom"].apply(lambda g: g.wkt if g is not None else None)
 
-        con.register("gdf", gdf)
-        con.execute("INSERT INTO geom_tramo SELECT * FROM gdf")
-        con.unregister("gdf")
+            con.register("gdf", gdf)
+            con.execute("INSERT INTO geom_tramo SELECT * FROM gdf")
+            con.unregister("gdf")
+            st.rows_out = len(gdf)
 
     # ---------- 3. unir Tramo ←→ geometría ----------
     print("→ construyendo tabla tramo_geom")
-    con.execute(
-        """
-        CREATE OR REPLACE TABLE tramo_geom AS
-        SELECT t.*, g.geom, g.kv
-        FROM tramo t
-        LEFT JOIN geom_tramo g
-        ON t.id = g.tramo_ref_id
-        """
-    )
+    with stage("join_tramo_geom"):
+        con.execute(
+            """
+            CREATE OR REPLACE TABLE tramo_geom AS
+            SELECT t.*, g.geom, g.kv
+            FROM tramo t
+            LEFT JOIN geom_tramo g
+            ON t.id = g.tramo_ref_id
+            """
+        )
+
+    # ---------- 4. vistas canónicas para las etapas 02–07 ----------
+    with stage("create_views"):
+        for tbl, cols in create_views(con).items():
+            if absent := [c for c, src in cols.items() if src is None]:
+                print(f"  · {tbl}: sin columnas {absent}")
+
+    # ---------- 5. snapshot fechado (se reemplaza si ya existe esa fecha) ----------
+    with stage("snapshot") as st:
+        snap = take(con, snapshot_date, source=pathlib.Path(xlsx_path).name)
+        st.extra["snapshot"] = snap.name
+    print(f"→ snapshot {snap}")
 
-    # ---------- 4. exportar Parquet para front-end ----------
+    # ---------- 6. exportar Parquet para front-end ----------
     for tbl in ("subestacion", "tramo_geom"):
         out = curated / f"{tbl}.parquet"
         print(f"→ escribiendo {out}")
-        con.execute(f"COPY {tbl} TO '{out}' (FORMAT 'parquet')")
+        with stage(f"export_{tbl}"):
+            con.execute(f"COPY {tbl} TO '{out}' (FORMAT 'parquet')")
 
     con.close()
     print("✔ ETL terminado")
@@ -94,8 +117,9 @@ def main() -> None:
         nargs="+",
         help="uno o varios shapefiles de líneas",
     )
+    ap.add_argument("--snapshot-date", help="fecha del snapshot (YYYY-MM-DD, por defecto hoy)")
     args = ap.parse_args()
-    ingest(args.xlsx, args.shp)   # <<< ajuste clave
+    ingest(args.xlsx, args.shp, args.snapshot_date)   # <<< ajuste clave
 
 if __name__ == "__main__":
     main()
@@ -3,66 +3,78 @@
 
 """
 Construcción del grafo de transmisión del SEN usando el inventario maestro
-(instalaciones_activos.xlsx) como fuente única de verdad para la topología.
+(instalaciones_activos.xlsx, ya cargado en data/curated/inventory.duckdb por
+01_ingest_inventory.py) como fuente única de verdad para la topología.
 
 **Nota**: Dado que el shapefile de IDE Energía no siempre está actualizado, este script:
-  - Usa exclusivamente la hoja "Tramo" del Excel maestro para definir todas las conexiones lógicas
-    (nodo1_id ↔ nodo2_id).
-  - Integra geometría donde esté disponible en `tramo_geom.parquet`.
+  - Usa exclusivamente la hoja "Tramo" del Excel maestro (vista inv.tramo) para definir
+    todas las conexiones lógicas (nodo1_id ↔ nodo2_id).
+  - Integra geometría donde esté disponible (vista inv.geom ← shapefiles IDE) y la
+    conserva columnar, alineada a las aristas del grafo CSR (scripts/enerviz/graph.py).
   - Marca y exporta las aristas faltantes de geometría para auditoría.
 
 Salida esperada:
   - Métricas generales impresas en consola.
   - `data/processed/node_degrees.csv`: grado de cada nodo.
   - `data/processed/edges_missing_geom.csv`: aristas sin geometría.
-  - `data/processed/transmission_graph_sample.png`: imagen de un subgrafo de muestra.
+  - `data/processed/transmission_graph.npz`: grafo CSR (un tramo = una arista) con
+    coordenadas + offsets de cada arista, tensión y largo en km.
+  - `data/processed/transmission_graph.png` (y .svg con --svg): topología completa sobre
+    coordenadas de subestación, coloreada por tensión y por componente conexa
+    (ver scripts/enerviz/render.py; posiciones sin coordenada → graph_layout.npz).
 """
 import argparse
 import sys
+import numpy as np
 import pandas as pd
 import networkx as nx
-import matplotlib.pyplot as plt
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))   # scripts/ → enerviz
+from enerviz.graph import CSRGraph, Geometry
+from enerviz.instrument import stage, timed
+from enerviz.inventory import INVENTORY, connect
+from enerviz.render import draw, layout
 
-def build_graph(xlsx_path: str, parquet_path: str, out_dir: str) -> None:
+
+@timed()
+def build_graph(db_path: str, out_dir: str, svg: bool = False) -> None:
     out = Path(out_dir)
     out.mkdir(parents=True, exist_ok=True)
 
-    # 1) Leer inventario maestro con pandas
+    # 1-3) Tramos del inventario + disponibilidad de geometría, en una sola consulta
     try:
-        df_tramo = pd.read_excel(
-            xlsx_path,
-            sheet_name='Tramo',
-            dtype={'id': int, 'circuito_id': int, 'nodo1_id': int, 'nodo2_id': int}
-        )
+        con = connect(db_path)
+        df_edges = con.execute("""
+            SELECT t.id AS tramo_id, t.circuito_id, t.nodo1_id, t.nodo2_id, t.has_geom,
+                   l.tension_kv, g.wkt
+            FROM inv.tramo t
+            LEFT JOIN inv.circuito c ON c.id = t.circuito_id
+            LEFT JOIN inv.linea    l ON l.id = c.linea_id
+            LEFT JOIN inv.geom     g ON g.tramo_id = t.id
+        """).df()
+        df_nodes = con.execute("""
+            SELECT b.id AS node_id, s.lon, s.lat
+            FROM inv.barra b LEFT JOIN inv.subestacion s ON s.id = b.subestacion_id
+        """).df()
+        con.close()
     except Exception as e:
-        print(f"ERROR al leer hoja 'Tramo' del Excel: {e}", file=sys.stderr)
+        print(f"ERROR al leer inventario {db_path}: {e}", file=sys.stderr)
         sys.exit(1)
-    df_tramo = df_tramo.rename(columns={'id': 'tramo_id'})
-    df_tramo = df_tramo[['tramo_id', 'circuito_id', 'nodo1_id', 'nodo2_id']]
-    print(f"Total de tramos en Excel: {len(df_tramo)}")
-
-    # 2) Leer geometría disponible de parquet
-    try:
-        df_geom = pd.read_parquet(parquet_path, columns=['id', 'geom'])
-    except Exception as e:
-        print(f"ERROR al leer Parquet {parquet_path}: {e}", file=sys.stderr)
-        sys.exit(1)
-    df_geom = df_geom.rename(columns={'id': 'tramo_id'})
-    print(f"Tramos con geometría parquet: {len(df_geom)}")
-
-    # 3) Unir lógica + geometría
-    df_edges = df_tramo.merge(df_geom, on='tramo_id', how='left')
-    missing_geom = df_edges['geom'].isna().sum()
+    print(f"Total de tramos en inventario: {len(df_edges)}")
+    sin_nodo = df_edges['nodo1_id'].isna() | df_edges['nodo2_id'].isna()
+    if sin_nodo.any():
+        print(f"  · {int(sin_nodo.sum())} tramos sin nodo1_id/nodo2_id, se omiten")
+        df_edges = df_edges[~sin_nodo].reset_index(drop=True)
+    print(f"Tramos con geometría: {int(df_edges['has_geom'].sum())}")
+    missing_geom = int((~df_edges['has_geom']).sum())
     print(f"Aristas sin geometría (faltantes en shapefile): {missing_geom}")
 
-    # 4) Construir grafo con nodos y aristas
+    # 4) Construir grafo con nodos y aristas (ids VARCHAR, como en el CSR)
     G = nx.Graph()
     for _, r in df_edges.iterrows():
-        u = int(r['nodo1_id'])
-        v = int(r['nodo2_id'])
-        G.add_edge(u, v, tramo_id=int(r['tramo_id']), has_geom=not pd.isna(r['geom']))
+        G.add_edge(str(r['nodo1_id']), str(r['nodo2_id']),
+                   tramo_id=str(r['tramo_id']), has_geom=bool(r['has_geom']))
 
     # 5) Métricas de grafo y componentes
     print(f"Nodos totales: {G.number_of_nodes()}")
@@ -78,32 +90,52 @@ def build_graph(xlsx_path: str, parquet_path: str, out_dir: str) -> None:
 
     # 7) Exportar aristas sin geometría para auditoría
     missing_edges = df_edges.loc[
-        df_edges['geom'].isna(), ['tramo_id', 'circuito_id', 'nodo1_id', 'nodo2_id']
+        ~df_edges['has_geom'], ['tramo_id', 'circuito_id', 'nodo1_id', 'nodo2_id']
     ]
     missing_edges.to_csv(out / 'edges_missing_geom.csv', index=False)
     print(f"Audit log de aristas sin geometría guardado en {out / 'edges_missing_geom.csv'}")
 
-    # 8) Visualizar subgrafo de muestra
-    sample_edges = list(G.edges())[:200]
-    Gs = G.edge_subgraph(sample_edges).copy()
-    pos = nx.spring_layout(Gs, seed=42)
-    plt.figure(figsize=(8, 8))
-    nx.draw(Gs, pos, node_size=20, node_color='skyblue', edge_color='gray', linewidths=0.2)
-    plt.title('Subgrafo de 200 aristas (topología SEN)')
-    plt.axis('off')
-    plt.tight_layout()
-    img_path = out / 'transmission_graph_sample.png'
-    plt.savefig(img_path, dpi=150)
-    print(f"Imagen de muestra guardada en {img_path}")
-
+    # 8) Grafo CSR con la geometría de cada tramo alineada a su arista
+    with stage('csr_geometry', rows_in=len(df_edges)) as st:
+        csr = CSRGraph.from_edges(
+            df_edges['nodo1_id'], df_edges['nodo2_id'],
+            geometry=Geometry.from_wkt(df_edges['wkt']),
+            tramo_id=df_edges['tramo_id'].astype(str),
+            tension_kv=df_edges['tension_kv'].astype(float),
+        )
+        csr.attrs['length_km'] = csr.geometry.lengths_km()
+        csr.save(out / 'transmission_graph.npz')
+        st.rows_out = len(csr.geometry.coords)
+    print(f"Grafo CSR: {csr.n_nodes} nodos, {csr.n_edges} aristas, "
+          f"{len(csr.geometry.coords)} vértices, "
+          f"{csr.attrs['length_km'].sum():,.0f} km → {out / 'transmission_graph.npz'}")
+
+    # 9) Dibujar la topología completa (coordenadas de S/E, layout en caché como respaldo)
+    ids = [str(n) for n in G.nodes()]
+    index = {n: i for i, n in enumerate(G.nodes())}
+    u = np.fromiter((index[a] for a, _ in G.edges()), dtype=np.int64, count=G.number_of_edges())
+    v = np.fromiter((index[b] for _, b in G.edges()), dtype=np.int64, count=G.number_of_edges())
+    anchors = {str(r.node_id): (r.lon, r.lat)
+               for r in df_nodes.dropna().itertuples()}
+    xy, src = layout(ids, anchors, u, v, cache=out / 'graph_layout.npz')
+    print(f"Posiciones: {int((src == 0).sum())} con coordenadas, {int((src > 0).sum())} por layout")
+
+    kv_by_tramo = df_edges.set_index('tramo_id')['tension_kv'].to_dict()
+    kv = np.array([kv_by_tramo.get(d['tramo_id'], np.nan) for _, _, d in G.edges(data=True)])
+    comp_of = {n: k for k, c in enumerate(sorted(comps, key=len, reverse=True)) for n in c}
+    comp = np.array([comp_of[a] for a, _ in G.edges()])
+    formats = ('png', 'svg') if svg else ('png',)
+    for img_path in draw(xy[u], xy[v], kv, comp, out / 'transmission_graph', formats=formats,
+                         geographic=bool((src == 0).any())):
+        print(f"Imagen de la topología guardada en {img_path}")
 
 def main():
-    parser = argparse.ArgumentParser(description='Construir grafo de transmisión desde Excel maestro')
-    parser.add_argument('--xlsx', required=True, help='ruta a instalaciones_activos.xlsx')
-    parser.add_argument('--parquet', required=True, help='ruta a tramo_geom.parquet')
+    parser = argparse.ArgumentParser(description='Construir grafo de transmisión desde el inventario')
+    parser.add_argument('--db', default=str(INVENTORY), help='ruta a inventory.duckdb (01_ingest_inventory)')
     parser.add_argument('--out', default='data/processed', help='directorio de salida')
+    parser.add_argument('--svg', action='store_true', help='además de PNG, escribir SVG')
     args = parser.parse_args()
-    build_graph(args.xlsx, args.parquet, args.out)
+    build_graph(args.db, args.out, args.svg)
 
 if __name__ == '__main__':
     main()
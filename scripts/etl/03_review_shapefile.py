@@ -3,71 +3,88 @@
 
 """
 Compara el shapefile de IDE Energía con el inventario maestro de líneas
-(obtenido de la hoja "Linea" de instalaciones_activos.xlsx).
-Acepta ruta a un archivo .shp o a un directorio que contenga un shapefile.
+(hoja "Linea" de instalaciones_activos.xlsx, leída de la vista inv.linea de
+data/curated/inventory.duckdb).
+Acepta rutas a archivos .shp o a directorios con shapefiles (p. ej. las
+capas de 66 a 500 kV); todas se concatenan antes de comparar.
+
+Con --reconcile, las líneas del inventario sin match por ID se cruzan
+espacialmente con las geometrías huérfanas del shapefile (STRtree sobre la
+caja de sus S/E extremas + Hausdorff/Fréchet + similitud de nombre y kV) y
+se escribe data/processed/line_matches.csv con la confianza de cada par.
 """
 import argparse
 import sys
 from pathlib import Path
+import numpy as np
 import pandas as pd
 import geopandas as gpd
+import shapely
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))   # scripts/ → enerviz
+from enerviz.instrument import stage, timed
+from enerviz.inventory import INVENTORY, connect
+from enerviz.names import clean, trigrams
 
 
-def find_shapefile(path: Path) -> Path:
-    """Retorna el primer archivo .shp válido en un directorio o el mismo si es un archivo shapefile."""
+def find_shapefiles(path: Path) -> list[Path]:
+    """Todos los .shp de un directorio (ordenados), o el mismo si es un archivo shapefile."""
     if path.is_file() and path.suffix.lower() == '.shp':
-        return path
+        return [path]
     if path.is_dir():
-        candidates = [f for f in path.iterdir() if f.suffix.lower() == '.shp' and not f.name.lower().endswith('.shp.xml')]
+        candidates = sorted(f for f in path.iterdir() if f.suffix.lower() == '.shp')
         if not candidates:
             raise FileNotFoundError(f"No se encontró ningún .shp válido en {path}")
-        return candidates[0]
+        return candidates
     raise FileNotFoundError(f"Ruta inválida para shapefile: {path}")
 
 
-def review(xlsx_path: str, shp_input: str) -> None:
-    # 1) Cargar hoja 'Linea' del Excel maestro
+@timed()
+def review(db_path: str, shp_inputs: list[str], reconcile_out: Path | None = None,
+           buffer_km: float = 10.0) -> None:
+    # 1) Cargar líneas del inventario maestro (+ lon/lat de sus S/E extremas)
     try:
-        df = pd.read_excel(
-            xlsx_path,
-            sheet_name='Linea',
-            dtype={'id': str},
-        )
+        con = connect(db_path)
+        df = con.execute("""
+            SELECT l.id AS ID_LIN_TRA, l.name AS NOMBRE, l.tension_kv AS TENSION_KV,
+                   o.lon AS x0, o.lat AS y0, d.lon AS x1, d.lat AS y1
+            FROM inv.linea l
+            LEFT JOIN inv.subestacion o ON o.id = l.sub_origen_id
+            LEFT JOIN inv.subestacion d ON d.id = l.sub_destino_id
+        """).df()
+        con.close()
     except Exception as e:
-        print(f"ERROR al leer hoja 'Linea': {e}", file=sys.stderr)
+        print(f"ERROR al leer inventario {db_path}: {e}", file=sys.stderr)
         sys.exit(1)
-    # Renombrar columnas de interés
-    df = df.rename(columns={'id': 'ID_LIN_TRA', 'name': 'NOMBRE'})
-    # Ajustar nombre de columna para tensión si existe
-    if 'voltaje_kV' in df.columns:
-        df = df.rename(columns={'voltaje_kV': 'TENSION_KV'})
     master_ids = set(df['ID_LIN_TRA'].astype(str))
-    print(f"Maestro Excel: {len(master_ids)} líneas únicas detectadas.")
+    print(f"Inventario maestro: {len(master_ids)} líneas únicas detectadas.")
 
-    # 2) Encontrar y cargar shapefile
-    shp_path = Path(shp_input)
+    # 2) Encontrar y cargar shapefiles
     try:
-        shp_file = find_shapefile(shp_path)
-        print(f"Usando shapefile: {shp_file}")
+        shp_files = [f for p in shp_inputs for f in find_shapefiles(Path(p))]
     except FileNotFoundError as e:
         print(f"ERROR shapefile: {e}", file=sys.stderr)
         sys.exit(1)
 
-    try:
-        gdf = gpd.read_file(shp_file)
-    except Exception as e:
-        print(f"ERROR al leer {shp_file}: {e}", file=sys.stderr)
-        sys.exit(1)
-
-    # 3) Detectar campo ID de línea en shapefile
-    cols = list(gdf.columns)
-    id_fields = [c for c in cols if 'id_lin' in c.lower()]
-    if not id_fields:
-        print(f"ERROR: No se encontró columna de ID línea en {shp_file}. Columnas: {cols}", file=sys.stderr)
-        sys.exit(1)
-    field = id_fields[0]
-    gdf['ID_LIN_TRA'] = gdf[field].astype(str)
-    print(f"Campo de ID usado en shapefile: '{field}'")
+    # 3) Detectar campo ID de línea en cada shapefile
+    parts = []
+    for shp_file in shp_files:
+        print(f"Usando shapefile: {shp_file}")
+        try:
+            part = gpd.read_file(shp_file)
+        except Exception as e:
+            print(f"ERROR al leer {shp_file}: {e}", file=sys.stderr)
+            sys.exit(1)
+        cols = list(part.columns)
+        id_fields = [c for c in cols if 'id_lin' in c.lower()]
+        if not id_fields:
+            print(f"ERROR: No se encontró columna de ID línea en {shp_file}. Columnas: {cols}", file=sys.stderr)
+            sys.exit(1)
+        field = id_fields[0]
+        part['ID_LIN_TRA'] = part[field].astype(str)
+        print(f"Campo de ID usado en shapefile: '{field}'")
+        parts.append(part.to_crs(4326) if part.crs is not None else part)
+    gdf = gpd.GeoDataFrame(pd.concat(parts, ignore_index=True), crs=parts[0].crs)
     shp_ids = set(gdf['ID_LIN_TRA'])
     print(f"Shapefile: {len(shp_ids)} líneas detectadas en geometría.")
 
@@ -96,10 +113,137 @@ def review(xlsx_path: str, shp_input: str) -> None:
             cols_shp.append('TENSION_KV')
         print(gdf[gdf['ID_LIN_TRA'].isin(only_shp[:5])][cols_shp].to_string(index=False))
 
+    # 6) Reconciliación espacial de los que no calzan por ID
+    if reconcile_out is None:
+        return
+    if not only_master or not only_shp:
+        print("\nNada que reconciliar: todos los IDs calzan en al menos un lado.")
+        return
+    pending = df[df['ID_LIN_TRA'].astype(str).isin(only_master)]
+    orphans = gdf[gdf['ID_LIN_TRA'].isin(only_shp)]
+    with stage('reconcile', rows_in=len(pending)) as st:
+        matches = reconcile(pending, orphans, buffer_km=buffer_km)
+        st.rows_out = len(matches)
+    reconcile_out.parent.mkdir(parents=True, exist_ok=True)
+    matches.to_csv(reconcile_out, index=False)
+    best = matches[matches['best']]
+    print(f"\nReconciliación: {len(pending)} líneas sin ID, {len(orphans)} geometrías huérfanas, "
+          f"{len(best)} con candidata confiable → {reconcile_out}")
+    if not best.empty:
+        print(best.head(10)[['master_id', 'shp_id', 'hausdorff_km', 'frechet_km', 'name_sim', 'confidence']]
+              .to_string(index=False))
+
+
+# ───────────────────────── reconciliación espacial ─────────────────────────
+KM_LAT = 110.57                      # km por grado de latitud
+KM_LON = 111.32                      # km por grado de longitud en el ecuador
+MATCHES = Path('data/processed/line_matches.csv')
+
+
+def to_km(geoms):
+    """Sinusoidal en km: distancias ~correctas a lo largo de todo Chile."""
+    def f(c):
+        return np.column_stack([c[:, 0] * np.cos(np.radians(c[:, 1])) * KM_LON,
+                                c[:, 1] * KM_LAT])
+    return shapely.transform(geoms, f)
+
+
+def name_similarity(a: str, b: str) -> float:
+    """Dice sobre trigramas de clean(): 1.0 = mismo nombre normalizado."""
+    ta, tb = trigrams(clean(a)), trigrams(clean(b))
+    return 2 * len(ta & tb) / (len(ta) + len(tb)) if ta and tb else 0.0
+
+
+def reconcile(lines: pd.DataFrame, gdf: gpd.GeoDataFrame, *,
+              buffer_km: float = 10.0, top: int = 3, min_conf: float = 0.3) -> pd.DataFrame:
+    """
+    Propone geometrías del shapefile para líneas del inventario sin match por ID.
+
+    lines: ID_LIN_TRA, NOMBRE, TENSION_KV, x0, y0, x1, y1 (lon/lat de sus S/E
+    extremas); gdf: geometrías candidatas (EPSG:4326). Un STRtree sobre gdf
+    entrega, para la caja de cada línea ampliada en buffer_km, solo las
+    geometrías cercanas; Hausdorff y Fréchet se calculan en bloque sobre esos
+    pares. Devuelve las `top` mejores por línea con su confianza y una marca
+    `best` para la asignación 1 a 1 (greedy por confianza, desde min_conf).
+    """
+    cols = ['master_id', 'master_name', 'shp_id', 'shp_name', 'hausdorff_km',
+            'frechet_km', 'name_sim', 'kv_match', 'confidence', 'rank', 'best']
+    lines = lines.dropna(subset=['x0', 'y0', 'x1', 'y1']).reset_index(drop=True)
+    gdf = gdf[gdf.geometry.notna() & ~gdf.geometry.is_empty].reset_index(drop=True)
+    if lines.empty or gdf.empty:
+        return pd.DataFrame(columns=cols)
+
+    # cuerda S/E origen → S/E destino, en km
+    chord = to_km(shapely.linestrings(np.stack(
+        [lines[['x0', 'y0']].to_numpy(float), lines[['x1', 'y1']].to_numpy(float)], axis=1)))
+    # sin .prj (crs None) se asume EPSG:4326, igual que al cargar
+    geoms = to_km((gdf.geometry if gdf.crs is None else gdf.geometry.to_crs(4326)).values)
+    tree = shapely.STRtree(geoms)
+    xmin, ymin, xmax, ymax = shapely.bounds(chord).T
+    boxes = shapely.box(xmin - buffer_km, ymin - buffer_km, xmax + buffer_km, ymax + buffer_km)
+    li, gi = tree.query(boxes, predicate='intersects')
+    if not li.size:
+        return pd.DataFrame(columns=cols)
+
+    a, b = chord[li], geoms[gi]
+    haus = shapely.hausdorff_distance(a, b)
+    # tolerancia geométrica: 5 km o 10 % del largo de la cuerda
+    scale = np.maximum(5.0, 0.1 * shapely.length(a))
+    # Fréchet de GEOS es discreto (sólo vértices): ambos lados se densifican a
+    # scale/2 para que una cuerda de dos puntos no pese como media línea.
+    # Depende del sentido de digitalización: el menor de ambos
+    da, db = shapely.segmentize(a, scale / 2), shapely.segmentize(b, scale / 2)
+    frech = np.minimum(shapely.frechet_distance(da, db),
+                       shapely.frechet_distance(shapely.reverse(da), db))
+
+    m_name = lines['NOMBRE'].astype(str).to_numpy()
+    s_name = gdf['NOMBRE'].astype(str).to_numpy() if 'NOMBRE' in gdf else np.full(len(gdf), '')
+    sim = np.fromiter((name_similarity(m_name[i], s_name[j]) for i, j in zip(li, gi)),
+                      float, len(li))
+    m_kv = pd.to_numeric(lines['TENSION_KV'], errors='coerce').to_numpy(float)
+    s_kv = (pd.to_numeric(gdf['TENSION_KV'], errors='coerce').to_numpy(float)
+            if 'TENSION_KV' in gdf else np.full(len(gdf), np.nan))
+    kv = np.isclose(m_kv[li], s_kv[gi])
+
+    # Hausdorff mide la cercanía de los trazados; Fréchet además castiga
+    # recorridos que se alejan y vuelven (otra línea que sólo comparte extremos)
+    conf = (0.3 * np.exp(-haus / scale) + 0.2 * np.exp(-frech / scale)
+            + 0.35 * sim + 0.15 * kv)
+
+    out = pd.DataFrame({
+        'master_id': lines['ID_LIN_TRA'].to_numpy()[li],
+        'master_name': m_name[li],
+        'shp_id': gdf['ID_LIN_TRA'].to_numpy()[gi],
+        'shp_name': s_name[gi],
+        'hausdorff_km': haus.round(3),
+        'frechet_km': frech.round(3),
+        'name_sim': sim.round(3),
+        'kv_match': kv,
+        'confidence': conf.round(4),
+    })
+    out = out.sort_values(['master_id', 'confidence'], ascending=[True, False])
+    out['rank'] = out.groupby('master_id').cumcount() + 1
+    out = out[out['rank'] <= top]
+
+    # 1 a 1: la pareja de mayor confianza gana, sin reutilizar ninguno de los lados
+    out['best'] = False
+    used_m, used_s = set(), set()
+    strong = out[out['confidence'] >= min_conf].sort_values('confidence', ascending=False)
+    for idx, m, s in strong[['master_id', 'shp_id']].itertuples():
+        if m not in used_m and s not in used_s:
+            out.at[idx, 'best'] = True
+            used_m.add(m)
+            used_s.add(s)
+    return out[cols].reset_index(drop=True)
+
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Comparar shapefile IDE vs inventario maestro de líneas")
-    parser.add_argument('--xlsx', required=True, help="Archivo instalaciones_activos.xlsx")
-    parser.add_argument('--shp', required=True, help="Archivo .shp o directorio con shapefile IDE")
+    parser.add_argument('--db', default=str(INVENTORY), help="inventory.duckdb (01_ingest_inventory)")
+    parser.add_argument('--shp', required=True, nargs='+', help="Archivos .shp o directorios con shapefiles IDE")
+    parser.add_argument('--reconcile', nargs='?', const=str(MATCHES), default=None, metavar='CSV',
+                        help=f"Cruce espacial de los IDs sin match (default: {MATCHES})")
+    parser.add_argument('--buffer-km', type=float, default=10.0,
+                        help="Holgura de la búsqueda alrededor de cada línea (km)")
     args = parser.parse_args()
-    review(args.xlsx, args.shp)
+    review(args.db, args.shp, Path(args.reconcile) if args.reconcile else None, args.buffer_km)
@@ -2,34 +2,43 @@
 # scripts/etl/04_build_knowledge_graph.py
 
 """
-Construcción de un Knowledge Graph del SEN a partir de instalaciones_activos.xlsx.
+Construcción de un Knowledge Graph del SEN a partir de instalaciones_activos.xlsx
+(vistas inv.* de data/curated/inventory.duckdb, ver 01_ingest_inventory.py).
 Nodos tipados: Empresa, Subestacion, Barra, Linea, Circuito, Tramo.
 Aristas etiquetadas: owns, part_of, has_circuito, has_tramo, connects.
 
 Salida:
   • data/processed/kg_sen.graphml (GraphML completo)
   • data/processed/kg_sen.json    (GraphSON _opcional_)
+  • data/processed/kg_index.npz   (índice de intervalos para scripts/kg_query.py,
+                                   ver scripts/enerviz/hierarchy.py)
 """
 import argparse
 import sys
-import pandas as pd
 import networkx as nx
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))   # scripts/ → enerviz
+from enerviz.hierarchy import HierarchyIndex
+from enerviz.instrument import stage, timed
+from enerviz.inventory import INVENTORY, connect, read
 
-def build_kg(xlsx_path: str, out_dir: str) -> None:
+
+@timed()
+def build_kg(db_path: str, out_dir: str) -> None:
     out = Path(out_dir)
     out.mkdir(parents=True, exist_ok=True)
     G = nx.DiGraph()
+    con = connect(db_path)
 
     # 1) Empresas
-    df_emp = pd.read_excel(xlsx_path, sheet_name='Empresa', dtype={'id': str})
+    df_emp = read(con, 'empresa', ['id', 'name'])
     for _, r in df_emp.iterrows():
         node = f"E_{r['id']}"
         G.add_node(node, type='Empresa', name=r.get('name', ''))
 
     # 2) Subestaciones
-    df_sub = pd.read_excel(xlsx_path, sheet_name='Subestaciones', dtype={'id': str, 'propietario_id': str})
+    df_sub = read(con, 'subestacion', ['id', 'name', 'propietario_id', 'lat', 'lon'])
     for _, r in df_sub.iterrows():
         node = f"S_{r['id']}"
         G.add_node(node, type='Subestacion', name=r.get('name', ''), lat=r.get('lat', None), lon=r.get('lon', None))
@@ -38,7 +47,7 @@ def build_kg(xlsx_path: str, out_dir: str) -> None:
             G.add_edge(owner, node, relation='owns')
 
     # 3) Barras
-    df_barra = pd.read_excel(xlsx_path, sheet_name='Barras', dtype={'id': str, 'patio_subestacion_id': str})
+    df_barra = read(con, 'barra', ['id', 'subestacion_id AS patio_subestacion_id', 'tension_kv AS tension_kV'])
     for _, r in df_barra.iterrows():
         node = f"B_{r['id']}"
         G.add_node(node, type='Barra', tension_kV=r.get('tension_kV', None))
@@ -47,7 +56,7 @@ def build_kg(xlsx_path: str, out_dir: str) -> None:
             G.add_edge(node, parent, relation='part_of')
 
     # 4) Lineas
-    df_lin = pd.read_excel(xlsx_path, sheet_name='Linea', dtype={'id': str, 'propietario_id': str})
+    df_lin = read(con, 'linea', ['id', 'name', 'propietario_id', 'tension_kv AS voltaje_kV'])
     for _, r in df_lin.iterrows():
         node = f"L_{r['id']}"
         G.add_node(node, type='Linea', name=r.get('name', ''), tension_kV=r.get('voltaje_kV', None))
@@ -56,7 +65,7 @@ def build_kg(xlsx_path: str, out_dir: str) -> None:
             G.add_edge(owner, node, relation='owns')
 
     # 5) Circuitos
-    df_cir = pd.read_excel(xlsx_path, sheet_name='Circuito', dtype={'id': str, 'linea_id': str})
+    df_cir = read(con, 'circuito', ['id', 'linea_id'])
     for _, r in df_cir.iterrows():
         node = f"C_{r['id']}"
         G.add_node(node, type='Circuito')
@@ -65,7 +74,8 @@ def build_kg(xlsx_path: str, out_dir: str) -> None:
             G.add_edge(parent, node, relation='has_circuito')
 
     # 6) Tramos
-    df_tra = pd.read_excel(xlsx_path, sheet_name='Tramo', dtype={'id': str, 'circuito_id': str, 'nodo1_id': str, 'nodo2_id': str})
+    df_tra = read(con, 'tramo', ['id', 'circuito_id', 'nodo1_id', 'nodo2_id'])
+    con.close()
     for _, r in df_tra.iterrows():
         node = f"T_{r['id']}"
         G.add_node(node, type='Tramo')
@@ -78,7 +88,12 @@ def build_kg(xlsx_path: str, out_dir: str) -> None:
             if barr in G:
                 G.add_edge(node, barr, relation='connects')
 
-    # 7) Guardar GraphML y JSON
+    # 7) Índice de intervalos (Euler tour) para consultas jerárquicas
+    with stage('hierarchy_index', rows_in=G.number_of_nodes()):
+        path_index = HierarchyIndex.from_graph(G).save(out / 'kg_index.npz')
+    print(f"Índice jerárquico guardado en {path_index}")
+
+    # 8) Guardar GraphML y JSON
     path_graphml = out / 'kg_sen.graphml'
     nx.write_graphml(G, path_graphml)
     print(f"GraphML guardado en {path_graphml}")
@@ -95,10 +110,10 @@ def build_kg(xlsx_path: str, out_dir: str) -> None:
 
 def main():
     parser = argparse.ArgumentParser(description='Construir Knowledge Graph del SEN')
-    parser.add_argument('--xlsx', required=True, help='ruta a instalaciones_activos.xlsx')
+    parser.add_argument('--db', default=str(INVENTORY), help='ruta a inventory.duckdb (01_ingest_inventory)')
     parser.add_argument('--out', default='data/processed', help='directorio de salida')
     args = parser.parse_args()
-    build_kg(args.xlsx, args.out)
+    build_kg(args.db, args.out)
 
 if __name__ == '__main__':
     main()
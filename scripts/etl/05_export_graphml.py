@@ -6,29 +6,34 @@ Construye y exporta el Knowledge Graph del SEN directamente a GraphML limpio.
 
 Uso:
   python scripts/etl/05_export_graphml.py \
-    --xlsx data/raw/instalaciones_activos.xlsx \
+    --db data/curated/inventory.duckdb \
     --out data/processed/kg_sen.graphml
 
 Esto evita dependencias de JSON intermedio y limpia valores None antes de exportar.
 """
 import argparse
 import sys
-import pandas as pd
 import networkx as nx
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))   # scripts/ → enerviz
+from enerviz.instrument import timed
+from enerviz.inventory import INVENTORY, connect, read
 
-def build_and_export(xlsx_path: str, out_path: str) -> None:
+
+@timed()
+def build_and_export(db_path: str, out_path: str) -> None:
     # Crear grafo dirigido
     G = nx.DiGraph()
+    con = connect(db_path)
 
     # 1) Empresas
-    df_emp = pd.read_excel(xlsx_path, sheet_name='Empresa', dtype={'id': str})
+    df_emp = read(con, 'empresa', ['id', 'name'])
     for _, r in df_emp.iterrows():
         G.add_node(f"E_{r['id']}", type='Empresa', name=r.get('name',''))
 
     # 2) Subestaciones
-    df_sub = pd.read_excel(xlsx_path, sheet_name='Subestaciones', dtype={'id': str, 'propietario_id': str})
+    df_sub = read(con, 'subestacion', ['id', 'name', 'propietario_id', 'lat', 'lon'])
     for _, r in df_sub.iterrows():
         sub = f"S_{r['id']}"
         G.add_node(sub, type='Subestacion', name=r.get('name',''), lat=r.get('lat',None), lon=r.get('lon',None))
@@ -37,7 +42,7 @@ def build_and_export(xlsx_path: str, out_path: str) -> None:
             G.add_edge(prop, sub, relation='owns')
 
     # 3) Barras
-    df_bar = pd.read_excel(xlsx_path, sheet_name='Barras', dtype={'id': str, 'patio_subestacion_id': str})
+    df_bar = read(con, 'barra', ['id', 'name', 'subestacion_id AS patio_subestacion_id', 'tension_kv AS tension_kV'])
     for _, r in df_bar.iterrows():
         bar = f"B_{r['id']}"
         G.add_node(bar, type='Barra', tension_kV=r.get('tension_kV',None), name=r.get('name',''))
@@ -46,7 +51,7 @@ def build_and_export(xlsx_path: str, out_path: str) -> None:
             G.add_edge(bar, parent, relation='part_of')
 
     # 4) Lineas
-    df_lin = pd.read_excel(xlsx_path, sheet_name='Linea', dtype={'id': str, 'propietario_id': str})
+    df_lin = read(con, 'linea', ['id', 'name', 'propietario_id', 'tension_kv AS voltaje_kV'])
     for _, r in df_lin.iterrows():
         lin = f"L_{r['id']}"
         G.add_node(lin, type='Linea', name=r.get('name',''), tension_kV=r.get('voltaje_kV',None))
@@ -55,7 +60,7 @@ def build_and_export(xlsx_path: str, out_path: str) -> None:
             G.add_edge(owner, lin, relation='owns')
 
     # 5) Circuitos
-    df_cir = pd.read_excel(xlsx_path, sheet_name='Circuito', dtype={'id': str, 'linea_id': str})
+    df_cir = read(con, 'circuito', ['id', 'linea_id'])
     for _, r in df_cir.iterrows():
         cir = f"C_{r['id']}"
         G.add_node(cir, type='Circuito')
@@ -64,7 +69,8 @@ def build_and_export(xlsx_path: str, out_path: str) -> None:
             G.add_edge(parent, cir, relation='has_circuito')
 
     # 6) Tramos
-    df_tra = pd.read_excel(xlsx_path, sheet_name='Tramo', dtype={'id': str, 'circuito_id': str, 'nodo1_id': str, 'nodo2_id': str})
+    df_tra = read(con, 'tramo', ['id', 'circuito_id', 'nodo1_id', 'nodo2_id'])
+    con.close()
     for _, r in df_tra.iterrows():
         tra = f"T_{r['id']}"
         G.add_node(tra, type='Tramo')
@@ -95,10 +101,10 @@ def build_and_export(xlsx_path: str, out_path: str) -> None:
 
 def main():
     parser = argparse.ArgumentParser(description='Exportar SEN KG a GraphML limpio')
-    parser.add_argument('--xlsx', required=True, help='ruta a instalaciones_activos.xlsx')
+    parser.add_argument('--db', default=str(INVENTORY), help='ruta a inventory.duckdb (01_ingest_inventory)')
     parser.add_argument('--out', required=True, help='ruta de salida .graphml')
     args = parser.parse_args()
-    build_and_export(args.xlsx, args.out)
+    build_and_export(args.db, args.out)
 
 if __name__ == '__main__':
     main()
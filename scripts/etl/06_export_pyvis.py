@@ -8,9 +8,9 @@ Incluye todos los tipos de nodos (Empresa, Subestacion, Linea, Barra, Circuito,
 con labels legibles y tooltips con tipo y nombre.
 
 Uso:
-  pip install pyvis pandas networkx openpyxl
+  pip install pyvis pandas networkx duckdb
   python scripts/etl/06_export_pyvis.py \
-    --xlsx data/raw/instalaciones_activos.xlsx \
+    --db data/curated/inventory.duckdb \
     --out data/processed/kg_sen_pyvis.html
 
 Salida:
@@ -19,23 +19,28 @@ Salida:
 import argparse
 import sys
 from pathlib import Path
-import pandas as pd
 import networkx as nx
 from pyvis.network import Network
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))   # scripts/ → enerviz
+from enerviz.instrument import timed
+from enerviz.inventory import INVENTORY, connect, read
 
-def build_pyvis(xlsx_path: str, out_html: str) -> None:
+
+@timed()
+def build_pyvis(db_path: str, out_html: str) -> None:
     # Crear grafo
     G = nx.Graph()
+    con = connect(db_path)
 
     # 1) Empresas
-    df_emp = pd.read_excel(xlsx_path, sheet_name='Empresa', dtype={'id': str})
+    df_emp = read(con, 'empresa', ['id', 'name'])
     for _, r in df_emp.iterrows():
         node = f"E_{r['id']}"
         G.add_node(node, type='Empresa', name=r.get('name',''))
 
     # 2) Subestaciones
-    df_sub = pd.read_excel(xlsx_path, sheet_name='Subestaciones', dtype={'id': str, 'propietario_id': str, 'name': str})
+    df_sub = read(con, 'subestacion', ['id', 'name', 'propietario_id'])
     for _, r in df_sub.iterrows():
         node = f"S_{r['id']}"
         G.add_node(node, type='Subestacion', name=r.get('name',''))
@@ -44,7 +49,7 @@ def build_pyvis(xlsx_path: str, out_html: str) -> None:
             G.add_edge(owner, node, relation='owns')
 
     # 3) Lineas
-    df_lin = pd.read_excel(xlsx_path, sheet_name='Linea', dtype={'id': str, 'propietario_id': str, 'name': str})
+    df_lin = read(con, 'linea', ['id', 'name', 'propietario_id'])
     for _, r in df_lin.iterrows():
         node = f"L_{r['id']}"
         G.add_node(node, type='Linea', name=r.get('name',''))
@@ -53,7 +58,7 @@ def build_pyvis(xlsx_path: str, out_html: str) -> None:
             G.add_edge(owner, node, relation='owns')
 
     # 4) Barras
-    df_bar = pd.read_excel(xlsx_path, sheet_name='Barras', dtype={'id': str, 'patio_subestacion_id': str, 'name': str})
+    df_bar = read(con, 'barra', ['id', 'name', 'subestacion_id AS patio_subestacion_id'])
     for _, r in df_bar.iterrows():
         node = f"B_{r['id']}"
         G.add_node(node, type='Barra', name=r.get('name',''))
@@ -62,7 +67,7 @@ def build_pyvis(xlsx_path: str, out_html: str) -> None:
             G.add_edge(node, parent, relation='part_of')
 
     # 5) Circuitos
-    df_cir = pd.read_excel(xlsx_path, sheet_name='Circuito', dtype={'id': str, 'linea_id': str})
+    df_cir = read(con, 'circuito', ['id', 'linea_id'])
     for _, r in df_cir.iterrows():
         node = f"C_{r['id']}"
         G.add_node(node, type='Circuito', name='')
@@ -71,7 +76,8 @@ def build_pyvis(xlsx_path: str, out_html: str) -> None:
             G.add_edge(parent, node, relation='has_circuito')
 
     # 6) Tramos
-    df_tra = pd.read_excel(xlsx_path, sheet_name='Tramo', dtype={'id': str, 'circuito_id': str, 'nodo1_id': str, 'nodo2_id': str})
+    df_tra = read(con, 'tramo', ['id', 'circuito_id', 'nodo1_id', 'nodo2_id'])
+    con.close()
     for _, r in df_tra.iterrows():
         node = f"T_{r['id']}"
         G.add_node(node, type='Tramo', name='')
@@ -137,10 +143,10 @@ def build_pyvis(xlsx_path: str, out_html: str) -> None:
 
 def main():
     parser = argparse.ArgumentParser(description='Exportar SEN KG a HTML interactivo PyVis')
-    parser.add_argument('--xlsx', required=True, help='ruta a instalaciones_activos.xlsx')
+    parser.add_argument('--db', default=str(INVENTORY), help='ruta a inventory.duckdb (01_ingest_inventory)')
     parser.add_argument('--out', required=True, help='archivo de salida HTML')
     args = parser.parse_args()
-    build_pyvis(args.xlsx, args.out)
+    build_pyvis(args.db, args.out)
 
 if __name__ == '__main__':
     main()
@@ -18,19 +18,41 @@ Aristas:
   - shares_sub: Empresa — Empresa (comparten Subestación)
   - shares_bar: Empresa — Empresa (comparten Barra)
 
+Una empresa "usa" una subestación si es su dueña o si una de sus líneas llega
+a ella, y "usa" una barra si es dueña de su subestación o si un tramo de una
+de sus líneas la conecta.
+
+Con --per-empresa el grafo se construye una sola vez y se comparte (sólo
+lectura) con un pool de procesos; cada worker extrae la vista de una empresa
+(sus activos más las subestaciones, barras, líneas y empresas vecinas con las
+que comparte instalaciones) y escribe <DIR>/E_<id>.html y E_<id>.json con sus
+subestaciones y barras compartidas, más <DIR>/index.json con el resumen de
+todas.
+
 Uso:
-  pip install pyvis pandas networkx openpyxl
+  pip install pyvis pandas networkx duckdb
   python scripts/etl/07_visualize_resilience_graph.py \
-    --xlsx data/raw/instalaciones_activos.xlsx \
+    --db data/curated/inventory.duckdb \
     --out data/processed/resilience_graph.html
+  python scripts/etl/07_visualize_resilience_graph.py \
+    --per-empresa data/processed/resilience --workers 8
 """
 import argparse
-import pandas as pd
-import networkx as nx
 import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+
+import pandas as pd
+import networkx as nx
 from pyvis.network import Network
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))   # scripts/ → enerviz
+from enerviz.instrument import stage, timed
+from enerviz.inventory import INVENTORY, connect, read
+
 # Estilos de nodo: color y tamaño
 NODE_STYLE = {
     'Empresa':     {'color':'#d62728','size':25},  # rojo
@@ -49,113 +71,108 @@ EDGE_STYLE = {
 }
 
 
-def build_resilience_graph(xlsx_path: str, out_html: str):
-    # Carga dinámica de nombres de hoja
-    xls = pd.ExcelFile(xlsx_path)
-    # detectar hojas por keywords
-    sheet_emp = next(s for s in xls.sheet_names if 'empres' in s.lower())
-    sheet_lin = next(s for s in xls.sheet_names if 'tram' in s.lower() or 'linea' in s.lower())
-    sheet_sub = next(s for s in xls.sheet_names if 'subest' in s.lower())
-    sheet_bar = next(s for s in xls.sheet_names if 'bar' in s.lower())
-
-    df_emp = pd.read_excel(xlsx_path, sheet_name=sheet_emp, dtype=str)
-    df_lin = pd.read_excel(xlsx_path, sheet_name=sheet_lin, dtype=str)
-    df_sub = pd.read_excel(xlsx_path, sheet_name=sheet_sub, dtype=str)
-    df_bar = pd.read_excel(xlsx_path, sheet_name=sheet_bar, dtype=str)
-
-    # detectar columnas clave
-    emp_id_col = next(c for c in df_emp.columns if c.lower()=='id')
-    emp_name_col = next((c for c in df_emp.columns if 'razon' in c.lower() or 'name' in c.lower()), emp_id_col)
-
-    lin_id_col = next(c for c in df_lin.columns if c.lower()=='id')
-    lin_name_col = next((c for c in df_lin.columns if 'nombre' in c.lower()), lin_id_col)
-    lin_owner_col = next((c for c in df_lin.columns if 'propietar' in c.lower() or 'empresa' in c.lower()), None)
-    lin_sub_cols = [c for c in df_lin.columns if 'subestac' in c.lower()]
-
-    sub_id_col = next(c for c in df_sub.columns if c.lower()=='id')
-    sub_name_col = next((c for c in df_sub.columns if 'nombre' in c.lower()), sub_id_col)
-    sub_owner_col = next((c for c in df_sub.columns if 'propietar' in c.lower() or 'empresa' in c.lower()), None)
-
-    bar_id_col = next(c for c in df_bar.columns if c.lower()=='id')
-    bar_name_col = next((c for c in df_bar.columns if 'nombre' in c.lower()), bar_id_col)
-    bar_parent_col = next((c for c in df_bar.columns if 'subestac' in c.lower()), None)
+def build_graph(db_path: str) -> nx.DiGraph:
+    """Grafo tipado completo; Subestacion y Barra llevan 'users' (empresas que la usan)."""
+    # Vistas canónicas del inventario (hojas y columnas resueltas en 01_ingest)
+    con = connect(db_path)
+    df_emp = read(con, 'empresa', ['id', 'name'])
+    df_lin = read(con, 'linea', ['id', 'name', 'propietario_id', 'sub_origen_id', 'sub_destino_id'])
+    df_sub = read(con, 'subestacion', ['id', 'name', 'propietario_id'])
+    df_bar = read(con, 'barra', ['id', 'name', 'subestacion_id'])
+    df_cir = read(con, 'circuito', ['id', 'linea_id'])
+    df_tra = read(con, 'tramo', ['circuito_id', 'nodo1_id', 'nodo2_id'])
+    con.close()
 
     # Mapas de relación
-    sub2emp = df_sub.set_index(sub_id_col)[sub_owner_col].astype(str).to_dict() if sub_owner_col else {}
-    lin2emp = df_lin.set_index(lin_id_col)[lin_owner_col].astype(str).to_dict() if lin_owner_col else {}
-    bar2sub = df_bar.set_index(bar_id_col)[bar_parent_col].astype(str).to_dict() if bar_parent_col else {}
+    sub2emp = df_sub.dropna(subset=['propietario_id']).set_index('id')['propietario_id'].to_dict()
+    lin2emp = df_lin.dropna(subset=['propietario_id']).set_index('id')['propietario_id'].to_dict()
+    bar2sub = df_bar.dropna(subset=['subestacion_id']).set_index('id')['subestacion_id'].to_dict()
+    cir2lin = df_cir.dropna(subset=['linea_id']).set_index('id')['linea_id'].to_dict()
+    lin2subs = {
+        r.id: sorted({s for s in (r.sub_origen_id, r.sub_destino_id) if pd.notna(s)})
+        for r in df_lin.itertuples()
+    }
 
     # Construir grafo dirigido
     G = nx.DiGraph()
 
     # Nodos Empresa
     for _, r in df_emp.iterrows():
-        eid = str(r[emp_id_col])
-        label = r.get(emp_name_col, eid)
-        G.add_node(f"E_{eid}", type='Empresa', label=str(label))
+        eid = r['id']
+        G.add_node(f"E_{eid}", type='Empresa', label=r['name'] or eid)
 
     # Nodos Linea + owns
     for _, r in df_lin.iterrows():
-        lid = str(r[lin_id_col])
-        label = r.get(lin_name_col, lid)
-        G.add_node(f"L_{lid}", type='Linea', label=str(label))
+        lid = r['id']
+        G.add_node(f"L_{lid}", type='Linea', label=r['name'] or lid)
         owner = lin2emp.get(lid)
         if owner and G.has_node(f"E_{owner}"):
             G.add_edge(f"E_{owner}", f"L_{lid}", relation='owns')
 
     # Nodos Subestacion + owns
     for _, r in df_sub.iterrows():
-        sid = str(r[sub_id_col])
-        label = r.get(sub_name_col, sid)
-        G.add_node(f"S_{sid}", type='Subestacion', label=str(label))
+        sid = r['id']
+        G.add_node(f"S_{sid}", type='Subestacion', label=r['name'] or sid)
         owner = sub2emp.get(sid)
         if owner and G.has_node(f"E_{owner}"):
             G.add_edge(f"E_{owner}", f"S_{sid}", relation='owns')
 
     # Nodos Barra + contains
     for _, r in df_bar.iterrows():
-        bid = str(r[bar_id_col])
-        label = r.get(bar_name_col, bid)
-        G.add_node(f"B_{bid}", type='Barra', label=str(label))
+        bid = r['id']
+        G.add_node(f"B_{bid}", type='Barra', label=r['name'] or bid)
         parent = bar2sub.get(bid)
         if parent and G.has_node(f"S_{parent}"):
             G.add_edge(f"S_{parent}", f"B_{bid}", relation='contains')
 
     # Conexiones feeds: Linea -> Subestacion
-    for _, r in df_lin.iterrows():
-        lid = str(r[lin_id_col])
-        for col in lin_sub_cols:
-            sid = r.get(col)
-            if pd.notna(sid):
-                sid_str = str(int(float(sid))) if not isinstance(sid, str) else sid
-                if G.has_node(f"S_{sid_str}"):
-                    G.add_edge(f"L_{lid}", f"S_{sid_str}", relation='feeds')
+    for lid, subs in lin2subs.items():
+        for sid in subs:
+            if G.has_node(f"S_{sid}"):
+                G.add_edge(f"L_{lid}", f"S_{sid}", relation='feeds')
 
     # shares_sub: empresas que comparten subestacion
+    sub2users = {}
+    for lid, subs in lin2subs.items():
+        if emp := lin2emp.get(lid):
+            for sid in subs:
+                sub2users.setdefault(sid, set()).add(emp)
     for sid, owner in sub2emp.items():
-        users = {owner}
-        # empresas de lineas conectadas
-        for lid, emp in lin2emp.items():
-            matches = df_lin[df_lin[lin_id_col]==lid][lin_sub_cols].values.flatten()
-            if any(str(sid)==str(r) for r in matches if pd.notna(r)):
-                users.add(emp)
+        sub2users.setdefault(sid, set()).add(owner)
+    for sid, users in sub2users.items():
+        if G.has_node(f"S_{sid}"):
+            G.nodes[f"S_{sid}"]['users'] = sorted(users)
+        if sid not in sub2emp:
+            continue                    # sin dueña: 'users' sí, arista shares_sub no
         for a,b in itertools.combinations(sorted(users),2):
             G.add_edge(f"E_{a}", f"E_{b}", relation='shares_sub')
 
-    # shares_bar: empresas que comparten barra (vía subestacion)
+    # shares_bar: empresas que comparten barra (vía subestacion); los dueños
+    # de líneas cuyo tramo la conecta quedan en 'users' para la vista por
+    # empresa, pero no crean aristas en el grafo completo
     bar_to_emps = {}
     for bid, sid in bar2sub.items():
-        emp = sub2emp.get(sid)
-        if emp:
-            bar_to_emps.setdefault(bid,set()).add(emp)
+        if emp := sub2emp.get(sid):
+            bar_to_emps.setdefault(bid, set()).add(emp)
+    bar2users = {bid: set(owners) for bid, owners in bar_to_emps.items()}
+    for r in df_tra.itertuples():
+        if emp := lin2emp.get(cir2lin.get(r.circuito_id)):
+            for bid in (r.nodo1_id, r.nodo2_id):
+                if pd.notna(bid):
+                    bar2users.setdefault(bid, set()).add(emp)
+    for bid, users in bar2users.items():
+        if G.has_node(f"B_{bid}"):
+            G.nodes[f"B_{bid}"]['users'] = sorted(users)
     for owners in bar_to_emps.values():
         for a,b in itertools.combinations(sorted(owners),2):
-            G.add_edge(f"E_{a}", f"E_{b}", relation='shares_bar')
+            G.add_edge(f"E_{a}", f"E_{b}", relation='shares_bar')   # prima sobre shares_sub
+    return G
+
 
-    # Render con PyVis
+def render(G: nx.DiGraph, out_html: str | Path) -> None:
     net = Network(
-        height='800px', width='100%', 
-        bgcolor='#ffffff', font_color='black', 
+        height='800px', width='100%',
+        bgcolor='#ffffff', font_color='black',
         directed=True, notebook=False
     )
     net.toggle_physics(True)
@@ -173,14 +190,121 @@ def build_resilience_graph(xlsx_path: str, out_html: str):
             color=style['color'], width=style['width'],
             arrows=style['arrows'], title=d['relation']
         )
+    net.write_html(str(out_html), open_browser=False)
 
+
+@timed()
+def build_resilience_graph(db_path: str, out_html: str):
+    with stage('build_graph') as st:
+        G = build_graph(db_path)
+        st.rows_out = G.number_of_nodes()
     out = Path(out_html)
-    net.write_html(str(out), open_browser=False)
+    render(G, out)
     print(f"✓ Resilience graph generado: {out}")
 
-if __name__=='__main__':
-    p = argparse.ArgumentParser()
-    p.add_argument('--xlsx', required=True)
-    p.add_argument('--out', required=True)
+# ───────────────────────── vista por empresa ─────────────────────────
+
+def company_view(G: nx.DiGraph, emp: str) -> tuple[nx.DiGraph, dict]:
+    """Activos de E_<emp> más sus vecinos co-ubicados, y el resumen de lo compartido."""
+    node = f"E_{emp}"
+    of = lambda nodes, t, rel, pred=False: {
+        x for n in nodes
+        for x in (G.predecessors(n) if pred else G.successors(n))
+        if G.nodes[x]['type'] == t and
+           G.edges[(x, n) if pred else (n, x)]['relation'] == rel}
+    lines = of([node], 'Linea', 'owns')
+    subs = of([node], 'Subestacion', 'owns')
+    near_subs = of(lines, 'Subestacion', 'feeds') - subs        # donde llegan sus líneas
+    near_lines = of(subs, 'Linea', 'feeds', pred=True) - lines  # líneas ajenas que llegan
+    barras = of(subs | near_subs, 'Barra', 'contains')
+    keep = {node} | lines | subs | near_subs | near_lines | barras
+    keep |= {e for n in keep for e in G.predecessors(n) if G.nodes[e]['type'] == 'Empresa'}
+    keep |= set(G.successors(node)) | set(G.predecessors(node))   # shares_sub / shares_bar
+
+    def shared(nodes):
+        out = []
+        for n in sorted(nodes):
+            users = G.nodes[n].get('users', [])
+            if emp in users and len(users) > 1:
+                out.append({'id': n.split('_', 1)[1], 'name': G.nodes[n]['label'],
+                            'empresas': [u for u in users if u != emp]})
+        return out
+
+    sh_subs, sh_bars = shared(subs | near_subs), shared(barras)
+    summary = {
+        'empresa': emp,
+        'name': G.nodes[node]['label'],
+        'lineas': len(lines),
+        'subestaciones': len(subs),
+        'barras': len(of(subs, 'Barra', 'contains')),
+        'shared_substations': sh_subs,
+        'shared_barras': sh_bars,
+        'neighbours': sorted({u for s in sh_subs + sh_bars for u in s['empresas']}),
+    }
+    # en el orden de G (no el del set), para que la salida no dependa del proceso
+    H = nx.DiGraph()
+    H.add_nodes_from((n, d) for n, d in G.nodes(data=True) if n in keep)
+    H.add_edges_from((u, v, d) for u in H for v, d in G.adj[u].items() if v in keep)
+    return H, summary
+
+
+_G: nx.DiGraph | None = None
+_OUT: Path | None = None
+
+def _init(G: nx.DiGraph, out_dir: Path) -> None:
+    global _G, _OUT
+    _G, _OUT = G, out_dir
+
+def _export(emp: str) -> dict:
+    sub, summary = company_view(_G, emp)
+    render(sub, _OUT / f"E_{emp}.html")
+    (_OUT / f"E_{emp}.json").write_text(json.dumps(summary, ensure_ascii=False, indent=1))
+    return {k: v if not isinstance(v, list) else len(v) for k, v in summary.items()}
+
+
+@timed()
+def export_per_empresa(db_path: str, out_dir: str, empresas: list[str] | None,
+                       workers: int | None) -> None:
+    with stage('build_graph') as st:
+        G = build_graph(db_path)
+        st.rows_out = G.number_of_nodes()
+    emps = empresas or [n.split('_', 1)[1] for n, t in G.nodes(data='type') if t == 'Empresa']
+    missing = [e for e in emps if f"E_{e}" not in G]
+    if missing:
+        print(f"ERROR: empresas sin registro en el inventario: {', '.join(missing)}", file=sys.stderr)
+        sys.exit(1)
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    with stage('export_empresas', rows_in=len(emps), workers=workers) as st:
+        if workers <= 1:
+            _init(G, out)
+            index = [_export(e) for e in emps]
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init, initargs=(G, out)) as pool:
+                index = list(pool.map(_export, emps, chunksize=max(1, len(emps) // (4 * workers))))
+        st.rows_out = len(index)
+    (out / "index.json").write_text(json.dumps(index, ensure_ascii=False, indent=1))
+    shared = sum(1 for r in index if r['neighbours'])
+    print(f"✓ {len(index)} vistas de resiliencia ({shared} empresas comparten instalaciones) → {out}")
+
+
+def main():
+    p = argparse.ArgumentParser(description='Grafo de resiliencia Empresa→Línea→S/E→Barra (PyVis)')
+    p.add_argument('--db', default=str(INVENTORY), help='inventory.duckdb (01_ingest_inventory)')
+    mode = p.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--out', help='HTML con el grafo completo')
+    mode.add_argument('--per-empresa', metavar='DIR',
+                      help='una vista HTML + JSON por empresa en DIR')
+    p.add_argument('--empresa', nargs='+', metavar='ID',
+                   help='con --per-empresa: sólo estas empresas (por defecto, todas)')
+    p.add_argument('--workers', type=int, help='procesos (por defecto, todos los núcleos)')
     args = p.parse_args()
-    build_resilience_graph(args.xlsx, args.out)
+    if args.out:
+        build_resilience_graph(args.db, args.out)
+    else:
+        export_per_empresa(args.db, args.per_empresa, args.empresa, args.workers)
+
+if __name__=='__main__':
+    main()
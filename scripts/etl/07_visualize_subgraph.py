@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# scripts/etl/07_visualize_subgraph.py
+
+"""
+Extrae y dibuja (PyVis) el subgrafo tipado del KG SEN alrededor de un conjunto
+de semillas: subestaciones, empresas, líneas, barras, tramos, una caja lon/lat
+o las N subestaciones más “alimentadas” (lo que hacían a mano los tres scripts
+07_*_sample.py).
+
+La vecindad a k saltos y sus aristas inducidas salen de la adyacencia CSR de
+HierarchyIndex (data/processed/kg_index.npz, 04_build_knowledge_graph.py), así
+que la extracción toma milisegundos; del inventario sólo se leen los nombres
+de los nodos que quedan en el subgrafo.  Las empresas alcanzadas se muestran
+pero no se expanden (una empresa arrastraría toda su cartera) salvo con
+--expand-empresas o si son semillas.
+
+Uso:
+  python scripts/etl/07_visualize_subgraph.py --top 10 --hops 2 \
+    --out data/processed/subgraph_top10.html
+  python scripts/etl/07_visualize_subgraph.py --sub 40 --linea 7 --hops 3 \
+    --types Subestacion Barra Linea --out data/processed/subgraph.html
+  python scripts/etl/07_visualize_subgraph.py --bbox -71 -34 -70 -33 --hops 1 \
+    --out data/processed/subgraph_rm.html
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from pyvis.network import Network
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))   # scripts/ → enerviz
+from enerviz.hierarchy import INDEX, PREFIX, RELATIONS, TYPES, HierarchyIndex
+from enerviz.instrument import stage, timed
+from enerviz.inventory import INVENTORY, connect, read
+
+COLOR = {'Empresa': 'red', 'Subestacion': 'blue', 'Linea': 'orange',
+         'Barra': 'green', 'Circuito': 'purple', 'Tramo': 'gray'}
+SEEDS = {'sub': 'Subestacion', 'empresa': 'Empresa', 'linea': 'Linea',
+         'barra': 'Barra', 'tramo': 'Tramo'}
+
+
+def load_index(index_path: str, db_path: str) -> HierarchyIndex:
+    if Path(index_path).exists():
+        return HierarchyIndex.load(index_path)
+    print(f"⚠️ {index_path} no existe (04_build_knowledge_graph): índice desde el inventario")
+    con = connect(db_path)
+    try:
+        return HierarchyIndex.from_inventory(con)
+    finally:
+        con.close()
+
+
+def seed_ids(con, ids: dict[str, list[str]], nodes: list[str],
+             bbox: list[float] | None, top: int) -> list[str]:
+    """Ids de nodo KG de las semillas pedidas por tipo, caja y top-N."""
+    seeds = [f"{PREFIX[SEEDS[k]]}_{i}" for k, v in ids.items() for i in v] + nodes
+    if bbox:
+        w, s, e, n = bbox
+        seeds += [f"S_{i}" for i, in con.execute(
+            "SELECT id FROM inv.subestacion WHERE lon BETWEEN ? AND ? AND lat BETWEEN ? AND ?",
+            [w, e, s, n]).fetchall()]
+    if top:
+        lin = read(con, 'linea', ['sub_origen_id', 'sub_destino_id'])
+        fed = lin.melt()['value'].dropna().value_counts()
+        seeds += [f"S_{i}" for i in fed.head(top).index]
+    return list(dict.fromkeys(seeds))
+
+
+def names(con, ids: list[str]) -> dict[str, str]:
+    """{id KG: nombre} sólo para los nodos del subgrafo."""
+    out = {}
+    for t, p in PREFIX.items():
+        want = [i[len(p) + 1:] for i in ids if i.startswith(f"{p}_")]
+        if not want or t in ('Circuito', 'Tramo'):          # sin nombre en el inventario
+            continue
+        df = read(con, t.lower(), ['id', 'name'])
+        df = df[df['id'].isin(want)]
+        out.update((f"{p}_{i}", n) for i, n in zip(df['id'], df['name']) if isinstance(n, str))
+    return out
+
+
+@timed()
+def visualize_subgraph(index_path: str, db_path: str, ids: dict[str, list[str]], nodes: list[str],
+                       bbox: list[float] | None, top: int, hops: int, types: list[str] | None,
+                       expand_empresas: bool, out_html: str) -> None:
+    idx = load_index(index_path, db_path)
+    con = connect(db_path)
+
+    seeds = seed_ids(con, ids, nodes, bbox, top)
+    missing = [s for s in seeds if s not in idx.pos]
+    if missing:
+        print(f"⚠️ {len(missing)} semillas no están en el KG: {', '.join(missing[:10])}")
+    seeds = [s for s in seeds if s in idx.pos]
+    if not seeds:
+        con.close()
+        print("ERROR: ninguna semilla válida (--sub/--empresa/--linea/--barra/--tramo/--node/--bbox/--top)",
+              file=sys.stderr)
+        sys.exit(1)
+
+    with stage('extract', rows_in=len(seeds)) as st:
+        t0 = time.perf_counter()
+        pos, hop = idx.khop(seeds, hops, stop=() if expand_empresas else ('Empresa',))
+        if types:
+            keep = np.isin(idx.type[pos], [TYPES.index(t) for t in types]) | (hop == 0)
+            pos, hop = pos[keep], hop[keep]
+        a, b, rel = idx.induced(pos)
+        ms = (time.perf_counter() - t0) * 1000
+        st.rows_out = len(pos)
+    print(f"Subgrafo: {len(seeds)} semillas, {hops} saltos → {len(pos)} nodos, "
+          f"{len(a)} aristas en {ms:.1f} ms")
+
+    node_ids = idx.ids[pos].tolist()
+    with stage('names', rows_in=len(node_ids)):
+        name = names(con, node_ids)
+    con.close()
+
+    net = Network(height='800px', width='100%', bgcolor='#ffffff', font_color='black',
+                  directed=True, notebook=False)
+    net.force_atlas_2based()
+    for node, t, h in zip(node_ids, idx.type[pos].tolist(), hop.tolist()):
+        t, nid = TYPES[t], node.split('_', 1)[1]
+        label = name.get(node) or f"{t} {nid}"
+        title = f"Type: {t}<br>Name: {name.get(node, '')}<br>ID: {nid}<br>Hop: {h}"
+        net.add_node(node, label=label, title=title, color=COLOR[t],
+                     size=20 if h == 0 else 10, borderWidth=3 if h == 0 else 1)
+    for u, v, r in zip(idx.ids[a].tolist(), idx.ids[b].tolist(), rel.tolist()):
+        net.add_edge(u, v, title=RELATIONS[r])
+
+    out = Path(out_html)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    net.write_html(str(out), open_browser=False)
+    print(f"HTML interactivo guardado en {out}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Subgrafo del KG SEN a k saltos de un conjunto de semillas → PyVis')
+    for k, t in SEEDS.items():
+        parser.add_argument(f'--{k}', nargs='+', default=[], metavar='ID', help=f'ids de {t} semilla')
+    parser.add_argument('--node', nargs='+', default=[], metavar='KG_ID',
+                        help='ids de nodo KG semilla (p.ej. S_40 E_12)')
+    parser.add_argument('--bbox', nargs=4, type=float, metavar=('W', 'S', 'E', 'N'),
+                        help='subestaciones dentro de la caja lon/lat como semillas')
+    parser.add_argument('--top', type=int, default=0,
+                        help='las N subestaciones con más líneas como semillas')
+    parser.add_argument('--hops', type=int, default=2, help='radio en aristas del KG')
+    parser.add_argument('--types', nargs='+', choices=TYPES,
+                        help='sólo dibujar estos tipos (las semillas siempre)')
+    parser.add_argument('--expand-empresas', action='store_true',
+                        help='expandir también las empresas alcanzadas')
+    parser.add_argument('--index', default=str(INDEX), help='índice del KG (04_build_knowledge_graph)')
+    parser.add_argument('--db', default=str(INVENTORY), help='ruta a inventory.duckdb (01_ingest_inventory)')
+    parser.add_argument('--out', default='data/processed/kg_subgraph.html', help='archivo de salida HTML')
+    args = parser.parse_args()
+    visualize_subgraph(args.index, args.db, {k: getattr(args, k) for k in SEEDS}, args.node,
+                       args.bbox, args.top, args.hops, args.types, args.expand_empresas, args.out)
+
+if __name__ == '__main__':
+    main()
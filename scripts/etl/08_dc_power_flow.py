@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# scripts/etl/08_dc_power_flow.py
+
+"""
+Flujo de potencia DC horario sobre el grafo de transmisión de
+02_build_transmission_graph.py (data/processed/transmission_graph.npz).
+
+Reactancia de cada tramo estimada por tensión y largo (scripts/enerviz/powerflow.py);
+la matriz B reducida se factoriza una vez y las T horas se resuelven en un solo
+solve matricial.
+
+Entradas (CSV con columnas barra, hora, mw; barra = id o nombre del inventario):
+  --gen     inyecciones de generación por barra y hora
+  --demand  retiros de demanda por barra y hora (se escalan por isla a la generación)
+Sin --gen se usa un caso nominal: cada barra de public/generation_barras.json
+inyecta 1 MW y la demanda se reparte por igual entre las demás barras.
+
+Salida:
+  • public/line_flows.json   {hours, tramo, mw, dir, dirSrc} por tramo y hora;
+                             dir = +1 si fluye en el orden de vértices del
+                             shapefile IDE, −1 al revés (lo usa annotate_lines.py)
+  • data/processed/ptdf.npy  (opcional, --ptdf) PTDF E×N calculada por bloques
+"""
+import argparse
+import json
+import sys
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))   # scripts/ → enerviz
+from enerviz.graph import CSRGraph
+from enerviz.instrument import stage, timed
+from enerviz.inventory import INVENTORY, connect
+from enerviz.powerflow import GEN_BARRAS, DCModel, load_injections
+
+EPS_MW = 1e-6
+
+
+def ide_orientation(g: CSRGraph, db_path: str) -> np.ndarray:
+    """+1 si el primer vértice del tramo está más cerca de u que de v, −1 si no (E)."""
+    con = connect(db_path)
+    xy = con.execute("""
+        SELECT b.id, s.lon, s.lat
+        FROM inv.barra b LEFT JOIN inv.subestacion s ON s.id = b.subestacion_id
+    """).df().set_index('id').reindex(g.node_ids)[['lon', 'lat']].to_numpy(float)
+    con.close()
+
+    geo = g.geometry
+    out = np.ones(g.n_edges, dtype=np.int8)
+    has = geo.has_geom
+    first = geo.coords[geo.part_offsets[geo.geom_offsets[:-1][has]]]
+    du = np.hypot(*(first - xy[g.u[has]]).T)
+    dv = np.hypot(*(first - xy[g.v[has]]).T)
+    out[np.flatnonzero(has)[dv < du]] = -1          # NaN (sin coordenadas) → se queda en +1
+    return out
+
+
+@timed()
+def dc_flow(graph_path: str, db_path: str, gen_csv: str | None, demand_csv: str | None,
+            out_json: str, ptdf_path: str | None = None) -> None:
+    try:
+        g = CSRGraph.load(graph_path)
+    except FileNotFoundError:
+        print(f"ERROR: {graph_path} no existe: corre 02_build_transmission_graph.py", file=sys.stderr)
+        sys.exit(1)
+
+    with stage('factorize', rows_in=g.n_edges):
+        model = DCModel.from_graph(g)
+    print(f"Modelo DC: {g.n_nodes} barras, {g.n_edges} tramos, {model.n_islands} islas")
+
+    # 1) Inyecciones N×T
+    try:
+        inj = load_injections(g, gen_csv, demand_csv, db_path)
+    except KeyError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    if inj.unmatched:
+        print(f"  · {len(inj.unmatched)} barras fuera del grafo (ej. {inj.unmatched[:5]})")
+    if inj.nominal and not inj.gen.any():
+        print(f"⚠️  {GEN_BARRAS} sin barras en el grafo: sin inyecciones nominales")
+    gen, hours = inj.gen, inj.hours
+    src = 'flujo_dc_nominal' if inj.nominal else 'flujo_dc'
+    P = model.balance(inj.gen, inj.demand)
+    print(f"Horas: {len(hours)}  generación total: {gen.sum():,.1f} MW")
+
+    # 2) Un solo solve para todas las horas
+    with stage('solve', rows_in=len(hours)) as st:
+        mw = model.flows(P)
+        st.rows_out = mw.size
+    sign = np.where(np.abs(mw) > EPS_MW, np.sign(mw), 0).astype(np.int8)
+    direction = sign * ide_orientation(g, db_path)[:, None]
+
+    out = Path(out_json)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with stage('write_json', rows_in=g.n_edges):
+        out.write_text(json.dumps({
+            'hours':  hours,
+            'tramo':  g.attrs['tramo_id'].tolist(),
+            'mw':     np.abs(mw).round(2).tolist(),
+            'dir':    direction.tolist(),
+            'dirSrc': src,
+        }, separators=(',', ':')))
+    print(f"Flujos por tramo y hora guardados en {out}  "
+          f"(|flujo| máx {np.abs(mw).max():,.1f} MW, {int((sign != 0).any(axis=1).sum())} tramos con flujo)")
+
+    # 3) PTDF por bloques
+    if ptdf_path:
+        with stage('ptdf', rows_in=g.n_edges):
+            np.save(ptdf_path, model.ptdf(dtype=np.float32))
+        print(f"PTDF {g.n_edges}×{g.n_nodes} guardada en {ptdf_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Flujo de potencia DC horario por tramo')
+    parser.add_argument('--graph', default='data/processed/transmission_graph.npz',
+                        help='grafo CSR de 02_build_transmission_graph')
+    parser.add_argument('--db', default=str(INVENTORY), help='ruta a inventory.duckdb (01_ingest_inventory)')
+    parser.add_argument('--gen', help='CSV barra,hora,mw de generación')
+    parser.add_argument('--demand', help='CSV barra,hora,mw de demanda')
+    parser.add_argument('--out', default='public/line_flows.json', help='JSON para el visor')
+    parser.add_argument('--ptdf', nargs='?', const='data/processed/ptdf.npy', default=None,
+                        help='guardar también la PTDF (.npy)')
+    args = parser.parse_args()
+    if args.demand and not args.gen:
+        parser.error('--demand requiere --gen')
+    dc_flow(args.graph, args.db, args.gen, args.demand, args.out, args.ptdf)
+
+if __name__ == '__main__':
+    main()
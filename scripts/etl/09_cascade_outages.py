@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# scripts/etl/09_cascade_outages.py
+
+"""
+Simulador de fallas en cascada (Outage Simulator del PRD v04) sobre el modelo DC
+de 08_dc_power_flow.py.
+
+Los factores de distribución (PTDF / LODF) se calculan una sola vez; cada disparo
+se aplica como actualización de bajo rango y se itera sobrecarga → disparo hasta
+que la red queda estable (ver scripts/enerviz/cascade.py).  Los escenarios se
+reparten en lotes entre procesos.
+
+Escenarios (eventos iniciales, por id de tramo):
+  • por defecto  N-1 de todos los tramos
+  • --n2 K       además K pares de tramos al azar (N-2)
+  • --scenarios  CSV/TXT con un escenario por línea: ids de tramo separados por , o ;
+
+Límites: --rating tolerance (1+α veces el flujo base, por defecto) o kv (por clase
+de tensión, enerviz.cascade.RATING_MW).
+
+Salida:
+  • data/processed/cascades.jsonl      por escenario: tramos disparados y barras
+                                       desconectadas en cada ronda
+  • data/processed/cascade_summary.csv escenario, rondas, tramos, barras, MW cortados
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))   # scripts/ → enerviz
+from enerviz.cascade import Cascade, kv_ratings, run_many, tolerance_ratings
+from enerviz.graph import CSRGraph
+from enerviz.instrument import stage, timed
+from enerviz.inventory import INVENTORY
+from enerviz.powerflow import DCModel, load_injections
+
+
+def read_scenarios(path: str, index: dict[str, int]) -> list[list[int]]:
+    """Un escenario por línea (ids de tramo); se ignoran ids desconocidos y líneas vacías."""
+    out = []
+    for line in Path(path).read_text(encoding='utf-8').splitlines():
+        ids = [t.strip() for t in line.replace(';', ',').split(',') if t.strip()]
+        if ks := [index[t] for t in ids if t in index]:
+            out.append(ks)
+    return out
+
+
+@timed()
+def simulate(graph_path: str, db_path: str, gen_csv: str | None, demand_csv: str | None,
+             hour: str | None, rating: str, alpha: float, n2: int, scenarios_path: str | None,
+             workers: int | None, out_dir: str, seed: int = 42) -> None:
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    try:
+        g = CSRGraph.load(graph_path)
+    except FileNotFoundError:
+        print(f"ERROR: {graph_path} no existe: corre 02_build_transmission_graph.py", file=sys.stderr)
+        sys.exit(1)
+    tramo = g.attrs['tramo_id']
+
+    # 1) Caso base: una hora de inyecciones
+    model = DCModel.from_graph(g)
+    try:
+        inj = load_injections(g, gen_csv, demand_csv, db_path)
+    except KeyError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    P = model.balance(inj.gen, inj.demand)
+    t = inj.hours.index(hour) if hour in inj.hours else int(np.argmax(inj.gen.sum(axis=0)))
+    if hour and hour not in inj.hours:
+        print(f"  · hora {hour!r} no está en los datos; se usa la de mayor generación")
+    print(f"Caso base: hora {inj.hours[t]}, {inj.gen[:, t].sum():,.1f} MW de generación")
+
+    # 2) Factores de distribución, una vez
+    with stage('distribution_factors', rows_in=g.n_edges):
+        sim = Cascade.from_model(model, P[:, t])
+        sim.rating = (kv_ratings(g.attrs['tension_kv'].astype(float)) if rating == 'kv'
+                      else tolerance_ratings(sim.f0, alpha))
+    over = np.abs(sim.f0) > sim.rating
+    if over.any():
+        print(f"  · {int(over.sum())} tramos ya sobrecargados en el caso base")
+
+    # 3) Escenarios
+    scenarios = [[k] for k in range(g.n_edges)]
+    if n2:
+        rng = np.random.default_rng(seed)
+        scenarios += [sorted(rng.choice(g.n_edges, 2, replace=False).tolist()) for _ in range(n2)]
+    if scenarios_path:
+        scenarios = read_scenarios(scenarios_path, {k: i for i, k in enumerate(tramo.tolist())})
+    print(f"Escenarios: {len(scenarios)}")
+
+    with stage('cascades', rows_in=len(scenarios)) as st:
+        t0 = time.perf_counter()
+        results = run_many(sim, scenarios, workers=workers)
+        dt = time.perf_counter() - t0
+        st.rows_out = sum(len(r) for r in results)
+    print(f"Simulados en {dt:.2f} s ({len(scenarios) / dt * 60:,.0f} escenarios/min)")
+
+    # 4) Exportar
+    ids = g.node_ids
+    with stage('write', rows_in=len(results)):
+        with open(out / 'cascades.jsonl', 'w', encoding='utf-8') as fj, \
+             open(out / 'cascade_summary.csv', 'w', newline='', encoding='utf-8') as fc:
+            w = csv.writer(fc)
+            w.writerow(['scenario', 'initiating', 'rounds', 'tramos_out', 'barras_out', 'shed_mw'])
+            for i, (init, rounds) in enumerate(zip(scenarios, results)):
+                fj.write(json.dumps({
+                    'scenario': i,
+                    'initiating': tramo[init].tolist(),
+                    'rounds': [{'round': r, 'tripped': tramo[x.tripped].tolist(),
+                                'disconnected': ids[x.disconnected].tolist(),
+                                'shed_mw': round(x.shed_mw, 2)}
+                               for r, x in enumerate(rounds)],
+                }, ensure_ascii=False) + '\n')
+                w.writerow([i, ';'.join(tramo[init]), len(rounds),
+                            sum(len(x.tripped) for x in rounds),
+                            sum(len(x.disconnected) for x in rounds),
+                            round(sum(x.shed_mw for x in rounds), 2)])
+    cascading = sum(len(r) > 1 for r in results)
+    print(f"{cascading} escenarios con cascada (más de una ronda); "
+          f"máx. rondas {max(map(len, results), default=0)}")
+    print(f"Resultados guardados en {out / 'cascades.jsonl'} y {out / 'cascade_summary.csv'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fallas en cascada con LODF sobre el modelo DC')
+    parser.add_argument('--graph', default='data/processed/transmission_graph.npz',
+                        help='grafo CSR de 02_build_transmission_graph')
+    parser.add_argument('--db', default=str(INVENTORY), help='ruta a inventory.duckdb (01_ingest_inventory)')
+    parser.add_argument('--gen', help='CSV barra,hora,mw de generación')
+    parser.add_argument('--demand', help='CSV barra,hora,mw de demanda')
+    parser.add_argument('--hour', help='hora del caso base (por defecto, la de mayor generación)')
+    parser.add_argument('--rating', choices=('tolerance', 'kv'), default='tolerance',
+                        help='límite de cada tramo')
+    parser.add_argument('--alpha', type=float, default=0.3, help='holgura para --rating tolerance')
+    parser.add_argument('--n2', type=int, default=0, help='agregar K escenarios N-2 al azar')
+    parser.add_argument('--scenarios', help='archivo con un escenario (ids de tramo) por línea')
+    parser.add_argument('--workers', type=int, help='procesos (por defecto, todos los núcleos)')
+    parser.add_argument('--out', default='data/processed', help='directorio de salida')
+    args = parser.parse_args()
+    simulate(args.graph, args.db, args.gen, args.demand, args.hour, args.rating, args.alpha,
+             args.n2, args.scenarios, args.workers, args.out)
+
+if __name__ == '__main__':
+    main()
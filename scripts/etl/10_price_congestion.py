@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# scripts/etl/10_price_congestion.py
+
+"""
+Congestión inferida de la separación de costos marginales entre barras, sobre el
+grafo de transmisión de 02_build_transmission_graph.py.
+
+Cada barra con CMg se ubica en el grafo (por id; si la barra no está en el grafo,
+por otra barra de la misma subestación).  Cada barra del grafo queda en la zona de
+la barra con precio más cercana; un corredor a–b son los tramos de la frontera
+entre dos zonas y los caminos más cortos de ahí a a y a b
+(scripts/enerviz/congestion.py).
+
+Todos los meses se leen en una sola consulta DuckDB a una matriz hora × barra y
+los diferenciales horarios de todos los corredores se calculan en un solo paso
+numpy: una hora está congestionada si |CMg_b − CMg_a| supera --min-spread USD/MWh
+y --rel-spread veces el precio medio de ambas barras.
+
+Entradas: data/raw/costo_marginal_*.tsv (payload JSON, como make_price_sample.py)
+Salida:
+  • public/line_congestion.json            {period, hours, tramo, corridor, freq,
+                                            spread, corridors} por tramo, para
+                                            colorear líneas en el visor
+  • data/processed/congestion_corridors.csv un corredor por fila
+"""
+import argparse
+import csv
+import glob
+import json
+import sys
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))   # scripts/ → enerviz
+from enerviz.congestion import MIN_SPREAD, REL_SPREAD, Corridors, barra_nodes, spread_stats
+from enerviz.graph import CSRGraph
+from enerviz.instrument import stage, timed
+from enerviz.inventory import INVENTORY
+from enerviz.names import BarraResolver
+
+MONTHS = 'data/raw/costo_marginal_*.tsv'
+
+
+def price_matrix(paths: list[str], g: CSRGraph, db_path: str) -> tuple[list[str], np.ndarray, np.ndarray, list[str]]:
+    """→ horas, nodos con precio (K), matriz H×K (NaN = sin dato), nombres sin ubicar."""
+    import duckdb
+
+    con = duckdb.connect()
+    con.execute("""
+        CREATE TEMP TABLE cmg AS
+        SELECT barra, replace(left(fecha, 13), ' ', 'T') AS hour, cmg   -- 2025-03-01T00
+        FROM read_json(?, format='array', columns={barra: 'VARCHAR', fecha: 'VARCHAR', cmg: 'DOUBLE'})
+        WHERE cmg IS NOT NULL
+    """, [paths])
+
+    # nombres distintos → id → nodo (cada grafía se resuelve una vez)
+    names = con.execute("SELECT DISTINCT barra FROM cmg").df()['barra']
+    resolver = BarraResolver.from_inventory(db_path)
+    ids = pd.Series([m.id if m else None for m in resolver.resolve_many(names)], index=names)
+    node = barra_nodes(g, ids.dropna(), db_path).dropna().astype(np.int64)
+    missing = sorted(set(names) - set(node.index))
+    priced = np.unique(node.to_numpy())
+    con.register('nodes', pd.DataFrame({'barra': node.index, 'col': np.searchsorted(priced, node)}))
+
+    # varias barras del mismo nodo se promedian
+    df = con.execute("""
+        SELECT c.hour, n.col, avg(c.cmg) AS cmg
+        FROM cmg c JOIN nodes n USING (barra)
+        GROUP BY ALL
+    """).df()
+    con.close()
+    hours, row = np.unique(df['hour'].to_numpy(str), return_inverse=True)
+    prices = np.full((len(hours), len(priced)), np.nan, dtype=np.float32)
+    prices[row, df['col'].to_numpy(np.int64)] = df['cmg'].to_numpy(np.float32)
+    return hours.tolist(), priced, prices, missing
+
+
+@timed()
+def congestion(graph_path: str, db_path: str, months: list[str], min_spread: float,
+               rel_spread: float, out_json: str, out_csv: str) -> None:
+    try:
+        g = CSRGraph.load(graph_path)
+    except FileNotFoundError:
+        print(f"ERROR: {graph_path} no existe: corre 02_build_transmission_graph.py", file=sys.stderr)
+        sys.exit(1)
+    if not months:
+        print(f"ERROR: no hay archivos de CMg ({MONTHS})", file=sys.stderr)
+        sys.exit(1)
+    tramo = g.attrs['tramo_id']
+
+    # 1) Matriz hora × barra de todos los meses
+    with stage('load_prices', rows_in=len(months)) as st:
+        hours, priced, prices, missing = price_matrix(months, g, db_path)
+        st.rows_out = prices.size
+    if not hours:
+        print("ERROR: ninguna barra con CMg se ubicó en el grafo", file=sys.stderr)
+        sys.exit(1)
+    print(f"CMg: {len(months)} archivos, {len(hours)} horas ({hours[0]} → {hours[-1]}), "
+          f"{len(priced)} barras del grafo con precio")
+    if missing:
+        print(f"  · {len(missing)} barras sin ubicar en el grafo (ej. {missing[:5]})")
+
+    # 2) Zonas y corredores
+    with stage('corridors', rows_in=g.n_edges) as st:
+        cor = Corridors.from_graph(g, priced)
+        st.rows_out = len(cor)
+    print(f"Corredores entre barras con precio: {len(cor)} "
+          f"({int((cor.boundary >= 0).sum())} tramos de frontera)")
+
+    # 3) Diferencial horario de todos los corredores en un paso
+    with stage('spread', rows_in=prices.size) as st:
+        t0 = time.perf_counter()
+        s = spread_stats(prices, cor.a, cor.b, min_spread=min_spread, rel_spread=rel_spread)
+        dt = time.perf_counter() - t0
+        st.rows_out = len(cor) * len(hours)
+    print(f"Diferenciales: {len(hours)} horas × {len(cor)} corredores en {dt:.2f} s")
+    by_tramo = cor.per_tramo(s['freq'], g.n_edges)
+
+    # 4) Exportar
+    ids = g.node_ids[priced]
+    out = Path(out_json)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    rnd = lambda x, d: [None if np.isnan(v) else round(float(v), d) for v in x]
+    with stage('write', rows_in=len(cor)):
+        has = by_tramo >= 0
+        take = np.where(has, by_tramo, 0)
+        out.write_text(json.dumps({
+            'period':   [hours[0], hours[-1]],
+            'hours':    len(hours),
+            'threshold': {'minSpread': min_spread, 'relSpread': rel_spread},
+            'tramo':    tramo.tolist(),
+            'corridor': by_tramo.tolist(),
+            'freq':     rnd(np.where(has, s['freq'][take], np.nan), 4),
+            'spread':   rnd(np.where(has, s['mean_abs'][take], np.nan), 2),
+            'corridors': [{'a': ids[a], 'b': ids[b], 'freq': f, 'spread': m}
+                          for a, b, f, m in zip(cor.a.tolist(), cor.b.tolist(),
+                                                rnd(s['freq'], 4), rnd(s['mean_abs'], 2))],
+        }, separators=(',', ':'), ensure_ascii=False))
+
+        Path(out_csv).parent.mkdir(parents=True, exist_ok=True)
+        with open(out_csv, 'w', newline='', encoding='utf-8') as f:
+            w = csv.writer(f)
+            w.writerow(['corridor', 'barra_a', 'barra_b', 'tramos', 'hours', 'congested_hours',
+                        'freq', 'mean_spread', 'mean_signed_spread', 'p95_spread', 'max_spread'])
+            for c in np.argsort(-np.nan_to_num(s['freq'], nan=-1), kind='stable'):
+                w.writerow([c, ids[cor.a[c]], ids[cor.b[c]], ';'.join(tramo[cor.tramos[c]]),
+                            s['hours'][c], s['congested'][c],
+                            *rnd([s[k][c] for k in ('freq', 'mean_abs', 'mean_signed',
+                                                    'p95_abs', 'max_abs')], 3)])
+    hot = s['freq'] >= 0.1
+    print(f"{int(hot.sum())} corredores congestionados ≥10 % de las horas; "
+          f"{int(has.sum())} de {g.n_edges} tramos en algún corredor")
+    print(f"Resultados guardados en {out} y {out_csv}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Congestión por separación de CMg entre barras')
+    parser.add_argument('--graph', default='data/processed/transmission_graph.npz',
+                        help='grafo CSR de 02_build_transmission_graph')
+    parser.add_argument('--db', default=str(INVENTORY), help='ruta a inventory.duckdb (01_ingest_inventory)')
+    parser.add_argument('--months', nargs='+', help=f'archivos de CMg (por defecto, {MONTHS})')
+    parser.add_argument('--min-spread', type=float, default=MIN_SPREAD,
+                        help='diferencial mínimo para congestión (USD/MWh)')
+    parser.add_argument('--rel-spread', type=float, default=REL_SPREAD,
+                        help='diferencial mínimo relativo al precio medio del corredor')
+    parser.add_argument('--out', default='public/line_congestion.json', help='JSON para el visor')
+    parser.add_argument('--csv', default='data/processed/congestion_corridors.csv',
+                        help='resumen por corredor')
+    args = parser.parse_args()
+    months = args.months or sorted(glob.glob(MONTHS))
+    congestion(args.graph, args.db, months, args.min_spread, args.rel_spread, args.out, args.csv)
+
+if __name__ == '__main__':
+    main()
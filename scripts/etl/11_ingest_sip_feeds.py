@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# scripts/etl/11_ingest_sip_feeds.py
+
+"""
+Normaliza los datasets de operación descargados con fetch_sip.py (demanda,
+generacion, potencia_transitada, embalses) a tablas Parquet tipadas y
+particionadas por mes (scripts/enerviz/feeds.py).
+
+  • un solo eje de tiempo: ts = inicio de la hora (lecturas sub-horarias se
+    promedian; columnas «hora» 1–24 se corren a 0–23)
+  • nombres de barra / central / línea → ids del inventario, cada grafía una
+    sola vez y aquí, no en cada análisis
+  • columnas numéricas con coma decimal se convierten a DOUBLE
+
+Entradas: <raw>/demanda_real_*.csv.gz, generacion_*, pot_transitada_*, embalses_*
+Salida:
+  • data/curated/sip/<feed>/month=YYYY-MM/*.parquet
+  • data/curated/sip/names.parquet        feed, name, id, score (revisar los sin id)
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))   # scripts/ → enerviz
+from enerviz.feeds import FEEDS, RAW, SIP, normalize, resolver, write_names
+from enerviz.instrument import stage, timed
+from enerviz.inventory import INVENTORY
+
+
+@timed()
+def ingest_feeds(raw_dirs: list[str], feeds: list[str], db_path: str, out_dir: str) -> None:
+    tables = []
+    for feed in feeds:
+        files = sorted({str(p) for d in raw_dirs for p in Path(d).glob(FEEDS[feed].files)})
+        if not files:
+            print(f"· {feed}: sin archivos ({FEEDS[feed].files} en {', '.join(raw_dirs)})")
+            continue
+        with stage(f'resolver_{feed}'):
+            try:
+                res = resolver(FEEDS[feed].entity, db_path)
+            except FileNotFoundError as e:
+                print(f"ERROR: {e}", file=sys.stderr)
+                sys.exit(1)
+        with stage(f'normalize_{feed}', rows_in=len(files)) as st:
+            try:
+                n, names = normalize(feed, files, out_dir, res)
+            except KeyError as e:
+                print(f"ERROR: {e}", file=sys.stderr)
+                sys.exit(1)
+            st.rows_out = n
+        tables.append(names)
+        hit = names['id'].notna().sum()
+        print(f"→ {feed}: {len(files)} archivos, {n:,} filas horarias, "
+              f"{hit}/{len(names)} nombres con id del inventario"
+              if res is not None else
+              f"→ {feed}: {len(files)} archivos, {n:,} filas horarias, {len(names)} nombres")
+        if res is not None and hit < len(names):
+            print(f"  · sin id: {names.loc[names['id'].isna(), 'name'].head(5).tolist()}")
+    if tables:
+        path = write_names(tables, out_dir)
+        print(f"Tablas en {out_dir}/<feed>/month=*/; nombres resueltos en {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Feeds SIP → Parquet tipado y particionado por mes')
+    parser.add_argument('--raw', nargs='+', default=[str(RAW), 'data/raw'],
+                        help='directorios con las descargas de fetch_sip.py')
+    parser.add_argument('--feeds', nargs='+', choices=list(FEEDS), default=list(FEEDS))
+    parser.add_argument('--db', default=str(INVENTORY), help='ruta a inventory.duckdb (01_ingest_inventory)')
+    parser.add_argument('--out', default=str(SIP), help='directorio de salida')
+    args = parser.parse_args()
+    ingest_feeds(args.raw, args.feeds, args.db, args.out)
+
+if __name__ == '__main__':
+    main()
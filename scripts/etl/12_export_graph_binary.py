@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# scripts/etl/12_export_graph_binary.py
+
+"""
+Exporta la topología Barra–Tramo de 02_build_transmission_graph.py como paquete
+binario para el visor (formato en scripts/enerviz/graphpack.py).
+
+A diferencia de los JSON node_link / GraphML de 04–05, el paquete son arreglos
+CSR con índices enteros, tablas de strings (id y nombre de barra, id de tramo),
+coordenadas por barra y puentes / puntos de articulación ya calculados: un Web
+Worker lo envuelve en typed arrays sin parsear nada y corre BFS / union-find
+(N-1) directamente sobre ellos (viewer/src/workers/n1.worker.ts).
+
+Salida: public/sen_graph.bin
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))   # scripts/ → enerviz
+from enerviz import graphpack
+from enerviz.graph import CSRGraph
+from enerviz.instrument import stage, timed
+from enerviz.inventory import INVENTORY, connect
+
+
+@timed()
+def export_binary(graph_path: str, db_path: str, out_path: str) -> None:
+    try:
+        g = CSRGraph.load(graph_path)
+    except FileNotFoundError:
+        print(f"ERROR: {graph_path} no existe: corre 02_build_transmission_graph.py", file=sys.stderr)
+        sys.exit(1)
+
+    con = connect(db_path)
+    barras = con.execute("""
+        SELECT b.id, b.name, s.lon, s.lat
+        FROM inv.barra b LEFT JOIN inv.subestacion s ON s.id = b.subestacion_id
+    """).df().drop_duplicates('id').set_index('id').reindex(g.node_ids)
+    con.close()
+
+    with stage('write_package', rows_in=g.n_edges) as st:
+        path = graphpack.write(g, out_path, node_names=barras['name'].fillna('').tolist(),
+                               lonlat=barras[['lon', 'lat']].to_numpy(float))
+        st.rows_out = path.stat().st_size
+    pack = graphpack.read(path)
+    print(f"Paquete: {g.n_nodes} barras, {g.n_edges} tramos, "
+          f"{int(pack['bridge'].sum())} puentes, {int(pack['articulation'].sum())} puntos de articulación")
+    print(f"Guardado en {path} ({path.stat().st_size / 1024:.0f} KB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Grafo Barra–Tramo → paquete binario para el visor')
+    parser.add_argument('--graph', default='data/processed/transmission_graph.npz',
+                        help='grafo CSR de 02_build_transmission_graph')
+    parser.add_argument('--db', default=str(INVENTORY), help='ruta a inventory.duckdb (01_ingest_inventory)')
+    parser.add_argument('--out', default='public/sen_graph.bin', help='paquete binario')
+    args = parser.parse_args()
+    export_binary(args.graph, args.db, args.out)
+
+if __name__ == '__main__':
+    main()
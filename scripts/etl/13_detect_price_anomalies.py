@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# scripts/etl/13_detect_price_anomalies.py
+
+"""
+Detector en línea de peaks de CMg y desacoples entre barras vecinas
+(scripts/enerviz/anomaly.py), alimentado con cada lote nuevo de CMg.
+
+El estado (media y varianza EWMA, histograma decaído como sketch de
+cuantiles por barra, y estadísticas del diferencial por par de barras
+vecinas) vive en un .npz compacto; cada corrida lo carga, lee sólo los
+archivos modificados desde la corrida anterior (el mtime del estado), resuelve
+y procesa sólo las horas posteriores a la última vista y lo vuelve a guardar:
+el costo de un lote no crece con la historia, y volver a pasar archivos ya
+procesados no cuenta nada dos veces.  Las alertas se
+agregan (una por línea, JSON) a public/cmg_alerts.jsonl, que el visor
+superpone en el globo (viewer/src/components/AlertsLayer.tsx).
+
+Barras vecinas = zonas de precio adyacentes en el grafo de transmisión
+(02_build_transmission_graph.py, igual que 10_price_congestion.py); sin
+grafo sólo se detectan peaks.
+
+Entradas: data/raw/costo_marginal_*.tsv (payload JSON) y/o descargas de
+          fetch_sip.py cmg_*.csv.gz (barra | fecha | cmg)
+Uso:
+  python scripts/etl/13_detect_price_anomalies.py                     # lote nuevo
+  python scripts/etl/13_detect_price_anomalies.py --reset \\
+    --inputs 'data/raw/costo_marginal_2025*.tsv'                       # re-simular un año
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))   # scripts/ → enerviz
+from enerviz.anomaly import ALERTS, HALFLIFE_H, STATE, PriceWatch
+from enerviz.congestion import Corridors, barra_nodes
+from enerviz.feeds import RAW, utc_hours
+from enerviz.graph import CSRGraph
+from enerviz.instrument import stage, timed
+from enerviz.inventory import INVENTORY
+from enerviz.names import BarraResolver
+
+INPUTS = ['data/raw/costo_marginal_*.tsv', str(RAW / 'cmg_*.csv.gz')]
+# grafías de columnas en las descargas de fetch_sip.py (ya en minúsculas)
+COLUMNS = {'barra': ('barra', 'nombre_barra', 'barra_info', 'nombre'),
+           'fecha': ('fecha', 'fecha_hora', 'fechahora', 'timestamp'),
+           'cmg':   ('cmg', 'cmg_usd_mwh', 'costo_marginal', 'usd_mwh', 'valor')}
+
+
+def read_batch(files: list[str], resolver: BarraResolver, after: str = ''):
+    """→ horas (> after), ids de barra, nombre por id, matriz H×K (NaN = sin dato), nombres sin id."""
+    import duckdb
+
+    con = duckdb.connect()
+    con.execute("CREATE TEMP TABLE cmg (barra VARCHAR, fecha VARCHAR, cmg DOUBLE)")
+    payload = [f for f in files if not f.endswith('.csv.gz')]
+    if payload:
+        con.execute("""
+            INSERT INTO cmg
+            SELECT barra, fecha, cmg
+            FROM read_json(?, format='array', columns={barra: 'VARCHAR', fecha: 'VARCHAR', cmg: 'DOUBLE'})
+        """, [payload])
+    for f in (f for f in files if f.endswith('.csv.gz')):
+        path = f.replace("'", "''")
+        con.execute(f"CREATE OR REPLACE TEMP VIEW src AS "
+                    f"SELECT * FROM read_csv('{path}', delim='|', header=true, all_varchar=true)")
+        cols = [r[0] for r in con.execute("DESCRIBE src").fetchall()]
+        m = {k: next((c for c in cols if c.lower() in v), None) for k, v in COLUMNS.items()}
+        if None in m.values():
+            print(f"  · {Path(f).name}: sin columnas {[k for k, c in m.items() if c is None]}, se omite")
+            continue
+        b, t, v = (f'"{m[k]}"' for k in ('barra', 'fecha', 'cmg'))
+        con.execute(f"""
+            INSERT INTO cmg
+            SELECT TRIM({b}), TRIM({t}),
+                   COALESCE(TRY_CAST({v} AS DOUBLE), TRY_CAST(replace({v}, ',', '.') AS DOUBLE))
+            FROM src
+        """)
+    con.execute("DELETE FROM cmg WHERE cmg IS NULL OR barra IS NULL OR fecha IS NULL")
+
+    # hora UTC de cada fecha distinta (mismo eje que los orbes y el heatmap del visor)
+    # y sólo las horas posteriores al estado: las ya vistas no se resuelven de nuevo
+    fechas = con.execute("SELECT DISTINCT fecha FROM cmg").df()['fecha']
+    con.register('hours', pd.DataFrame({'fecha': fechas, 'hour': utc_hours(fechas)}))
+    con.execute("""
+        CREATE TEMP TABLE cmg_h AS
+        SELECT c.barra, h.hour, c.cmg FROM cmg c JOIN hours h USING (fecha)
+        WHERE h.hour > ?                                               -- 2025-03-01T03:00:00Z
+    """, [after])
+
+    # cada grafía se resuelve una vez; varias grafías de la misma barra se promedian
+    names = con.execute("SELECT DISTINCT barra FROM cmg_h ORDER BY barra").df()['barra']
+    ids = pd.Series([m.id if m else None for m in resolver.resolve_many(names)], index=names)
+    missing = ids[ids.isna()].index.tolist()
+    ids = ids.dropna()
+    con.register('ids', pd.DataFrame({'barra': ids.index, 'id': ids.to_numpy()}))
+    df = con.execute("""
+        SELECT c.hour, i.id, avg(c.cmg) AS cmg, min(c.barra) AS name
+        FROM cmg_h c JOIN ids i USING (barra)
+        GROUP BY ALL
+    """).df()
+    con.close()
+    hours, row = np.unique(df['hour'].to_numpy(str), return_inverse=True)
+    uid, col = np.unique(df['id'].to_numpy(str), return_inverse=True)
+    prices = np.full((len(hours), len(uid)), np.nan)
+    prices[row, col] = df['cmg'].to_numpy(float)
+    first = df.drop_duplicates('id').set_index('id')['name']
+    return hours.tolist(), uid, first.reindex(uid).tolist(), prices, missing
+
+
+def neighbour_pairs(watch: PriceWatch, graph_path: str, db_path: str) -> tuple[np.ndarray, np.ndarray]:
+    """Pares (columnas del estado) de barras en zonas de precio adyacentes."""
+    g = CSRGraph.load(graph_path)
+    node = barra_nodes(g, pd.Series(watch.ids), db_path)
+    has = node.notna().to_numpy()
+    nodes = node[has].astype(np.int64).to_numpy()
+    priced, first = np.unique(nodes, return_index=True)
+    rep = np.flatnonzero(has)[first]                   # una columna del estado por nodo
+    cor = Corridors.from_graph(g, priced)
+    return rep[cor.a], rep[cor.b]
+
+
+@timed()
+def detect(files: list[str], state_path: str, alerts_path: str, graph_path: str, db_path: str,
+           reset: bool, halflife: float) -> None:
+    if not files:
+        print(f"ERROR: no hay archivos de CMg ({', '.join(INPUTS)})", file=sys.stderr)
+        sys.exit(1)
+    state, alerts_out = Path(state_path), Path(alerts_path)
+    started = time.time_ns()
+    resume = state.exists() and not reset
+    watch = PriceWatch.load(state) if resume else PriceWatch.empty(halflife)
+    if reset:
+        alerts_out.unlink(missing_ok=True)
+    if resume:
+        # el mtime del estado es el inicio de la corrida anterior: lo que no
+        # cambió desde entonces ya está en el estado
+        since = state.stat().st_mtime_ns
+        files = [f for f in files if os.stat(f).st_mtime_ns > since]
+        if not files:
+            print(f"Sin archivos nuevos (última hora procesada: {watch.last or '—'})")
+            return
+
+    with stage('load_batch', rows_in=len(files)) as st:
+        resolver = BarraResolver.from_inventory(db_path)
+        hours, ids, names, prices, missing = read_batch(files, resolver, after=watch.last)
+        st.rows_out = prices.size
+    if missing:
+        print(f"  · {len(missing)} barras sin id del inventario (ej. {missing[:5]})")
+    if not hours:
+        print(f"Sin horas nuevas (última procesada: {watch.last or '—'})")
+        if resume:
+            os.utime(state, ns=(started, started))
+        return
+
+    with stage('barras', rows_in=len(ids)) as st:
+        known = len(watch.ids)
+        loc = [resolver.coords(i) or (np.nan, np.nan) for i in ids]
+        cols = watch.add_barras(ids, names, [a for a, _ in loc], [b for _, b in loc])
+        st.rows_out = len(watch.ids) - known
+        if len(watch.ids) > known:
+            if Path(graph_path).exists():
+                watch.set_pairs(*neighbour_pairs(watch, graph_path, db_path))
+            else:
+                print(f"  · {graph_path} no existe: sólo peaks, sin desacoples entre vecinas")
+    block = np.full((len(hours), len(watch.ids)), np.nan)
+    block[:, cols] = prices
+
+    with stage('detect', rows_in=block.size) as st:
+        t0 = time.perf_counter()
+        alerts = watch.run(hours, block)
+        dt = time.perf_counter() - t0
+        st.rows_out = len(alerts)
+    print(f"{len(hours)} horas ({hours[0]} → {hours[-1]}) × {len(watch.ids)} barras, "
+          f"{len(watch.pa)} pares vecinos en {dt:.2f} s ({1000 * dt / len(hours):.2f} ms/hora)")
+
+    with stage('write', rows_in=len(alerts)):
+        alerts_out.parent.mkdir(parents=True, exist_ok=True)
+        with open(alerts_out, 'a', encoding='utf-8') as f:
+            for a in alerts:
+                f.write(json.dumps(a, ensure_ascii=False, separators=(',', ':')) + '\n')
+        watch.save(state)
+        os.utime(state, ns=(started, started))
+    kinds = pd.Series([a['kind'] for a in alerts], dtype=str).value_counts().to_dict()
+    print(f"Alertas: {len(alerts)}{f' {kinds}' if kinds else ''} → {alerts_out}; estado en {state} "
+          f"({state.stat().st_size / 1024:.0f} KB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Peaks de CMg y desacoples entre barras vecinas (en línea)')
+    parser.add_argument('--inputs', nargs='+', default=INPUTS,
+                        help='archivos o globs de CMg (payload JSON .tsv o fetch_sip .csv.gz)')
+    parser.add_argument('--state', default=str(STATE), help='estado del detector')
+    parser.add_argument('--alerts', default=str(ALERTS), help='log de alertas (JSON por línea)')
+    parser.add_argument('--graph', default='data/processed/transmission_graph.npz',
+                        help='grafo CSR de 02_build_transmission_graph')
+    parser.add_argument('--db', default=str(INVENTORY), help='ruta a inventory.duckdb (01_ingest_inventory)')
+    parser.add_argument('--reset', action='store_true', help='empezar de cero (estado y log)')
+    parser.add_argument('--halflife', type=float, default=HALFLIFE_H,
+                        help='vida media de las estadísticas, en horas (sólo con estado nuevo)')
+    args = parser.parse_args()
+    files = sorted({f for p in args.inputs for f in glob.glob(p)})
+    detect(files, args.state, args.alerts, args.graph, args.db, args.reset, args.halflife)
+
+if __name__ == '__main__':
+    main()
@@ -10,9 +10,14 @@ Ejemplos:
 from __future__ import annotations
 import argparse, csv, gzip, io, random, sys, textwrap
 from pathlib import Path
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup   # pip install beautifulsoup4
+from typing import TYPE_CHECKING
+
+from enerviz.instrument import stage
+
+if TYPE_CHECKING:
+    import pandas as pd
+# pandas, requests y bs4 se importan dentro de cada comando: `list` y
+# `--help` no deben pagar su tiempo de carga (ver enerviz.cli).
 
 # ─────────────────────────  Config  ─────────────────────────
 HEADERS = {
@@ -75,6 +80,7 @@ def build_query(base: str, **p) -> str:
     return base
 
 def download(url: str) -> tuple[bytes, str]:
+    import requests
     r = requests.get(url, headers=HEADERS, timeout=60)
     r.raise_for_status()
     return r.content, r.headers.get("Content-Type", "")
@@ -83,6 +89,7 @@ def is_html(raw: bytes, ctype: str) -> bool:
     return ("html" in ctype.lower()) or raw.strip().lower().startswith(b"<!doctype")
 
 def parse_tsv(raw: bytes) -> pd.DataFrame:
+    import pandas as pd
     text = raw.decode("utf-8", "replace")
     # 1) intentamos autodetectar
     try:
@@ -106,7 +113,7 @@ def parse_tsv(raw: bytes) -> pd.DataFrame:
 def save(df: pd.DataFrame, name: str) -> None:
     out = DATA_DIR / f"{name}.csv.gz"
     out.parent.mkdir(parents=True, exist_ok=True)
-    with gzip.open(out, "wt", encoding="utf-8") as zf:
+    with stage("save", rows_in=len(df)), gzip.open(out, "wt", encoding="utf-8") as zf:
         df.to_csv(zf, index=False, sep="|")
     print(f"✔ Guardado {out} ({out.stat().st_size/1024:.0f} KB)")
 
@@ -117,15 +124,19 @@ def fetch(target: str, **flt) -> None:
     url = build_query(base, **flt)
     print("→", url)
 
-    raw, ctype = download(url)
+    with stage("download", target=target) as st:
+        raw, ctype = download(url)
+        st.extra["bytes"] = len(raw)
     if is_html(raw, ctype):
         print("✖ El servidor respondió HTML. Probablemente:")
         print("   • el dataset para esos filtros aún no está publicado, o")
         print("   • los parámetros son incorrectos.")
         sys.exit(1)
 
-    df = parse_tsv(raw)
-    df.columns = [c.strip().lower() for c in df.columns]
+    with stage("parse_tsv") as st:
+        df = parse_tsv(raw)
+        df.columns = [c.strip().lower() for c in df.columns]
+        st.rows_out = len(df)
     save(df, tmpl.format(**flt))
 
 def peek(target: str) -> None:
@@ -133,6 +144,7 @@ def peek(target: str) -> None:
     base, allowed, _ = TARGETS[target]
     if "month" not in allowed:
         sys.exit("peek solo funciona en targets mensuales (--month).")
+    from bs4 import BeautifulSoup   # pip install beautifulsoup4
     html, _ = download(base)
     soup = BeautifulSoup(html, "html.parser")
     opts = [o["value"] for o in soup.select("select option[value]") if o["value"]]
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+What changed in the grid between two inventory snapshots (enerviz.snapshots).
+
+    python scripts/inventory_diff.py list
+    python scripts/inventory_diff.py diff                          # last two snapshots
+    python scripts/inventory_diff.py --ids                         # same (diff is the default)
+    python scripts/inventory_diff.py diff 2025-03-01 2025-04-01 --ids
+    python scripts/inventory_diff.py diff 2025-03-01 2025-04-01 --json > cambios.json
+
+Snapshots are written by 01_ingest_inventory.py under data/curated/snapshots.
+Tramos, Barras, Subestaciones and Lineas are matched on id and compared by
+row hash; the connectivity block counts the components of the barra–tramo
+graph and lists barras that left or joined the main one.
+"""
+import argparse, json, sys, time
+
+from enerviz.snapshots import SNAPSHOTS, available, diff, manifest
+
+ap = argparse.ArgumentParser(description="Diferencias entre snapshots del inventario")
+ap.add_argument("cmd", nargs="?", default="diff", choices=("list", "diff"), help="por defecto, diff")
+ap.add_argument("a", nargs="?", help="snapshot base (por defecto, el penúltimo)")
+ap.add_argument("b", nargs="?", help="snapshot nuevo (por defecto, el último)")
+ap.add_argument("--root", default=str(SNAPSHOTS), help="directorio de snapshots")
+ap.add_argument("--ids", action="store_true", help="listar ids además de los conteos")
+ap.add_argument("--json", action="store_true", help="salida JSON (con ids)")
+args = ap.parse_args()
+
+dates = available(args.root)
+if args.cmd == "list":
+    for d in dates:
+        m = manifest(d, args.root)
+        rows = "  ".join(f"{t}={n}" for t, n in m["rows"].items())
+        print(f"{d}  {m.get('source') or '':32s} {rows}")
+    print(f"🗂  {len(dates)} snapshots in {args.root}")
+    sys.exit(0)
+
+a, b = args.a, args.b
+if b is None:
+    if len(dates) < (1 if a else 2):
+        sys.exit(f"❌ need two snapshots in {args.root} (have {dates})")
+    a, b = a or dates[-2], dates[-1]
+
+t0 = time.perf_counter()
+try:
+    d = diff(a, b, args.root)
+except FileNotFoundError as e:
+    sys.exit(f"❌ {e}")
+dt = time.perf_counter() - t0
+
+if args.json:
+    print(json.dumps({"a": d.a, "b": d.b,
+                      "tables": {t: {"added": x.added, "removed": x.removed, "modified": x.modified}
+                                 for t, x in d.tables.items()},
+                      "connectivity": d.connectivity}, ensure_ascii=False))
+    sys.exit(0)
+
+print(f"{a} → {b}")
+for tbl, x in d.tables.items():
+    c = x.counts()
+    print(f"  {tbl:12s} +{c['added']:<6d} -{c['removed']:<6d} ~{c['modified']}")
+    if args.ids:
+        for tag, ids in (("+", x.added), ("-", x.removed)):
+            if ids:
+                print(f"      {tag} {', '.join(ids)}")
+        for i, cols in x.modified.items():
+            print(f"      ~ {i}: {', '.join(cols)}")
+k = d.connectivity
+print(f"  components   {k['components_a']} → {k['components_b']} ({k['components_delta']:+d}), "
+      f"main {k['main_a']} → {k['main_b']} barras ({k['main_delta']:+d})")
+for tag in ("left_main", "joined_main"):
+    if k[tag]:
+        more = f" … (+{len(k[tag]) - 10})" if len(k[tag]) > 10 and not args.ids else ""
+        print(f"  {tag:12s} {', '.join(k[tag] if args.ids else k[tag][:10])}{more}")
+print(f"⏱  {dt:.2f} s")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+Hierarchy queries over the SEN knowledge graph, answered from the interval
+index (enerviz.hierarchy) instead of networkx traversals.
+
+    python scripts/kg_query.py descendants E_12 --type Tramo
+    python scripts/kg_query.py reachable E_12 --type Barra
+    python scripts/kg_query.py owners S_40
+    python scripts/kg_query.py ancestors T_311
+    python scripts/kg_query.py stats
+
+Uses data/processed/kg_index.npz (written by 04_build_knowledge_graph.py)
+when present, else builds the index from data/curated/inventory.duckdb.
+"""
+import argparse, json, pathlib
+
+from enerviz.hierarchy import INDEX, TYPES, HierarchyIndex
+from enerviz.inventory import INVENTORY, connect
+
+QUERIES = ("descendants", "reachable", "owners", "ancestors", "owner", "count", "stats")
+
+ap = argparse.ArgumentParser(description="Consultas jerárquicas sobre el knowledge graph")
+ap.add_argument("query", choices=QUERIES)
+ap.add_argument("node", nargs="?", help="id de nodo del KG (E_12, S_40, T_311, …)")
+ap.add_argument("--type", choices=TYPES, help="solo nodos de este tipo")
+ap.add_argument("--index", default=str(INDEX), help="índice precalculado (.npz)")
+ap.add_argument("--db", default=str(INVENTORY), help="inventory.duckdb si no hay índice")
+ap.add_argument("--json", action="store_true", help="salida JSON")
+args = ap.parse_args()
+if args.query != "stats" and not args.node:
+    ap.error(f"{args.query} necesita un nodo")
+
+if pathlib.Path(args.index).exists():
+    idx = HierarchyIndex.load(args.index)
+else:
+    con = connect(args.db)
+    idx = HierarchyIndex.from_inventory(con)
+    con.close()
+if args.node and args.node not in idx.pos:
+    ap.error(f"nodo desconocido: {args.node}")
+
+if args.query == "stats":
+    result = idx.stats()
+elif args.query in ("descendants", "reachable"):
+    result = getattr(idx, args.query)(args.node, args.type)
+elif args.query == "count":
+    result = idx.count(args.node, args.type)
+else:
+    result = getattr(idx, args.query)(args.node)
+
+if args.json:
+    print(json.dumps(result, ensure_ascii=False))
+elif isinstance(result, dict):
+    for k, v in result.items():
+        print(f"{k:12s} {v}")
+elif isinstance(result, list):
+    print("\n".join(result))
+    print(f"🔎 {len(result)} nodes")
+else:
+    print(result)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Local load test for serve_artifacts.py: requests/s and latency percentiles.
+
+    python scripts/loadtest_artifacts.py --spawn                       # own server, every artifact
+    python scripts/loadtest_artifacts.py lines.geojson sen_graph.bin -c 32 -n 20000
+    python scripts/loadtest_artifacts.py --encoding gzip --range 65536 --range-frac 0.5
+
+Each of --concurrency clients keeps one HTTP/1.1 connection open and sends
+GETs for paths drawn (seeded) from the list given, by default every file
+under --root that is not a precompressed variant.  --range sends that
+fraction of requests as a random single byte range of the given length;
+--revalidate sends If-None-Match with the ETag seen before (expect 304).
+"""
+import argparse, asyncio, pathlib, random, subprocess, sys, time
+from collections import Counter
+from urllib.parse import quote
+
+from enerviz.artifacts import PORT, ROOTS
+
+ap = argparse.ArgumentParser(description="Prueba de carga local del servidor de artefactos")
+ap.add_argument("paths", nargs="*", help="rutas URL (por defecto, todos los archivos de --root)")
+ap.add_argument("--host", default="127.0.0.1")
+ap.add_argument("--port", type=int, default=PORT)
+ap.add_argument("--root", nargs="+", default=list(ROOTS), help="directorios de donde tomar las rutas")
+ap.add_argument("-c", "--concurrency", type=int, default=16, help="conexiones simultáneas")
+ap.add_argument("-n", "--requests", type=int, default=5000, help="total de requests")
+ap.add_argument("--encoding", default="br, gzip", help="Accept-Encoding enviado ('identity' = sin compresión)")
+ap.add_argument("--range", type=int, default=0, metavar="BYTES", help="largo de los rangos pedidos")
+ap.add_argument("--range-frac", type=float, default=1.0, help="fracción de requests con Range (con --range)")
+ap.add_argument("--revalidate", action="store_true", help="If-None-Match con el ETag ya visto")
+ap.add_argument("--spawn", action="store_true", help="levantar serve_artifacts.py en --port durante la prueba")
+ap.add_argument("--seed", type=int, default=0)
+args = ap.parse_args()
+
+sizes = {}
+for root in map(pathlib.Path, args.root):
+    for p in sorted(root.rglob("*")) if root.is_dir() else ():
+        if p.is_file() and p.suffix not in (".gz", ".br"):
+            sizes.setdefault(p.relative_to(root).as_posix(), p.stat().st_size)
+paths = args.paths or list(sizes)
+if not paths:
+    sys.exit(f"❌ no files under {args.root}")
+
+rng = random.Random(args.seed)
+plan = [rng.choice(paths) for _ in range(args.requests)]
+etags: dict[str, str] = {}
+
+def request(path: str) -> bytes:
+    h = [f"GET /{quote(path)} HTTP/1.1", f"Host: {args.host}:{args.port}", f"Accept-Encoding: {args.encoding}"]
+    size = sizes.get(path, 0)
+    if args.range and size and rng.random() < args.range_frac:
+        a = rng.randrange(max(size - args.range, 0) + 1)
+        h.append(f"Range: bytes={a}-{a + args.range - 1}")
+    if args.revalidate and path in etags:
+        h.append(f"If-None-Match: {etags[path]}")
+    return ("\r\n".join(h) + "\r\n\r\n").encode("latin-1")
+
+async def client(queue: list, lat: list, status: Counter, nbytes: list) -> None:
+    reader, writer = await asyncio.open_connection(args.host, args.port, limit=1 << 20)
+    try:
+        while queue:
+            path = queue.pop()
+            t0 = time.perf_counter()
+            writer.write(request(path))
+            head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+            code = int(head[0].split(" ")[1])
+            h = {k.strip().lower(): v.strip() for k, _, v in (x.partition(":") for x in head[1:] if x)}
+            n = int(h.get("content-length", 0))
+            await reader.readexactly(n)
+            lat.append(time.perf_counter() - t0)
+            status[code] += 1
+            nbytes[0] += n
+            if "etag" in h:
+                etags.setdefault(path, h["etag"])
+            if h.get("connection") == "close":
+                writer.close()
+                reader, writer = await asyncio.open_connection(args.host, args.port, limit=1 << 20)
+    finally:
+        writer.close()
+
+async def run() -> tuple[float, list, Counter, int]:
+    queue, lat, status, nbytes = plan[::-1], [], Counter(), [0]
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(queue, lat, status, nbytes) for _ in range(args.concurrency)))
+    return time.perf_counter() - t0, lat, status, nbytes[0]
+
+async def wait_ready(timeout: float = 10.0) -> None:
+    end = time.monotonic() + timeout
+    while True:
+        try:
+            _, w = await asyncio.open_connection(args.host, args.port)
+            w.close()
+            return
+        except OSError:
+            if time.monotonic() > end:
+                raise
+            await asyncio.sleep(0.05)
+
+proc = None
+if args.spawn:
+    serve = pathlib.Path(__file__).with_name("serve_artifacts.py")
+    proc = subprocess.Popen([sys.executable, str(serve), "--root", *args.root,
+                             "--host", args.host, "--port", str(args.port)], stdout=subprocess.DEVNULL)
+try:
+    try:
+        asyncio.run(wait_ready())
+    except OSError:
+        sys.exit(f"❌ nothing listening on {args.host}:{args.port} (start serve_artifacts.py or use --spawn)")
+    dt, lat, status, nbytes = asyncio.run(run())
+finally:
+    if proc is not None:
+        proc.terminate()
+        proc.wait()
+
+ms = sorted(1000 * t for t in lat)
+p50, p90, p99 = (ms[min(int(q * len(ms)), len(ms) - 1)] for q in (0.50, 0.90, 0.99))
+print(f"🚀 {len(lat)} requests over {args.concurrency} connections, {len(set(plan))} paths, "
+      f"Accept-Encoding: {args.encoding}{f', Range {args.range} B' if args.range else ''}")
+print(f"   {len(lat) / dt:,.0f} req/s   {nbytes / dt / 2**20:,.1f} MB/s   "
+      f"latency p50 {p50:.2f}  p90 {p90:.2f}  p99 {p99:.2f}  max {ms[-1]:.2f} ms")
+print(f"   status {dict(sorted(status.items()))}")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+"""
+Pre-render hourly marginal-price heatmaps as an imagery tile pyramid.
+
+Each hour's CMg is interpolated from the located barras (inverse-distance
+weighting over the k nearest barras, found once with a KD-tree) onto every
+pixel of every tile, and written as PNG tiles in Cesium's geographic tiling
+scheme, so the viewer drapes them with a UrlTemplateImageryProvider.
+
+The KD-tree query and the IDW weights depend only on the tile, not on the
+hour, so each worker computes them once per tile and then evaluates the
+month's hours in a few blocked (hours × pixels × k) numpy passes.
+
+Inputs:
+    data/raw/costo_marginal_<YYYYMM>.tsv   (JSON payload, like make_price_sample.py)
+    data/curated/inventory.duckdb          barra coordinates (via enerviz.names)
+Output:
+    public/heatmap/index.json              hours (+ UTC start of each, as the orbs'
+                                           ts: enerviz.feeds.utc_hours), rectangle,
+                                           levels, price scale
+    public/heatmap/<hour>/<z>/<x>/<y>.png  256×256 RGBA tiles
+
+Usage:
+    python scripts/make_price_heatmap.py --month data/raw/costo_marginal_202503.tsv
+"""
+from __future__ import annotations
+import argparse, json, os, pathlib, time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+from scipy.spatial import cKDTree
+
+from enerviz.feeds import utc_hours
+from enerviz.instrument import stage
+from enerviz.names import BarraResolver
+
+OUT      = pathlib.Path("public/heatmap")
+CHILE    = (-76.0, -56.0, -66.0, -17.0)   # west, south, east, north (deg)
+TILE     = 256
+HOURS_PER_PASS = 48                      # bounds the (hours × pixels × k) gather
+EARTH_KM = 6371.0
+
+# price ramp – same anchors as viewer/src/utils/colorRamp.ts, interpolated
+RAMP_MAX = 120.0
+RAMP = [   # USD/MWh, (r, g, b)
+    (0.0,   (0, 255, 0)),
+    (40.0,  (255, 255, 0)),
+    (60.0,  (255, 165, 0)),
+    (80.0,  (255, 0, 0)),
+    (120.0, (139, 0, 0)),
+]
+ALPHA = 150
+
+# ───────────────────────── inputs ──────────────────────────
+def load_prices(month: pathlib.Path) -> tuple[list[str], list[str], np.ndarray, np.ndarray]:
+    """→ hour labels, their UTC starts, barra lat/lon (B×2), price matrix (H×B, NaN = missing)."""
+    with open(month, encoding="utf-8") as f:
+        raw = pd.DataFrame(json.load(f))
+    resolver = BarraResolver.from_inventory()
+    raw["id"] = [m.id if m else None for m in resolver.resolve_many(raw["barra"])]
+    loc = {i: resolver.coords(i) for i in raw["id"].dropna().unique()}
+    raw = raw[raw["id"].map(loc).notna()]
+
+    hour = raw["fecha"].str.slice(0, 13).str.replace(" ", "T")   # 2025-03-01T00
+    mat = (raw.assign(hour=hour, cmg=raw["cmg"].astype(float))
+              .pivot_table(index="hour", columns="id", values="cmg", aggfunc="mean")
+              .sort_index())
+    latlon = np.array([loc[i] for i in mat.columns], dtype=np.float64)
+    first = raw["fecha"].groupby(hour).min().reindex(mat.index)
+    return list(mat.index), utc_hours(first), latlon, mat.to_numpy(np.float32)
+
+def to_xyz(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Unit-sphere coordinates: chord distance ≈ great-circle at our scales."""
+    la, lo = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(la) * np.cos(lo),
+                            np.cos(la) * np.sin(lo),
+                            np.sin(la)])
+
+def colour_lut() -> np.ndarray:
+    stops = np.array([s for s, _ in RAMP])
+    rgb = np.array([c for _, c in RAMP], dtype=np.float64)
+    x = np.linspace(0, RAMP_MAX, 256)
+    lut = np.empty((257, 4), dtype=np.uint8)
+    for ch in range(3):
+        lut[:256, ch] = np.interp(x, stops, rgb[:, ch]).round()
+    lut[:256, 3] = ALPHA
+    lut[256] = 0                                 # transparent (no data)
+    return lut
+
+# ───────────────────────── tiling ──────────────────────────
+def tiles_for(level: int, rect=CHILE) -> list[tuple[int, int, int]]:
+    """Geographic tiling scheme: 2·2^z × 2^z tiles, y counted from the north."""
+    size = 180.0 / 2 ** level
+    w, s, e, n = rect
+    x0, x1 = int((w + 180) // size), int((e + 180) // size)
+    y0, y1 = int((90 - n) // size), int((90 - s) // size)
+    return [(level, x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+def pixel_centres(z: int, x: int, y: int) -> tuple[np.ndarray, np.ndarray]:
+    size = 180.0 / 2 ** z
+    step = size / TILE
+    lon = -180 + x * size + (np.arange(TILE) + 0.5) * step
+    lat = 90 - y * size - (np.arange(TILE) + 0.5) * step
+    lat2, lon2 = np.meshgrid(lat, lon, indexing="ij")
+    return lat2.ravel(), lon2.ravel()
+
+# ─────────────────────── worker state ──────────────────────
+_S: dict = {}
+
+def _init(hours, latlon, prices, k, power, max_km, out):
+    tree = cKDTree(to_xyz(latlon[:, 0], latlon[:, 1]))
+    _S.update(hours=hours, tree=tree, prices=prices, k=min(k, len(latlon)),
+              power=power, max_chord=max_km / EARTH_KM, out=out, lut=colour_lut())
+
+def render_tile(tile: tuple[int, int, int]) -> int:
+    z, x, y = tile
+    lat, lon = pixel_centres(z, x, y)
+    dist, idx = _S["tree"].query(to_xyz(lat, lon), k=_S["k"])
+    dist, idx = dist.reshape(len(lat), -1), idx.reshape(len(lat), -1)
+
+    # IDW weights (pixels × k), shared by every hour
+    w = 1.0 / np.maximum(dist, 1e-9) ** _S["power"]
+    w = w.astype(np.float32)
+    far = dist[:, 0] > _S["max_chord"]
+
+    # hours in blocks: (H × pixels × k) gather, NaN-aware normalisation
+    prices, hours = _S["prices"], _S["hours"]
+    for h0 in range(0, len(hours), HOURS_PER_PASS):
+        p = prices[h0:h0 + HOURS_PER_PASS][:, idx]
+        valid = ~np.isnan(p)
+        num = np.einsum("hpk,pk->hp", np.where(valid, p, 0), w)
+        den = np.einsum("hpk,pk->hp", valid.astype(np.float32), w)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            val = num / den
+
+        code = np.clip(val / RAMP_MAX * 255, 0, 255)
+        code = np.where(np.isnan(val) | far, 256, code).astype(np.uint16)
+        rgba = _S["lut"][code].reshape(len(p), TILE, TILE, 4)
+
+        for h, hour in enumerate(hours[h0:h0 + HOURS_PER_PASS]):
+            d = _S["out"] / hour / str(z) / str(x)
+            d.mkdir(parents=True, exist_ok=True)
+            Image.fromarray(rgba[h], "RGBA").save(d / f"{y}.png", compress_level=6)
+    return len(_S["hours"])
+
+# ─────────────────────────── CLI ───────────────────────────
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Hourly CMg heatmap tile pyramid")
+    ap.add_argument("--month", required=True, help="costo_marginal_<YYYYMM>.tsv (JSON)")
+    ap.add_argument("--out", default=str(OUT))
+    ap.add_argument("--max-level", type=int, default=6, help="deepest zoom level")
+    ap.add_argument("--k", type=int, default=8, help="barras per IDW estimate")
+    ap.add_argument("--power", type=float, default=2.0, help="IDW exponent")
+    ap.add_argument("--max-km", type=float, default=150.0,
+                    help="leave pixels farther than this from any barra transparent")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    with stage("load_prices") as st:
+        hours, starts, latlon, prices = load_prices(pathlib.Path(args.month))
+        st.rows_out = prices.size
+    if not hours:
+        raise SystemExit(f"❌ no located prices in {args.month}")
+    print(f"ℹ️  {len(hours)} hours × {latlon.shape[0]} located barras")
+
+    out = pathlib.Path(args.out)
+    tiles = [t for z in range(args.max_level + 1) for t in tiles_for(z)]
+    init = (hours, latlon, prices, args.k, args.power, args.max_km, out)
+    with stage("render_tiles", rows_in=len(tiles), workers=args.workers) as st, \
+         ProcessPoolExecutor(args.workers, initializer=_init, initargs=init) as pool:
+        n = st.rows_out = sum(pool.map(render_tile, tiles, chunksize=1))
+
+    out.mkdir(parents=True, exist_ok=True)
+    (out / "index.json").write_text(json.dumps({
+        "hours": hours,
+        "starts": starts,
+        "rectangle": CHILE,
+        "minimumLevel": 0,
+        "maximumLevel": args.max_level,
+        "tileSize": TILE,
+        "priceRange": [RAMP[0][0], RAMP_MAX],
+    }))
+    print(f"✅ wrote {n} tiles ({len(tiles)} per hour) → {out}  "
+          f"in {time.perf_counter() - t0:.1f} s")
+
+if __name__ == "__main__":
+    main()
@@ -5,52 +5,64 @@ the React/Cesium viewer can load data offline.
 
 Inputs:
     data/raw/costo_marginal_<YYYYMM>.tsv   (JSON payload!)
-    data/processed/barra_lookup.csv        barra , lat , lon
+    data/curated/inventory.duckdb          canonical Barras + S/E coords
 Output:
-    public/prices_sample.json              [{barra, ts, price, lat, lon}, …]
+    public/prices_sample.json              [{barra, id, ts, price, lat, lon}, …]
+                                           ts = UTC start of the hour (enerviz.feeds.utc_hours)
+    data/processed/price_unmatched.csv     barras the resolver could not place
 """
-import json, pandas as pd, pathlib, unicodedata, sys
+import json, pandas as pd, pathlib, sys
+
+from enerviz.feeds import utc_hours
+from enerviz.instrument import stage
+from enerviz.names import BarraResolver
 
 MONTH = pathlib.Path("data/raw/costo_marginal_202503.tsv")   # adjust if file name differs
-LOOK  = pathlib.Path("data/processed/barra_lookup.csv")
 OUT   = pathlib.Path("public/prices_sample.json")
+MISS  = pathlib.Path("data/processed/price_unmatched.csv")
 
-def norm(txt: str) -> str:
-    txt = unicodedata.normalize("NFKD", txt).encode("ascii", "ignore").decode()
-    return txt.lower().strip()
-
-# --- load lookup table -------------------------------------------------------
-lookup = (pd.read_csv(LOOK)
-            .assign(barra_norm=lambda d: d["barra"].apply(norm))
-            .set_index("barra_norm"))
+# --- canonical barras --------------------------------------------------------
+with stage("load_resolver") as st:
+    resolver = BarraResolver.from_inventory()
+    st.rows_out = len(resolver.ids)
 
 # --- load monthly JSON -------------------------------------------------------
-with open(MONTH, "r", encoding="utf-8") as f:
+with stage("read_month") as st, open(MONTH, "r", encoding="utf-8") as f:
     raw = pd.DataFrame(json.load(f))
+    st.rows_out = len(raw)
 
 if raw.empty:
     sys.exit(f"[ERROR] {MONTH} is empty or path is wrong")
 
+# --- resolve every record of the month once ---------------------------------
+with stage("resolve_barras", rows_in=len(raw)) as st:
+    raw["id"] = [m.id if m else None for m in resolver.resolve_many(raw["barra"])]
+    loc = {i: resolver.coords(i) for i in raw["id"].dropna().unique()}
+    raw["loc"] = raw["id"].map(loc)
+    st.rows_out = int(raw["loc"].notna().sum())
+
+missing = raw.loc[raw["loc"].isna(), "barra"].drop_duplicates().sort_values()
+if len(missing):
+    MISS.parent.mkdir(parents=True, exist_ok=True)
+    missing.to_frame().to_csv(MISS, index=False)
+    print(f"⚠️  {len(missing)} barras without location → {MISS}")
+
 # --- pick the first calendar day present ------------------------------------
 first_day = raw["fecha"].iloc[0][:10]      # e.g. '2020-05-04'
-mask = raw["fecha"].str.startswith(first_day)
-
-sample = []
-for _, row in raw[mask].iterrows():
-    bnorm = norm(row["barra"])
-    if bnorm not in lookup.index:
-        continue                          # skip barras we can't locate
-    lat, lon = lookup.loc[bnorm, ["lat", "lon"]]
-    sample.append({
-        "barra": row["barra"],
-        "ts"   : f"{row['fecha']}-04:00", # Chile time-zone for display
-        "price": float(row["cmg"]),
-        "lat"  : float(lat),
-        "lon"  : float(lon)
-    })
+day = raw[raw["fecha"].str.startswith(first_day) & raw["loc"].notna()]
+
+sample = [{
+    "barra": b,
+    "id"   : i,
+    "ts"   : ts,                           # same axis as the heatmap and CMg alerts
+    "price": float(cmg),
+    "lat"  : lat,
+    "lon"  : lon,
+} for b, i, ts, cmg, (lat, lon) in zip(day["barra"], day["id"], utc_hours(day["fecha"]),
+                                       day["cmg"], day["loc"])]
 
 OUT.parent.mkdir(parents=True, exist_ok=True)
-with open(OUT, "w", encoding="utf-8") as f:
+with stage("write_sample", rows_in=len(sample)), open(OUT, "w", encoding="utf-8") as f:
     json.dump(sample, f, indent=0)
 
 print(f"✅ wrote {len(sample)} records ({first_day}) → {OUT}")
@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+"""
+Summarise the stage metrics written by enerviz.instrument.
+
+Set ENERVIZ_RUN_ID once for a whole pipeline run so every script's stages
+land under the same id, e.g.
+
+    export ENERVIZ_RUN_ID=nightly-$(date +%F)
+    python scripts/extract_generation_barras.py && … && python scripts/tessellate_lines.py
+    python scripts/pipeline_report.py            # latest run
+    python scripts/pipeline_report.py --run nightly-2025-05-06
+
+ΔRSS MB is what a stage left resident (RSS after − before); proc peak MB is
+the process-lifetime ru_maxrss when the stage ended, shared by every stage
+that ran before it in the same script.
+"""
+import argparse
+
+from enerviz.instrument import METRICS, report
+
+ap = argparse.ArgumentParser(description="Resumen de tiempos por etapa")
+ap.add_argument("--metrics", default=str(METRICS), help="archivo JSONL de métricas")
+ap.add_argument("--run", help="run id (por defecto, el último)")
+args = ap.parse_args()
+print(report(args.metrics, args.run))
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""
+Serve the pipeline artifacts (public/, data/processed/) over HTTP (enerviz.artifacts).
+
+    python scripts/serve_artifacts.py                        # 127.0.0.1:8008
+    python scripts/serve_artifacts.py --precompress          # write .gz/.br first
+    python scripts/serve_artifacts.py --root public --host 0.0.0.0 --cache-mb 512
+
+Precompressed siblings are picked by Accept-Encoding, single byte ranges
+are honoured, ETags are content hashes and hot files stay in a bounded
+in-memory LRU.  Point the viewer at it with
+ENERVIZ_ARTIFACTS=http://127.0.0.1:8008 npm run dev (viewer/vite.config.ts).
+"""
+import argparse, asyncio, sys, time
+
+from enerviz.artifacts import CACHE_BYTES, MAX_ITEM, PORT, ROOTS, ArtifactServer, precompress
+
+ap = argparse.ArgumentParser(description="Servidor HTTP de los artefactos del pipeline")
+ap.add_argument("--root", nargs="+", default=list(ROOTS), help="directorios servidos, en orden de búsqueda")
+ap.add_argument("--host", default="127.0.0.1")
+ap.add_argument("--port", type=int, default=PORT)
+ap.add_argument("--cache-mb", type=float, default=CACHE_BYTES / 2**20, help="tope de la caché LRU en memoria")
+ap.add_argument("--max-item-mb", type=float, default=MAX_ITEM / 2**20,
+                help="archivos mayores se leen del disco por trozos, sin caché")
+ap.add_argument("--precompress", action="store_true", help="escribir variantes .gz/.br antes de servir")
+ap.add_argument("--precompress-only", action="store_true", help="sólo escribir las variantes y salir")
+args = ap.parse_args()
+
+if args.precompress or args.precompress_only:
+    t0 = time.perf_counter()
+    written = precompress(args.root)
+    print(f"🗜  {len(written)} precompressed variants in {time.perf_counter() - t0:.1f} s")
+    if args.precompress_only:
+        sys.exit(0)
+
+server = ArtifactServer(args.root, cache_bytes=int(args.cache_mb * 2**20),
+                        max_item=int(args.max_item_mb * 2**20))
+if not any(r.is_dir() for r in server.roots):
+    sys.exit(f"❌ none of {args.root} exists")
+print(f"🌐 http://{args.host}:{args.port}/  ←  {', '.join(str(r) for r in server.roots if r.is_dir())}")
+try:
+    asyncio.run(server.serve(args.host, args.port))
+except KeyboardInterrupt:
+    c = server.cache
+    print(f"\n{server.requests} requests, cache {c.hits} hits / {c.misses} misses, "
+          f"{len(c)} files {c.bytes / 2**20:.1f} MB")
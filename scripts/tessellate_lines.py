@@ -2,12 +2,16 @@
 """
 Tessellate each line into ≤256 pieces (0.05° ≈ 5–6 km) **and keep all
 tooltip fields** so the viewer can colour by voltage and show rich info.
+Input lines are already oriented by annotate_lines.py; pieces keep that
+order, so dir/dirSrc carry over unchanged.
 
 File size ≈ 25 MB (unzipped) – acceptable, and arrow spacing identical to the
 version you liked.
 """
 import geopandas as gpd, shapely.ops as ops, shapely.geometry as geom, pathlib
 
+from enerviz.instrument import stage
+
 SRC = pathlib.Path("public/lines_barras.geojson")
 DST = pathlib.Path("public/lines_barras_tess.geojson")
 
@@ -15,9 +19,10 @@ MAX_PIECES = 256
 STEP_DEG   = 0.05        # split when >0.05°
 
 tooltip_fields = [
-    "startBarra", "endBarra", "volt",
+    "tramo", "startBarra", "endBarra", "volt",
     "owner", "circuit", "tipo",
-    "estado", "comuna", "length_km", "nombre"
+    "estado", "comuna", "length_km", "nombre",
+    "dir", "dirSrc",
 ]
 
 def split_line(line: geom.LineString):
@@ -27,17 +32,22 @@ def split_line(line: geom.LineString):
     return [ops.substring(line, i / n, (i + 1) / n, normalized=True) for i in range(n)]
 
 print("↻ reading", SRC)
-gdf_in = gpd.read_file(SRC)
-
-rows = []
-for _, row in gdf_in.iterrows():
-    for part in split_line(row.geometry):
-        rows.append({fld: row[fld] for fld in tooltip_fields} |
-                    {"geometry": part})
-
-gdf_out = gpd.GeoDataFrame(rows, crs="EPSG:4326")
-DST.parent.mkdir(parents=True, exist_ok=True)
-gdf_out.to_file(DST, driver="GeoJSON")
+with stage("read_geojson") as st:
+    gdf_in = gpd.read_file(SRC)
+    st.rows_out = len(gdf_in)
+
+with stage("split", rows_in=len(gdf_in)) as st:
+    rows = []
+    for _, row in gdf_in.iterrows():
+        for part in split_line(row.geometry):
+            rows.append({fld: row[fld] for fld in tooltip_fields} |
+                        {"geometry": part})
+    gdf_out = gpd.GeoDataFrame(rows, crs="EPSG:4326")
+    st.rows_out = len(gdf_out)
+
+with stage("write_geojson", rows_in=len(gdf_out)):
+    DST.parent.mkdir(parents=True, exist_ok=True)
+    gdf_out.to_file(DST, driver="GeoJSON")
 
 print(f"✅ tessellated → {DST}  segments: {len(gdf_out)}  "
       f"size: {DST.stat().st_size/1_048_576:.1f} MB")
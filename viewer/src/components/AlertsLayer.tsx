@@ -0,0 +1,112 @@
+import { useEffect, useState } from "react";
+import { useCesium } from "resium";
+import {
+  Cartesian3,
+  Color,
+  JulianDate,
+  Material,
+  PointPrimitiveCollection,
+  PolylineCollection,
+  type PointPrimitive,
+  type Polyline,
+} from "cesium";
+
+/* ------------------------------------------------------------------
+   CMg alerts from scripts/etl/13_detect_price_anomalies.py.
+
+   public/cmg_alerts.jsonl holds one alert per line: a spike is a point
+   on its barra, a decoupling a segment between the two neighbours.
+   Every alert is created once, grouped by its hour (ts, a UTC hour
+   start), and only that hour's group is shown, like the price orbs.
+------------------------------------------------------------------ */
+
+export interface CmgAlert {
+  ts:    string;                    // "2025-03-01T17:00:00Z" (start of the hour, UTC)
+  kind:  "spike" | "decoupling";
+  id:    string;
+  barra: string;
+  price: number;
+  mean:  number;
+  z:     number | null;
+  lat:   number | null;
+  lon:   number | null;
+  q?:           number;             // spike: rolling quantile it exceeded
+  other?:       string;             // decoupling: the neighbour barra
+  other_barra?: string;
+  other_price?: number;
+  spread?:      number;
+  lat2?:        number | null;
+  lon2?:        number | null;
+}
+
+export function useAlerts(): CmgAlert[] {
+  const [data, setData] = useState<CmgAlert[]>([]);
+  useEffect(() => {
+    fetch("/cmg_alerts.jsonl")
+      .then(r => (r.ok ? r.text() : ""))
+      .then(text => setData(text.split("\n").filter(Boolean).map(l => JSON.parse(l))))
+      .catch(console.error);
+  }, []);
+  return data;
+}
+
+/* the clock's hour in the alerts' ts format, "2025-03-01T17:00:00Z" */
+const hourKey = (t: JulianDate) =>
+  `${JulianDate.toDate(t).toISOString().slice(0, 13)}:00:00Z`;
+
+export default function AlertsLayer({ alerts }: { alerts: CmgAlert[] }) {
+  const { viewer } = useCesium();
+
+  useEffect(() => {
+    if (!viewer || !alerts.length) return;
+    const scene = viewer.scene;
+    const clock = viewer.clock;
+
+    const points = scene.primitives.add(new PointPrimitiveCollection()) as PointPrimitiveCollection;
+    const lines  = scene.primitives.add(new PolylineCollection()) as PolylineCollection;
+    const byHour = new Map<string, (PointPrimitive | Polyline)[]>();
+    const add = (ts: string, prim: PointPrimitive | Polyline) => {
+      const group = byHour.get(ts);
+      if (group) group.push(prim); else byHour.set(ts, [prim]);
+    };
+
+    for (const a of alerts) {
+      if (a.lat == null || a.lon == null) continue;
+      const at = Cartesian3.fromDegrees(a.lon, a.lat);
+      if (a.kind === "spike") {
+        add(a.ts, points.add({
+          position: at, pixelSize: 14, color: Color.RED,
+          outlineColor: Color.WHITE, outlineWidth: 2, show: false,
+        }));
+      } else if (a.lat2 != null && a.lon2 != null) {
+        add(a.ts, lines.add({
+          positions: [at, Cartesian3.fromDegrees(a.lon2, a.lat2)], width: 4, show: false,
+          material: Material.fromType("Color", { color: Color.MAGENTA }),
+        }));
+      }
+    }
+
+    /* show the alerts of the clock's hour – only touch the groups of the
+       hour left and the hour entered */
+    let current: string | undefined;
+    const update = () => {
+      const key = hourKey(clock.currentTime);
+      if (key === current) return;
+      for (const prim of byHour.get(current ?? "") ?? []) prim.show = false;
+      for (const prim of byHour.get(key) ?? []) prim.show = true;
+      current = key;
+    };
+    update();
+    const removeTick = clock.onTick.addEventListener(update);
+
+    return () => {
+      removeTick();
+      if (!viewer.isDestroyed()) {
+        scene.primitives.remove(points);
+        scene.primitives.remove(lines);
+      }
+    };
+  }, [viewer, alerts]);
+
+  return null;
+}
@@ -0,0 +1,87 @@
+import { useEffect, useMemo, useState } from "react";
+import { ImageryLayer, useCesium } from "resium";
+import {
+  GeographicTilingScheme,
+  JulianDate,
+  Rectangle,
+  UrlTemplateImageryProvider,
+} from "cesium";
+
+/* public/heatmap/index.json – written by scripts/make_price_heatmap.py */
+interface HeatmapIndex {
+  hours:        string[];                          // "2025-03-01T00", … (tile folders)
+  starts?:      string[];                          // UTC start of each hour (orbs' ts axis)
+  rectangle:    [number, number, number, number];  // W, S, E, N (deg)
+  minimumLevel: number;
+  maximumLevel: number;
+  tileSize:     number;
+}
+
+const HOUR = 3600;
+
+/* index of the hour holding t (starts sorted), -1 outside the pyramid */
+function hourAt(starts: JulianDate[], t: JulianDate): number {
+  let lo = 0, hi = starts.length - 1, at = -1;
+  while (lo <= hi) {
+    const mid = (lo + hi) >> 1;
+    if (JulianDate.lessThanOrEquals(starts[mid], t)) { at = mid; lo = mid + 1; }
+    else hi = mid - 1;
+  }
+  return at >= 0 && JulianDate.secondsDifference(t, starts[at]) < HOUR ? at : -1;
+}
+
+/* Pre-rendered CMg surface for the clock's hour (or a fixed `hour`),
+   draped as an imagery layer */
+export default function HeatmapLayer({ hour }: { hour?: string }) {
+  const { viewer } = useCesium();
+  const [index, setIndex] = useState<HeatmapIndex>();
+  const [clockHour, setClockHour] = useState<string>();
+
+  useEffect(() => {
+    fetch("/heatmap/index.json")
+      .then(r => r.json())
+      .then(setIndex)
+      .catch(console.error);
+  }, []);
+
+  /* follow viewer.clock – state only changes when the hour does */
+  useEffect(() => {
+    if (!viewer || !index || hour) return;
+    if (!index.starts) {
+      console.warn("heatmap/index.json has no starts – re-run make_price_heatmap.py");
+      return;
+    }
+    const clock = viewer.clock;
+    const starts = index.starts.map(s => JulianDate.fromIso8601(s));
+
+    let last: JulianDate | undefined;
+    const update = () => {
+      const now = clock.currentTime;
+      if (last && JulianDate.equals(now, last)) return;
+      last = JulianDate.clone(now, last);
+      const i = hourAt(starts, now);
+      setClockHour(i >= 0 ? index.hours[i] : undefined);
+    };
+    update();
+    const removeTick = clock.onTick.addEventListener(update);
+    return () => removeTick();
+  }, [viewer, index, hour]);
+
+  const shown = hour ?? clockHour;
+
+  const provider = useMemo(() => {
+    if (!index || !shown) return undefined;
+    return new UrlTemplateImageryProvider({
+      url:          `/heatmap/${shown}/{z}/{x}/{y}.png`,
+      tilingScheme: new GeographicTilingScheme(),
+      rectangle:    Rectangle.fromDegrees(...index.rectangle),
+      minimumLevel: index.minimumLevel,
+      maximumLevel: index.maximumLevel,
+      tileWidth:    index.tileSize,
+      tileHeight:   index.tileSize,
+    });
+  }, [index, shown]);
+
+  if (!provider) return null;
+  return <ImageryLayer imageryProvider={provider} alpha={0.8} />;
+}
@@ -1,59 +1,131 @@
-import { useEffect, useState } from "react";
-import { GeoJsonDataSource } from "resium";
+import { useEffect } from "react";
+import { useCesium } from "resium";
 import {
+  Cartesian2,
+  Cartesian3,
   Color,
-  PolylineArrowMaterialProperty,   // ← viene de **cesium**, no de resium
+  Entity,
+  GeometryInstance,
+  GroundPolylineGeometry,
+  GroundPolylinePrimitive,
+  Material,
+  PolylineMaterialAppearance,
+  PrimitiveCollection,
+  ScreenSpaceEventHandler,
+  ScreenSpaceEventType,
+  defined,
 } from "cesium";
 
-/* Paleta por tensión (kV) */
-const kvColor = (kv: number): Color =>
-  kv >= 500 ? Color.RED.withAlpha(0.9)
-  : kv >= 220 ? Color.ORANGE.withAlpha(0.9)
-  : kv >= 154 ? Color.YELLOW.withAlpha(0.9)
-  : kv >= 110 ? Color.CYAN.withAlpha(0.9)
-  : Color.GRAY.withAlpha(0.6);
+import {
+  NO_VOLT, tooltip,
+  type DecodedLines, type DecoderReply, type LinePick,
+} from "../utils/lineTable";
+
+/* ------------------------------------------------------------------
+   Transmission lines as batched GroundPolylinePrimitives.
+
+   utils/lineTable + workers/linesDecoder.worker decode the GeoJSON off
+   the main thread into transferable typed arrays.  Here we only build
+   one primitive per voltage class (= one arrow material).  Segments are
+   not Entities: the GeometryInstance id carries the segment index, and
+   the tooltip is rendered from the per-line attribute table only when
+   a segment is picked.
+
+   Arrow direction is decided by scripts/annotate_lines.py (DC power flow
+   from etl/08_dc_power_flow.py where available): geometries arrive
+   oriented in the flow direction, so vertices are used as-is.
+------------------------------------------------------------------ */
+
+/* colour per voltage class (see VOLT_MIN in utils/lineTable) */
+const CLASS_COLORS = [
+  Color.RED.withAlpha(0.9),      // ≥ 400 kV
+  Color.CYAN.withAlpha(0.9),     // ≥ 200 kV
+  Color.LIME.withAlpha(0.9),     // ≥ 100 kV
+  Color.YELLOW.withAlpha(0.9),
+  Color.GRAY.withAlpha(0.6),     // NO_VOLT
+];
+const WIDTH = 8;
+
+function vertices(buf: DecodedLines, a: number, b: number): Cartesian3[] {
+  const out: Cartesian3[] = [];
+  for (let k = a; k < b; k++)
+    out.push(new Cartesian3(
+      buf.positions[k * 3], buf.positions[k * 3 + 1], buf.positions[k * 3 + 2]));
+  return out;
+}
 
-export default function LinesLayer() {
-  const [source, setSource] = useState<GeoJsonDataSource>();
+function buildPrimitives(buf: DecodedLines): PrimitiveCollection {
+  const byClass: GeometryInstance[][] = Array.from(
+    { length: NO_VOLT + 1 }, () => []);
+
+  for (let i = 0; i < buf.cls.length; i++) {
+    const a = buf.offsets[i], b = buf.offsets[i + 1];
+    if (b - a < 2) continue;
+    byClass[buf.cls[i]].push(new GeometryInstance({
+      geometry: new GroundPolylineGeometry({
+        positions: vertices(buf, a, b),
+        width: WIDTH,
+      }),
+      id: { layer: "lines", seg: i } satisfies LinePick,
+    }));
+  }
+
+  const collection = new PrimitiveCollection();
+  byClass.forEach((instances, c) => {
+    if (!instances.length) return;
+    collection.add(new GroundPolylinePrimitive({
+      geometryInstances: instances,
+      appearance: new PolylineMaterialAppearance({
+        material: Material.fromType(Material.PolylineArrowType,
+                                    { color: CLASS_COLORS[c] }),
+      }),
+    }));
+  });
+  return collection;
+}
+
+export default function LinesLayer(
+  { url = "/lines_barras_tess.geojson" }: { url?: string },
+) {
+  const { viewer } = useCesium();
 
   useEffect(() => {
-    const ds = new GeoJsonDataSource("lines");
-    ds.load("/lines_barras_tess.geojson", {
-      clampToGround: true,
-      stroke: Color.WHITE,
-      strokeWidth: 2,
-    })
-      .then(() => {
-        ds.entities.values.forEach(ent => {
-          if (!ent.polyline) return;
-          const kv = ent.properties?.volt?.getValue() as number | undefined;
-          ent.polyline.material = new PolylineArrowMaterialProperty(kvColor(kv ?? 0));
-          ent.polyline.width = 10;
-
-          /* Tooltip enriquecido */
-          const p = ent.properties;
-          const fmt = (x: any) => x ?? "—";
-          ent.description = `
-<strong>${fmt(p.nombre?.getValue())}</strong><br/>
-<b>Voltaje:</b> ${fmt(kv)} kV<br/>
-<b>Circuito:</b> ${fmt(p.circuit?.getValue())}<br/>
-<b>Longitud:</b> ${Number(p.length_km?.getValue() || 0).toFixed(2)} km<br/>
-<b>Tipo:</b> ${fmt(p.tipo?.getValue())}<br/>
-<b>Empresa:</b> ${fmt(p.owner?.getValue())}<br/>
-<b>Estado:</b> ${fmt(p.estado?.getValue())}<br/>
-<b>Comuna:</b> ${fmt(p.comuna?.getValue())}
-`;
+    if (!viewer) return;
+    const handler = new ScreenSpaceEventHandler(viewer.scene.canvas);
+    const worker  = new Worker(
+      new URL("../workers/linesDecoder.worker.ts", import.meta.url),
+      { type: "module" },
+    );
+    let collection: PrimitiveCollection | undefined;
+
+    worker.onmessage = (e: MessageEvent<DecoderReply>) => {
+      worker.terminate();
+      if (!e.data.ok) return console.error(e.data.error);
+      if (viewer.isDestroyed()) return;
+      const buf = e.data.data;
+      collection = viewer.scene.primitives.add(buildPrimitives(buf));
+
+      /* lazy tooltip: render the description only for the picked segment */
+      handler.setInputAction((ev: { position: Cartesian2 }) => {
+        const picked = viewer.scene.pick(ev.position);
+        const id = defined(picked) ? (picked.id as LinePick | undefined) : undefined;
+        if (id?.layer !== "lines") return;
+        const p = buf.attrs[buf.line[id.seg]];
+        viewer.selectedEntity = new Entity({
+          name: p.nombre ?? "Línea",
+          description: tooltip(p),
         });
-        setSource(ds);
-      })
-      .catch(console.error);
+      }, ScreenSpaceEventType.LEFT_CLICK);
+    };
+    worker.postMessage({ url: new URL(url, location.href).href });
 
     return () => {
-      if (source) source.entities.removeAll();
+      worker.terminate();
+      handler.destroy();
+      if (collection && !viewer.isDestroyed())
+        viewer.scene.primitives.remove(collection);
     };
-    // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, []);
+  }, [viewer, url]);
 
-  if (!source) return null;
-  return <primitive object={source} />;
+  return null;
 }
@@ -0,0 +1,126 @@
+import { useEffect } from "react";
+import { useCesium } from "resium";
+import {
+  Billboard,
+  BillboardCollection,
+  Cartesian2,
+  Cartesian3,
+  ClockRange,
+  Entity,
+  HeightReference,
+  JulianDate,
+  SampledProperty,
+  ScreenSpaceEventHandler,
+  ScreenSpaceEventType,
+  defined,
+} from "cesium";
+
+import type { PriceRec } from "../hooks/usePrices";
+import { colorForPrice } from "../utils/colorRamp";
+
+/* ------------------------------------------------------------------
+   Price orbs: one billboard per barra in a single BillboardCollection.
+
+   Each barra's CMg is a SampledProperty over the price timestamps; on
+   every clock tick the billboard colour is re-evaluated at the clock
+   time, so scrubbing the timeline never creates or destroys objects.
+------------------------------------------------------------------ */
+
+/* picking id of every orb */
+export interface PricePick { layer: "prices"; barra: string }
+
+interface Orb {
+  barra:     string;
+  price:     SampledProperty;
+  billboard: Billboard;
+}
+
+/* "2025-03-01T03:00:00Z" (enerviz.feeds.utc_hours) → JulianDate */
+const toJulian = (ts: string) => JulianDate.fromIso8601(ts.replace(" ", "T"));
+
+export default function PriceOrbs({ prices }: { prices: PriceRec[] }) {
+  const { viewer } = useCesium();
+
+  useEffect(() => {
+    if (!viewer || !prices.length) return;
+    const scene = viewer.scene;
+    const clock = viewer.clock;
+
+    /* 1) one sampled price series + billboard per barra */
+    const collection = scene.primitives.add(
+      new BillboardCollection({ scene })) as BillboardCollection;
+    const orbs = new Map<string, Orb>();
+    let start: JulianDate | undefined, stop: JulianDate | undefined;
+
+    for (const rec of prices) {
+      const key = rec.id ?? rec.barra;
+      let orb = orbs.get(key);
+      if (!orb) {
+        orb = {
+          barra: rec.barra,
+          price: new SampledProperty(Number),
+          billboard: collection.add({
+            position: Cartesian3.fromDegrees(rec.lon, rec.lat),
+            image: "/orb.svg",
+            scale: 0.4,
+            heightReference: HeightReference.CLAMP_TO_GROUND,
+            id: { layer: "prices", barra: key } satisfies PricePick,
+          }),
+        };
+        orbs.set(key, orb);
+      }
+      const t = toJulian(rec.ts);
+      orb.price.addSample(t, rec.price);
+      if (!start || JulianDate.lessThan(t, start)) start = t;
+      if (!stop  || JulianDate.greaterThan(t, stop)) stop = t;
+    }
+
+    /* 2) bind the clock / timeline to the price window (1 h per second) */
+    if (start && stop) {
+      clock.startTime   = start.clone();
+      clock.stopTime    = stop.clone();
+      clock.currentTime = start.clone();
+      clock.clockRange  = ClockRange.LOOP_STOP;
+      clock.multiplier  = 3600;
+      viewer.timeline?.zoomTo(start, stop);
+    }
+
+    /* 3) recolour on tick – only when the clock actually moved */
+    let last: JulianDate | undefined;
+    const recolour = () => {
+      const now = clock.currentTime;
+      if (last && JulianDate.equals(now, last)) return;
+      last = JulianDate.clone(now, last);
+      orbs.forEach(orb => {
+        const p = orb.price.getValue(now) as number | undefined;
+        orb.billboard.show  = p !== undefined;
+        if (p !== undefined) orb.billboard.color = colorForPrice(p);
+      });
+    };
+    recolour();
+    const removeTick = clock.onTick.addEventListener(recolour);
+
+    /* 4) tooltip for the picked orb at the current time */
+    const handler = new ScreenSpaceEventHandler(scene.canvas);
+    handler.setInputAction((e: { position: Cartesian2 }) => {
+      const picked = scene.pick(e.position);
+      const id = defined(picked) ? (picked.id as PricePick | undefined) : undefined;
+      if (id?.layer !== "prices") return;
+      const orb = orbs.get(id.barra)!;
+      const p = orb.price.getValue(clock.currentTime) as number | undefined;
+      viewer.selectedEntity = new Entity({
+        name: orb.barra,
+        description: `<b>${orb.barra}</b><br/>${JulianDate.toIso8601(clock.currentTime, 0)}` +
+                     `<br/><b>$${p?.toFixed(1) ?? "—"}</b> USD/MWh`,
+      });
+    }, ScreenSpaceEventType.LEFT_CLICK);
+
+    return () => {
+      removeTick();
+      handler.destroy();
+      if (!viewer.isDestroyed()) scene.primitives.remove(collection);
+    };
+  }, [viewer, prices]);
+
+  return null;
+}
@@ -6,45 +6,54 @@ import { useEffect, useState } from "react";
 /* ---------- price record type ---------- */
 export interface PriceRec {
   barra: string;
+  id?:   string;   // canonical inventory barra id
   ts:    string;
   price: number;
   lat:   number;
   lon:   number;
 }
 
-/* ---------- fetch the sample JSON ---------- */
+/* ---------- fetch the sample JSON ----------
+   make_price_sample.py resolves ids already; older samples only carry
+   the name, so those get one from the compiled lookup when it knows
+   the spelling; unknown names keep id undefined (PriceOrbs keys them
+   by name).                                                           */
 export function usePrices(): PriceRec[] {
   const [data, setData] = useState<PriceRec[]>([]);
   useEffect(() => {
     fetch("/prices_sample.json")
       .then(r => r.json())
-      .then(setData)
+      .then((recs: PriceRec[]) =>
+        setData(recs.map(r => (r.id ? r : { ...r, id: barraId(r.barra) }))))
       .catch(console.error);
   }, []);
   return data;
 }
 
-/* ---------- barra alias table ------------ */
-import aliasCsv from "../data/barra_alias.csv?raw";
+/* ---------- compiled barra lookup ------------
+   Generated by scripts/build_barra_lookup.py: every spelling the pipeline
+   has seen, already resolved to a canonical inventory barra id.  Globbed
+   rather than imported so the viewer still builds before it exists.     */
+const compiled = Object.values(
+  import.meta.glob<{ lookup: Record<string, string> }>(
+    "../data/barra_lookup.json", { eager: true, import: "default" }),
+)[0];
 
-const aliasMap = new Map<string, string>();
-aliasCsv.trim().split("\n").slice(1).forEach(l => {
-  const [alias, barra] = l.split(",");
-  aliasMap.set(alias.trim().toLowerCase(), barra.trim().toLowerCase());
-});
+const lookup = new Map<string, string>(Object.entries(compiled?.lookup ?? {}));
 
-/* ---------- helpers to clean / normalise names ---------- */
-function removeAccents(s: string) {
-  return s.normalize("NFD").replace(/\p{Diacritic}/gu, "");
-}
-function clean(txt: string) {
-  return removeAccents(txt)
+/* ---------- helpers to clean / normalise names ----------
+   Must stay in sync with clean() in scripts/enerviz/names.py            */
+export function clean(txt: string): string {
+  return txt
+    .normalize("NFKD")
+    .replace(/[^\x00-\x7f]/g, "")      // ASCII-fold
     .toLowerCase()
-    .replace(/\b\d+\s*k?v\b/g, "")   // strip “220kv”, “154 kV”, …
-    .replace(/\s+/g, " ")
-    .trim();
+    .replace(/\b\d+\s*k?v\b/g, " ")   // strip “220kv”, “154 kV”, …
+    .replace(/[^a-z0-9]+/g, " ")
+    .trim()
+    .replace(/\s+/g, " ");
 }
-export function normalise(name: string): string {
-  const k = clean(name);
-  return aliasMap.get(k) ?? k;
+/** Canonical inventory barra id of a spelling, undefined if not compiled. */
+export function barraId(name: string): string | undefined {
+  return lookup.get(clean(name));
 }
@@ -0,0 +1,99 @@
+/* ------------------------------------------------------------------
+   Reader for public/sen_graph.bin (scripts/enerviz/graphpack.py).
+
+   The file is a header, a section table and 8-byte aligned sections;
+   every section becomes a typed-array view over the fetched buffer, so
+   loading is a table walk with no parsing or copying.  Strings stay
+   UTF-8 and are decoded one at a time, only when asked for.
+------------------------------------------------------------------ */
+
+const MAGIC   = "ENVZGRF\0";
+const VERSION = 1;
+const HEADER  = 24;
+const SECTION = 32;
+
+type View = Uint8Array | Uint32Array | Int32Array | Float32Array;
+const VIEWS: Record<number, (b: ArrayBuffer, off: number, n: number) => View> = {
+  1: (b, o, n) => new Uint8Array(b, o, n),
+  2: (b, o, n) => new Uint32Array(b, o, n),
+  3: (b, o, n) => new Int32Array(b, o, n),
+  4: (b, o, n) => new Float32Array(b, o, n),
+};
+
+export interface GraphPackage {
+  nNodes:       number;
+  nEdges:       number;
+  indptr:       Uint32Array;   // N+1 CSR row pointers
+  indices:      Uint32Array;   // 2E neighbour barra per slot
+  adjEdge:      Uint32Array;   // 2E tramo per slot
+  edgeU:        Uint32Array;   // E
+  edgeV:        Uint32Array;   // E
+  tensionKv:    Float32Array;  // E, NaN = unknown
+  lengthKm:     Float32Array;  // E
+  bridge:       Uint8Array;    // E, 1 = bridge
+  articulation: Uint8Array;    // N, 1 = articulation point
+  nodeLonLat:   Float32Array;  // 2N
+  nodeId:   (i: number) => string;
+  nodeName: (i: number) => string;
+  tramoId:  (e: number) => string;
+}
+
+export function readGraphPackage(buf: ArrayBuffer): GraphPackage {
+  const dv = new DataView(buf);
+  const magic = String.fromCharCode(...new Uint8Array(buf, 0, 8));
+  if (magic !== MAGIC || dv.getUint32(8, true) !== VERSION)
+    throw new Error(`sen_graph.bin: not a v${VERSION} graph package`);
+
+  const sec = new Map<string, View>();
+  const nSec = dv.getUint32(20, true);
+  for (let i = 0; i < nSec; i++) {
+    const at = HEADER + i * SECTION;
+    const name = String.fromCharCode(...new Uint8Array(buf, at, 16)).replace(/\0+$/, "");
+    const make = VIEWS[dv.getUint32(at + 16, true)];
+    sec.set(name, make(buf, dv.getUint32(at + 20, true), dv.getUint32(at + 24, true)));
+  }
+  const get = <T extends View>(name: string) => {
+    const v = sec.get(name);
+    if (!v) throw new Error(`sen_graph.bin: missing section ${name}`);
+    return v as T;
+  };
+
+  const utf8 = new TextDecoder();
+  const table = (t: string) => {
+    const off = get<Uint32Array>(`${t}.off`), str = get<Uint8Array>(`${t}.str`);
+    return (i: number) => utf8.decode(str.subarray(off[i], off[i + 1]));
+  };
+
+  return {
+    nNodes:       dv.getUint32(12, true),
+    nEdges:       dv.getUint32(16, true),
+    indptr:       get("indptr"),
+    indices:      get("indices"),
+    adjEdge:      get("adj_edge"),
+    edgeU:        get("edge_u"),
+    edgeV:        get("edge_v"),
+    tensionKv:    get("tension_kv"),
+    lengthKm:     get("length_km"),
+    bridge:       get("bridge"),
+    articulation: get("articulation"),
+    nodeLonLat:   get("node_lonlat"),
+    nodeId:       table("node_id"),
+    nodeName:     table("node_name"),
+    tramoId:      table("tramo_id"),
+  };
+}
+
+/* ---------------- n1.worker.ts protocol ---------------- */
+export type N1Request =
+  | { type: "load"; url: string }
+  | { type: "outage"; edges: number[] }   // tramos out of service
+  | { type: "n1" };                       // every single-tramo outage
+
+export type N1Reply =
+  | { ok: false; error: string }
+  | { ok: true; type: "load"; nNodes: number; nEdges: number; bridges: number }
+  /* component label per barra, sizes per label, barras off the main one */
+  | { ok: true; type: "outage"; label: Uint32Array; sizes: Uint32Array;
+      islanded: Uint32Array; ms: number }
+  /* per tramo: barras on the smaller side of its single outage (0 = none) */
+  | { ok: true; type: "n1"; cut: Uint32Array; ms: number };
@@ -0,0 +1,65 @@
+/* ------------------------------------------------------------------
+   Decoded transmission-line layer, shared by the decoder worker and
+   LinesLayer.  Geometry travels as transferable typed arrays; the
+   attributes live once per line (not per tessellated segment) and
+   tooltips are rendered from them only when a segment is picked.
+------------------------------------------------------------------ */
+
+/* voltage classes (kV ≥ min); NO_VOLT when volt is missing */
+export const VOLT_MIN = [400, 200, 100, 0];
+export const NO_VOLT  = VOLT_MIN.length;
+
+export const voltClass = (v?: number | null) =>
+  v === undefined || v === null ? NO_VOLT : VOLT_MIN.findIndex(m => v >= m);
+
+/* per-line attributes, as written by annotate_lines.py */
+export interface LineAttrs {
+  tramo?:      string;     // ID_LIN_TRA, key into public/line_flows.json
+  startBarra?: string;
+  endBarra?:   string;
+  volt?:       number;
+  owner?:      string;
+  circuit?:    string;
+  tipo?:       string;
+  estado?:     string;
+  comuna?:     string;
+  length_km?:  number;
+  nombre?:     string;
+  dir?:        1 | -1;     // -1 = reversed from IDE order by the ETL
+  dirSrc?:     string;     // "flujo_dc" | "dedicado" | "generacion" | "orden_ide"
+}
+
+export const ATTR_FIELDS: (keyof LineAttrs)[] = [
+  "tramo", "startBarra", "endBarra", "volt", "owner", "circuit", "tipo",
+  "estado", "comuna", "length_km", "nombre", "dir", "dirSrc",
+];
+
+/* worker → main thread; segment i spans vertices offsets[i] … offsets[i+1] */
+export interface DecodedLines {
+  positions: Float64Array;   // x,y,z per vertex (ECEF metres, WGS84)
+  offsets:   Uint32Array;
+  cls:       Uint8Array;     // voltage class per segment
+  line:      Uint32Array;    // segment → row of `attrs`
+  attrs:     LineAttrs[];    // one row per original line
+}
+
+export type DecoderReply =
+  | { ok: true;  data: DecodedLines }
+  | { ok: false; error: string };
+
+/* picking id of every segment instance */
+export interface LinePick { layer: "lines"; seg: number }
+
+export function tooltip(p: LineAttrs): string {
+  const fmt = (x: unknown) => x ?? "—";
+  return `
+<strong>${fmt(p.nombre)}</strong><br/>
+<b>Voltaje:</b> ${fmt(p.volt)} kV<br/>
+<b>Circuito:</b> ${fmt(p.circuit)}<br/>
+<b>Longitud:</b> ${Number(p.length_km ?? 0).toFixed(2)} km<br/>
+<b>Tipo:</b> ${fmt(p.tipo)}<br/>
+<b>Empresa:</b> ${fmt(p.owner)}<br/>
+<b>Estado:</b> ${fmt(p.estado)}<br/>
+<b>Comuna:</b> ${fmt(p.comuna)}
+`;
+}
@@ -0,0 +1,86 @@
+/* ------------------------------------------------------------------
+   Off-main-thread decoding of lines_barras_tess.geojson.
+
+   Fetches and parses the GeoJSON, converts every vertex to ECEF and
+   packs geometry into typed arrays that are transferred (not copied)
+   back.  Tessellated pieces of one line share a single attribute row.
+------------------------------------------------------------------ */
+import {
+  ATTR_FIELDS, voltClass,
+  type DecodedLines, type DecoderReply, type LineAttrs,
+} from "../utils/lineTable";
+
+type Position = number[];
+interface LineFeature {
+  geometry:
+    | { type: "LineString"; coordinates: Position[] }
+    | { type: "MultiLineString"; coordinates: Position[][] };
+  properties: LineAttrs | null;
+}
+
+/* WGS84, height 0 – same result as Cartesian3.fromDegrees(lon, lat) */
+const A  = 6378137.0;
+const E2 = 6.69437999014e-3;
+const RAD = Math.PI / 180;
+
+function decode(features: LineFeature[]): DecodedLines {
+  const parts: { coords: Position[]; row: number }[] = [];
+  const attrs: LineAttrs[] = [];
+  const rowOf = new Map<string, number>();
+
+  for (const f of features) {
+    const p = f.properties ?? {};
+    const key = ATTR_FIELDS.map(k => p[k] ?? "").join("\u0001");
+    let row = rowOf.get(key);
+    if (row === undefined) {
+      row = attrs.push(p) - 1;
+      rowOf.set(key, row);
+    }
+    const g = f.geometry;
+    if (g.type === "LineString") parts.push({ coords: g.coordinates, row });
+    else if (g.type === "MultiLineString")
+      g.coordinates.forEach(coords => parts.push({ coords, row }));
+  }
+
+  let nVert = 0;
+  parts.forEach(p => (nVert += p.coords.length));
+
+  const positions = new Float64Array(nVert * 3);
+  const offsets   = new Uint32Array(parts.length + 1);
+  const cls       = new Uint8Array(parts.length);
+  const line      = new Uint32Array(parts.length);
+  let v = 0;
+  parts.forEach(({ coords, row }, i) => {
+    offsets[i] = v;
+    line[i] = row;
+    cls[i] = voltClass(attrs[row].volt);
+    for (const [lon, lat] of coords) {
+      const phi = lat * RAD, lam = lon * RAD;
+      const sinPhi = Math.sin(phi), cosPhi = Math.cos(phi);
+      const n = A / Math.sqrt(1 - E2 * sinPhi * sinPhi);
+      positions[v * 3]     = n * cosPhi * Math.cos(lam);
+      positions[v * 3 + 1] = n * cosPhi * Math.sin(lam);
+      positions[v * 3 + 2] = n * (1 - E2) * sinPhi;
+      v++;
+    }
+  });
+  offsets[parts.length] = v;
+  return { positions, offsets, cls, line, attrs };
+}
+
+self.addEventListener("message", (e: MessageEvent<{ url: string }>) => {
+  fetch(e.data.url)
+    .then(r => r.json())
+    .then((fc: { features: LineFeature[] }) => {
+      const data = decode(fc.features);
+      const reply: DecoderReply = { ok: true, data };
+      self.postMessage(reply, {
+        transfer: [data.positions.buffer, data.offsets.buffer,
+                   data.cls.buffer, data.line.buffer],
+      });
+    })
+    .catch(err => {
+      const reply: DecoderReply = { ok: false, error: String(err) };
+      self.postMessage(reply);
+    });
+});
@@ -0,0 +1,116 @@
+/* ------------------------------------------------------------------
+   In-browser N-1 topology analysis on sen_graph.bin.
+
+   The package is wrapped in typed arrays (no parsing).  An outage set
+   is evaluated with union-find over the edge list; the full N-1 sweep
+   only walks the precomputed bridges – any other single outage leaves
+   the grid connected – with one BFS per bridge over the CSR arrays.
+------------------------------------------------------------------ */
+import {
+  readGraphPackage,
+  type GraphPackage, type N1Reply, type N1Request,
+} from "../utils/graphPackage";
+
+let g: GraphPackage | null = null;
+
+function find(parent: Uint32Array, x: number): number {
+  while (parent[x] !== x) {
+    parent[x] = parent[parent[x]];
+    x = parent[x];
+  }
+  return x;
+}
+
+function outage(g: GraphPackage, edges: number[]) {
+  const out = new Uint8Array(g.nEdges);
+  edges.forEach(e => (out[e] = 1));
+  const parent = new Uint32Array(g.nNodes);
+  for (let i = 0; i < g.nNodes; i++) parent[i] = i;
+  for (let e = 0; e < g.nEdges; e++) {
+    if (out[e]) continue;
+    const a = find(parent, g.edgeU[e]), b = find(parent, g.edgeV[e]);
+    if (a !== b) parent[a] = b;
+  }
+
+  const label = new Uint32Array(g.nNodes);
+  const rootLabel = new Int32Array(g.nNodes).fill(-1);
+  const sizes: number[] = [];
+  for (let i = 0; i < g.nNodes; i++) {
+    const r = find(parent, i);
+    if (rootLabel[r] < 0) rootLabel[r] = sizes.push(0) - 1;
+    label[i] = rootLabel[r];
+    sizes[label[i]]++;
+  }
+  let main = 0;
+  sizes.forEach((s, k) => { if (s > sizes[main]) main = k; });
+  const islanded: number[] = [];
+  label.forEach((l, i) => { if (l !== main) islanded.push(i); });
+  return { label, sizes: Uint32Array.from(sizes), islanded: Uint32Array.from(islanded) };
+}
+
+/* barras on the smaller side of bridge e; each BFS stops once it is
+   known not to be the smaller one */
+function bridgeCut(g: GraphPackage, e: number, seen: Uint32Array, stamp: number,
+                   queue: Uint32Array): number {
+  const side = (start: number, limit: number) => {
+    let head = 0, tail = 0;
+    queue[tail++] = start;
+    seen[start] = stamp;
+    while (head < tail && tail <= limit) {
+      const x = queue[head++];
+      for (let k = g.indptr[x]; k < g.indptr[x + 1]; k++) {
+        const y = g.indices[k];
+        if (g.adjEdge[k] === e || seen[y] === stamp) continue;
+        seen[y] = stamp;
+        queue[tail++] = y;
+      }
+    }
+    return tail;
+  };
+  const half = g.nNodes >> 1;
+  const a = side(g.edgeU[e], half);
+  if (a > half) return side(g.edgeV[e], g.nNodes);
+  return Math.min(a, side(g.edgeV[e], a));
+}
+
+function n1(g: GraphPackage): Uint32Array {
+  const cut = new Uint32Array(g.nEdges);
+  const seen = new Uint32Array(g.nNodes);
+  const queue = new Uint32Array(g.nNodes);
+  let stamp = 0;
+  for (let e = 0; e < g.nEdges; e++) {
+    if (g.bridge[e]) cut[e] = bridgeCut(g, e, seen, ++stamp, queue);
+  }
+  return cut;
+}
+
+const reply = (r: N1Reply, transfer: Transferable[] = []) => self.postMessage(r, { transfer });
+
+self.addEventListener("message", (e: MessageEvent<N1Request>) => {
+  const req = e.data;
+  if (req.type === "load") {
+    fetch(req.url)
+      .then(r => r.arrayBuffer())
+      .then(buf => {
+        g = readGraphPackage(buf);
+        let bridges = 0;
+        g.bridge.forEach(b => (bridges += b));
+        reply({ ok: true, type: "load", nNodes: g.nNodes, nEdges: g.nEdges, bridges });
+      })
+      .catch(err => reply({ ok: false, error: String(err) }));
+    return;
+  }
+  if (!g) {
+    reply({ ok: false, error: "graph package not loaded" });
+    return;
+  }
+  const t0 = performance.now();
+  if (req.type === "outage") {
+    const r = outage(g, req.edges);
+    reply({ ok: true, type: "outage", ...r, ms: performance.now() - t0 },
+          [r.label.buffer, r.sizes.buffer, r.islanded.buffer]);
+  } else {
+    const cut = n1(g);
+    reply({ ok: true, type: "n1", cut, ms: performance.now() - t0 }, [cut.buffer]);
+  }
+});
@@ -1,10 +1,17 @@
 import { defineConfig } from 'vite'
 import react from '@vitejs/plugin-react'
 
+// ENERVIZ_ARTIFACTS=http://127.0.0.1:8008 (scripts/serve_artifacts.py) sends the
+// pipeline outputs to that server: precompressed, ranged and ETag-revalidated
+const artifacts = process.env.ENERVIZ_ARTIFACTS
+
 export default defineConfig({
   plugins: [react()],
   server: {
     host: true,
+    proxy: artifacts
+      ? { '^/(?!cesium/|src/|@|node_modules/)[^?]+\\.(json|geojson|jsonl|bin|png)$': artifacts }
+      : undefined,
   },
   define: {
     CESIUM_BASE_URL: JSON.stringify('/cesium'),